@@ -0,0 +1,112 @@
+#===========================
+# Zulassung & Ausführungs-Pools für den API-Server
+#===========================
+# Jede Art Arbeit hat ihre eigene Spur (Lane) mit fester Parallelität und einer
+# begrenzten Warteschlange:
+#   cpu   – Intent-Vorhersage + schnelle Skills (Zeit, Gespräch, Geo, Wissen …)
+#   io    – langsame I/O-Skills (Wetter-API) mit Zeitbudget pro Skill
+#   learn – Training/Reload (eine zur Zeit)
+# Ist die Warteschlange einer Spur voll, wird sofort abgelehnt (Overloaded → 503)
+# statt den gemeinsamen Threadpool zu verstopfen. So bleiben billige Anfragen
+# schnell, auch wenn Wetter-API oder Training hängen.
+from __future__ import annotations
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+import anyio
+import anyio.from_thread
+import anyio.lowlevel
+import anyio.to_thread
+
+
+class Overloaded(Exception):
+    def __init__(self, lane: str, retry_after: float = 1.0):
+        super().__init__(f"Spur '{lane}' ausgelastet")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class Lane:
+    def __init__(self, name: str, workers: int, max_queue: int, retry_after: float = 1.0):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.retry_after = retry_after
+        # Plätze der Spur: ein Platz wird erst frei, wenn der Thread wirklich fertig ist –
+        # auch nach einem gerissenen Zeitbudget (anyio gäbe ihn beim Abbrechen sofort frei)
+        self.limiter = anyio.CapacityLimiter(self.workers)
+        self._threads = anyio.CapacityLimiter(self.workers)
+        self._abandoned: Set[object] = set()
+        self.rejected = 0
+        self.timeouts = 0
+        self.completed = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, budget: Optional[float] = None) -> Any:
+        """
+        fn(*args) in einem Thread dieser Spur ausführen.
+        Overloaded, wenn alle Plätze belegt sind und schon max_queue Aufrufe warten;
+        TimeoutError nach `budget` Sekunden (Warten + Ausführen). Der Thread läuft dann im
+        Hintergrund zu Ende (z. B. bis zum HTTP-Timeout des Skills) und belegt so lange
+        seinen Platz – mehr als `workers` Threads laufen nie gleichzeitig.
+        """
+        st = self.limiter.statistics()
+        if st.borrowed_tokens >= self.workers and st.tasks_waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.name, self.retry_after)
+        slot = object()
+        loop = anyio.lowlevel.current_token()
+        gate = threading.Lock()
+        state = ["waiting"]  # waiting → running | cancelled
+
+        def job() -> Any:
+            with gate:
+                if state[0] == "cancelled":  # abgebrochen, bevor der Thread anfing
+                    return None
+                state[0] = "running"
+            try:
+                return fn(*args)
+            finally:
+                try:
+                    anyio.from_thread.run_sync(self._release, slot, token=loop)
+                except Exception:  # Event-Loop schon beendet
+                    pass
+
+        try:
+            with anyio.fail_after(budget):
+                await self.limiter.acquire_on_behalf_of(slot)
+                res = await anyio.to_thread.run_sync(job, limiter=self._threads,
+                                                     abandon_on_cancel=budget is not None)
+        except BaseException as e:
+            if isinstance(e, TimeoutError):
+                self.timeouts += 1
+            if slot in self.limiter.statistics().borrowers:
+                with gate:
+                    started = state[0] == "running"
+                    state[0] = "cancelled" if not started else state[0]
+                if started:
+                    self._abandoned.add(slot)  # Platz gibt der Thread frei, wenn er fertig ist
+                else:
+                    self.limiter.release_on_behalf_of(slot)
+            raise
+        self.completed += 1
+        return res
+
+    def _release(self, slot: object) -> None:
+        self._abandoned.discard(slot)
+        self.limiter.release_on_behalf_of(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        st = self.limiter.statistics()
+        return {"workers": self.workers, "max_queue": self.max_queue,
+                "inflight": st.borrowed_tokens, "abandoned": len(self._abandoned), "waiting": st.tasks_waiting,
+                "completed": self.completed, "rejected": self.rejected, "timeouts": self.timeouts}
+
+
+class Lanes:
+    def __init__(self, cpu: Lane, io: Lane, learn: Lane):
+        self.cpu = cpu
+        self.io = io
+        self.learn = learn
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {lane.name: lane.stats() for lane in (self.cpu, self.io, self.learn)}
@@ -0,0 +1,258 @@
+#===========================
+# Auto-Lernen aus unsicheren Eingaben (Active Learning)
+#===========================
+# handle merkt sich Eingaben, bei denen das Modell unsicher war (conf unter
+# CONF_THRESHOLD, beantwortet oder Fallback), samt Top-k-Vorhersage. record() hängt
+# nur an einen Puffer im Speicher; ein Hintergrund-Thread schreibt ihn gesammelt in
+# die Tabelle learn_queue (Knowledge-DB, über Neustarts und Worker hinweg, begrenzt
+# auf queue_max Einträge – die am längsten nicht mehr gesehenen fliegen zuerst).
+#
+# review() (alle `interval` Sekunden oder über /admin/autolearn/review) bewertet die
+# Warteschlange mit dem aktuellen Modell neu und entscheidet je Eingabe:
+#   verwerfen  zu lang, Label oder Wort auf der Blacklist, oder das Modell ist
+#              inzwischen sicher (conf ≥ conf_threshold)
+#   Kandidat   mindestens min_hits-mal gesehen, conf ≥ min_conf und dasselbe Label
+#              wie beim letzten Auftreten – höchstens `batch` Paare
+#   behalten   alles andere (wartet auf weitere Treffer)
+# Gelernt wird nur ein BESTÄTIGTES Label: accept() (/admin/autolearn/accept) oder ein
+# späteres /learn derselben Eingabe (forget nimmt sie dann aus der Warteschlange).
+# Mit auto_accept=True lernt review die Kandidaten selbst – das ist Self-Training mit
+# dem eigenen argmax: Fehler des Modells werden dabei verstärkt statt korrigiert,
+# deshalb nur bewusst einschalten (FOX_AUTO_LEARN_ACCEPT=1).
+# Alle Paare eines Aufrufs gehen in EIN Nachtraining (learn), nicht eins pro Beispiel.
+#
+# Pre-Fork (serve.py): Threads überleben fork nicht – ein register_at_fork-Hook legt
+# Sperren, Puffer und Thread im Worker neu an.
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fox.cache import normalize_text
+from fox.skills.knowledge import store
+
+log = logging.getLogger("fox")
+
+BUFFER_MAX = 10000      # Eingaben im Speicher bis zum nächsten Schreiben (älteste fallen raus)
+FLUSH_AT = 256          # ab so vielen gepufferten Eingaben sofort schreiben
+FLUSH_INTERVAL = 5.0    # sonst spätestens alle so viele Sekunden
+
+Score = Tuple[str, float, bool, List[Tuple[str, float]]]  # (label, conf, known, topk)
+
+
+def _after_fork_hook(ref: "weakref.ref[AutoLearner]"):
+    def hook() -> None:
+        al = ref()
+        if al is not None:
+            al._after_fork()
+    return hook
+
+
+class AutoLearner:
+    def __init__(self, score: Callable[[List[str]], List[Score]],
+                 learn: Callable[[List[Tuple[str, str]]], Any], *,
+                 sync: Optional[Callable[[], Any]] = None,
+                 enabled: bool = True, auto_accept: bool = False, conf_threshold: float = 0.6, min_conf: float = 0.15,
+                 max_len: int = 120, blacklist: Iterable[str] = (), min_hits: int = 2,
+                 queue_max: int = 5000, batch: int = 200, interval: float = 600.0):
+        self.score = score
+        self.learn = learn
+        self.sync = sync
+        self.enabled = enabled
+        self.auto_accept = auto_accept
+        self.conf_threshold = conf_threshold
+        self.min_conf = min_conf
+        self.max_len = max_len
+        self.blacklist = {normalize_text(b) for b in blacklist}
+        self.min_hits = max(1, int(min_hits))
+        self.queue_max = max(1, int(queue_max))
+        self.batch = max(1, int(batch))
+        self.interval = interval
+        self.recorded = 0
+        self.evicted = 0
+        self.reviews = 0
+        self.learned = 0
+        self.last_review: Optional[Dict[str, Any]] = None
+        self._buf: deque = deque(maxlen=BUFFER_MAX)
+        self._flush_lock = threading.Lock()
+        self._review_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = False
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_after_fork_hook(weakref.ref(self)))
+
+    def _after_fork(self) -> None:
+        # Puffer gehört dem Elternprozess (der schreibt ihn selbst), hier neu anfangen
+        self._buf = deque(maxlen=BUFFER_MAX)
+        self._flush_lock = threading.Lock()
+        self._review_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        if self._started:
+            self.start()
+
+    # --- Erfassen (Request-Pfad: nur ein deque.append) ---
+    def record(self, text: str, label: Optional[str], conf: float,
+               topk: Sequence[Tuple[str, float]], via: str) -> None:
+        if not self.enabled or not label:
+            return
+        t = normalize_text(text)
+        if not t or len(t) > self.max_len:
+            return
+        self._buf.append((t, label, float(conf), topk, via, time.time()))
+        self.recorded += 1
+        if len(self._buf) >= FLUSH_AT and not self._wake.is_set():
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Puffer in learn_queue schreiben (Wiederholungen zusammengefasst); liefert die Zahl der Eingaben."""
+        with self._flush_lock:
+            items = []
+            while self._buf:
+                try:
+                    items.append(self._buf.popleft())
+                except IndexError:
+                    break
+            if not items:
+                return 0
+            rows: Dict[str, list] = {}
+            for t, label, conf, topk, via, ts in items:
+                row = rows.get(t)
+                if row is None:
+                    rows[t] = [t, label, conf, topk, via, 1, ts]
+                else:  # letzte Vorhersage gewinnt, Treffer werden gezählt
+                    row[1:5] = [label, conf, topk, via]
+                    row[5] += 1
+                    row[6] = ts
+            for row in rows.values():
+                row[3] = json.dumps([[l, round(float(p), 4)] for l, p in row[3]], ensure_ascii=False)
+            self.evicted += store().enqueue_learn(rows.values(), self.queue_max)
+            return len(items)
+
+    # --- Review ---
+    def _blocked(self, text: str, label: str) -> bool:
+        return label in self.blacklist or any(w in self.blacklist for w in text.split())
+
+    def review(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Warteschlange neu bewerten und Veraltetes verwerfen. Kandidaten kommen als
+        "pairs" zurück; gelernt werden sie nur mit auto_accept (sonst über accept).
+        """
+        with self._review_lock:
+            t0 = time.perf_counter()
+            if self.sync is not None:
+                self.sync()  # mit der aktuellen Version bewerten (CURRENT, andere Worker)
+            self.flush()
+            ks = store()
+            rows = ks.learn_queue(1, self.queue_max)
+            scores = self.score([r[0] for r in rows]) if rows else []
+            accept: List[Tuple[str, str]] = []
+            drop: List[str] = []
+            for row, (label, conf, _known, _topk) in zip(rows, scores):
+                text, queued, hits = row[0], row[1], row[5]
+                if len(text) > self.max_len or self._blocked(text, label) or conf >= self.conf_threshold:
+                    drop.append(text)
+                elif (hits >= self.min_hits and conf >= self.min_conf and label == queued
+                      and len(accept) < self.batch):
+                    accept.append((text, label))
+            res: Dict[str, Any] = {"queued": len(rows), "accepted": len(accept), "dropped": len(drop),
+                                   "learned": 0, "dry_run": dry_run, "auto_accept": self.auto_accept}
+            if dry_run or not self.auto_accept:
+                res["pairs"] = accept  # Vorschläge zum Bestätigen (accept)
+            if not dry_run:
+                learn_now = accept if self.auto_accept else []
+                taken = set(ks.take_learn(drop + [t for t, _ in learn_now]))
+                pairs = [(t, l) for t, l in learn_now if t in taken]
+                if pairs:
+                    self.learn(pairs)  # ein Nachtraining für den ganzen Stapel
+                    self.learned += len(pairs)
+                res["learned"] = len(pairs)
+                self.reviews += 1
+            res["seconds"] = round(time.perf_counter() - t0, 3)
+            if not dry_run:
+                self.last_review = {**res, "at": time.time()}
+            if not dry_run and (res["learned"] or res["dropped"]):
+                log.info("Auto-Lernen: %d gelernt, %d verworfen, %d in der Warteschlange (%.1f s).",
+                         res["learned"], res["dropped"], len(rows) - res["learned"] - res["dropped"],
+                         res["seconds"])
+            return res
+
+    def accept(self, pairs: Sequence[Tuple[str, str]]) -> int:
+        """Bestätigte (Text, Label) in einem Nachtraining lernen; learn nimmt sie aus der Warteschlange."""
+        pairs = [(normalize_text(t), l) for t, l in pairs if normalize_text(t)]
+        if not pairs:
+            return 0
+        with self._review_lock:
+            n = self.learn(pairs)
+            self.learned += len(pairs)
+        log.info("Auto-Lernen: %d bestätigte Paare gelernt.", len(pairs))
+        return n
+
+    def forget(self, texts: Iterable[str]) -> int:
+        """Eingaben aus der Warteschlange nehmen (von Hand gelernt, siehe learn_pairs)."""
+        keys = [k for k in (normalize_text(t) for t in texts) if k]
+        return len(store().take_learn(keys)) if keys else 0
+
+    def queue(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Häufigste Einträge der Warteschlange (Anzeige)."""
+        self.flush()
+        cols = ("text", "label", "conf", "topk", "via", "hits", "first_seen", "last_seen")
+        out = []
+        for row in store().learn_queue(1, limit):
+            e = dict(zip(cols, row))
+            e["topk"] = json.loads(e["topk"] or "[]")
+            out.append(e)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "auto_accept": self.auto_accept,
+                "running": self._thread is not None and self._thread.is_alive(), "buffered": len(self._buf),
+                "queued": store().count("learn_queue"), "recorded": self.recorded, "evicted": self.evicted,
+                "reviews": self.reviews, "learned": self.learned, "last_review": self.last_review,
+                "min_conf": self.min_conf, "min_hits": self.min_hits, "max_len": self.max_len,
+                "batch": self.batch, "interval_s": self.interval}
+
+    # --- Hintergrund-Thread ---
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._started = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fox-autolearn", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Thread beenden und den Rest des Puffers schreiben (atexit)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            log.exception("Auto-Lernen: Puffer konnte nicht geschrieben werden.")
+
+    def _run(self) -> None:
+        next_review = time.monotonic() + self.interval
+        while not self._stop.is_set():
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                if time.monotonic() >= next_review:
+                    next_review = time.monotonic() + self.interval
+                    self.review()
+                else:
+                    self.flush()
+            except Exception:
+                log.exception("Auto-Lernen fehlgeschlagen.")
@@ -0,0 +1,197 @@
+#===========================
+# Vorhersage-/Antwort-Cache
+#===========================
+# Sprachbefehle wiederholen sich ständig ("wie spät ist es", "hallo fox").
+# Der Cache merkt sich pro normalisiertem Text das Ergebnis und ist an eine
+# Modellversion gebunden: wechselt die Version (/learn, /reload), wird geleert.
+# FactCache puffert Knowledge-Lookups (Treffer und Fehlschläge) mit Write-through.
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Cache-Schlüssel: klein geschrieben, Leerraum zusammengefasst."""
+    return " ".join((text or "").lower().split())
+
+
+class LRUCache:
+    """Begrenzter LRU-Cache mit Trefferstatistik (maxsize=0 → aus)."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = max(0, int(maxsize))
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bind(self, version: Optional[str]) -> bool:
+        """An eine Modellversion binden; bei Wechsel leeren. True = invalidiert."""
+        with self._lock:
+            if version == self.version:
+                return False
+            self.version = version
+            if self._data:
+                self._data.clear()
+                self.invalidations += 1
+            return True
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.maxsize:
+            return None
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return val
+
+    def put(self, key: Hashable, value: Any, version: Optional[str] = None) -> None:
+        """version: Modellversion, mit der value berechnet wurde – veraltete Werte werden verworfen."""
+        if not self.maxsize or value is None:
+            return
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "version": self.version,
+        }
+
+
+MISSING = object()  # Negativ-Eintrag im FactCache: Key ist bekannt nicht vorhanden
+
+
+class FactCache:
+    """
+    LRU für Knowledge-Lookups: key → Wert oder MISSING (auch Fehlschläge werden gemerkt).
+    Begrenzt nach Einträgen und (geschätzten) Bytes. `generation` steigt bei jedem
+    Schreiben/Invalidieren; put() mit älterer Generation wird verworfen – so kann ein
+    langsamer DB-Lesezugriff keinen inzwischen geschriebenen Wert überholen.
+    """
+
+    ENTRY_OVERHEAD = 120  # Bytes je Eintrag (OrderedDict-Knoten, Tuple, str-Header)
+
+    def __init__(self, maxsize: int = 4096, maxbytes: int = 4 << 20):
+        self.maxsize = max(0, int(maxsize))
+        self.maxbytes = max(0, int(maxbytes))
+        self.generation = 0
+        self.bytes = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cost(self, key: str, value: Any) -> int:
+        return self.ENTRY_OVERHEAD + len(key) + (0 if value is MISSING else len(value))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Wert, MISSING (bekannt nicht vorhanden) oder None (nicht im Cache)."""
+        if not self.maxsize:
+            return None
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if val is MISSING:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return val
+
+    def _set(self, key: str, value: Any) -> None:
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.bytes -= self._cost(key, old)
+        self._data[key] = value
+        self.bytes += self._cost(key, value)
+        while self._data and (len(self._data) > self.maxsize or self.bytes > self.maxbytes):
+            k, v = self._data.popitem(last=False)
+            self.bytes -= self._cost(k, v)
+
+    def put(self, key: str, value: Optional[str], generation: int) -> None:
+        """Ergebnis eines DB-Lesezugriffs (None → Negativ-Eintrag), gelesen bei `generation`."""
+        if not self.maxsize:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._set(key, MISSING if value is None else value)
+
+    def write(self, items: Dict[str, Optional[str]]) -> None:
+        """Write-through nach einem Commit: neue Werte übernehmen (None → Key entfernt)."""
+        with self._lock:
+            self.generation += 1
+            if not self.maxsize:
+                return
+            if len(items) > self.maxsize:
+                self._clear()
+                return
+            for key, value in items.items():
+                self._set(key, MISSING if value is None else value)
+
+    def invalidate(self, keys: Optional[Iterable[str]] = None) -> None:
+        """Einzelne Keys oder (ohne Argument) alles verwerfen."""
+        with self._lock:
+            self.generation += 1
+            if keys is None:
+                self._clear()
+                return
+            for key in keys:
+                old = self._data.pop(key, None)
+                if old is not None:
+                    self.bytes -= self._cost(key, old)
+
+    def _clear(self) -> None:
+        if self._data:
+            self._data.clear()
+            self.invalidations += 1
+        self.bytes = 0
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,69 @@
+#===========================
+# Trainingskorpus im Speicher (inkrementell aus der DB)
+#===========================
+# BASE_TRAIN + training-Tabelle als parallele Listen (texts/labels) mit einem
+# Dedup-Hash (Paar → training.id). Statt bei jedem /learn die ganze Tabelle zu lesen
+# und neu zu deduplizieren, merkt sich der Korpus die höchste gelesene id
+# (Hochwassermarke) und hängt nur neuere Zeilen an. Löschungen kommen über
+# training_deleted (Trigger) – auch die anderer Worker. Reihenfolge wie bisher:
+# BASE_TRAIN zuerst, dann DB-Zeilen nach id, jedes Paar nur einmal.
+from __future__ import annotations
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from fox.skills.knowledge import store
+
+
+class TrainingCorpus:
+    def __init__(self, base_texts: Iterable[str], base_labels: Iterable[str]):
+        self._base: List[Tuple[str, str]] = list(dict.fromkeys(zip(base_texts, base_labels)))
+        self._lock = threading.Lock()
+        self._source = None
+        self.full_loads = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.texts: List[str] = [t for t, _ in self._base]
+        self.labels: List[str] = [l for _, l in self._base]
+        self._ids: Dict[Tuple[str, str], int] = {p: 0 for p in self._base}  # 0 = BASE_TRAIN
+        self.hwm = 0   # höchste übernommene training.id
+        self.seq = 0   # höchste gesehene training_deleted.seq
+        self.full_loads += 1
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def sync(self) -> int:
+        """DB-Änderungen seit dem letzten Aufruf übernehmen; liefert die Zahl neuer Paare."""
+        with self._lock:
+            ks = store()
+            if ks is not self._source:  # andere DB (Pfad gewechselt) → von vorn
+                self._source = ks
+                if self.hwm or self.seq:
+                    self._reset()
+            rows, deleted, self.seq = ks.training_changes(self.hwm, self.seq)
+            if deleted:
+                self._remove(deleted)
+            added = 0
+            for id_, text, label in rows:
+                pair = (text, label)
+                if pair not in self._ids:
+                    self._ids[pair] = id_
+                    self.texts.append(text)
+                    self.labels.append(label)
+                    added += 1
+            if rows:
+                self.hwm = rows[-1][0]
+            return added
+
+    def _remove(self, deleted: Iterable[Tuple[int, str, str]]) -> None:
+        # nur Paare, die genau aus dieser Zeile stammen (nicht BASE_TRAIN, nicht neu eingefügt)
+        gone = {(t, l) for id_, t, l in deleted if self._ids.get((t, l)) == id_}
+        if not gone:
+            return
+        for pair in gone:
+            del self._ids[pair]
+        keep = [p for p in zip(self.texts, self.labels) if p not in gone]
+        # neue Listen statt Änderung an Ort und Stelle (selten; wer die alten hält, sieht einen festen Stand)
+        self.texts = [t for t, _ in keep]
+        self.labels = [l for _, l in keep]
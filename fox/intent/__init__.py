@@ -0,0 +1,19 @@
+#===========================
+# Intent-Modell (Engines, Artefakt, NumPy-Inferenz)
+#===========================
+# Nur NumPy-Module werden hier geladen; sklearn kommt erst mit dem Training.
+
+from .engines import (
+    ENGINES, DEFAULT_ENGINE, FEATURE_MODES, CosineCentroid,
+    make_vectorizer, make_classifier, fit_engine, partial_fit_engine,
+)
+from .hashing import HashingFeatures
+from .artifact import ARTIFACT_FORMAT, PRECISIONS, export_artifact, load_artifact, current_version
+from .runtime import CompiledIntentModel, CSRRows, Layer, SimilarityIndex
+
+__all__ = [
+    "ENGINES", "DEFAULT_ENGINE", "FEATURE_MODES", "CosineCentroid", "HashingFeatures",
+    "make_vectorizer", "make_classifier", "fit_engine", "partial_fit_engine",
+    "ARTIFACT_FORMAT", "PRECISIONS", "export_artifact", "load_artifact", "current_version",
+    "CompiledIntentModel", "CSRRows", "Layer", "SimilarityIndex",
+]
@@ -0,0 +1,234 @@
+#===========================
+# Modell-Artefakt (versioniert, mmap)
+#===========================
+# Layout:
+#   <root>/CURRENT              → Name des aktiven Versionsordners
+#   <root>/v-<version>/manifest.json
+#   <root>/v-<version>/vocab.npy, cols.npy, idf.npy (tfidf) bzw. df.npy (hashing)
+#   <root>/v-<version>/W0.npy, b0.npy, ... (+ s0.npy bei int8)
+#
+# Ein neues Modell wird komplett in einen eigenen Ordner geschrieben und erst
+# danach per atomarem Tausch von CURRENT aktiviert. Laufende Prozesse behalten
+# ihre gemappten Arrays, neue Prozesse teilen sich die Seiten des Page-Cache.
+from __future__ import annotations
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .runtime import CompiledIntentModel, Layer, TfidfFeatures
+
+ARTIFACT_FORMAT = 1
+KEEP_VERSIONS = 2
+PRECISIONS = ("float64", "float32", "int8")   # int8 = quantisierte erste (Vokabular-)Schicht
+
+log = logging.getLogger("fox")
+
+
+# ---------- Export (Trainings-Seite, braucht die sklearn-Objekte) ----------
+def _features_from_vectorizer(vec) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    feats = getattr(vec, "features", None)  # SparseFeatures-Adapter (z. B. Hashing)
+    if feats is not None:
+        return feats.config(), feats.arrays()
+    if getattr(vec, "analyzer", "word") != "word" or callable(getattr(vec, "tokenizer", None)):
+        raise ValueError("Nur TfidfVectorizer mit analyzer='word' wird exportiert.")
+    if getattr(vec, "strip_accents", None) or getattr(vec, "stop_words", None) or getattr(vec, "binary", False):
+        raise ValueError("strip_accents/stop_words/binary werden im Artefakt nicht unterstützt.")
+    terms = sorted(vec.vocabulary_)
+    arrays = {
+        "vocab": np.asarray(terms, dtype=str) if terms else np.zeros(0, dtype="<U1"),
+        "cols": np.asarray([vec.vocabulary_[t] for t in terms], dtype=np.int64),
+    }
+    if getattr(vec, "use_idf", True):
+        arrays["idf"] = np.asarray(vec.idf_, dtype=np.float64)
+    cfg = {
+        "kind": "tfidf",
+        "n_features": len(vec.vocabulary_),
+        "lowercase": bool(vec.lowercase),
+        "ngram_range": list(vec.ngram_range),
+        "token_pattern": vec.token_pattern,
+        "sublinear_tf": bool(vec.sublinear_tf),
+        "norm": vec.norm,
+    }
+    return cfg, arrays
+
+
+def _layers_from_classifier(clf) -> Tuple[List[Tuple[np.ndarray, np.ndarray]], str, str]:
+    """Übersetzt die unterstützten Engines in (Schichten, Ausgabe, Hidden-Aktivierung)."""
+    name = type(clf).__name__
+    n_classes = len(clf.classes_)
+    if name == "MLPClassifier":
+        if clf.activation not in ("relu", "identity"):
+            raise ValueError(f"MLP-Aktivierung '{clf.activation}' wird nicht exportiert.")
+        layers = [(np.asarray(W, dtype=np.float64), np.asarray(b, dtype=np.float64))
+                  for W, b in zip(clf.coefs_, clf.intercepts_)]
+        return layers, ("softmax" if clf.out_activation_ == "softmax" else "logistic"), clf.activation
+    if name in ("LogisticRegression", "SGDClassifier"):
+        W = np.asarray(clf.coef_, dtype=np.float64).T
+        b = np.asarray(clf.intercept_, dtype=np.float64)
+        if W.shape[1] == 1:
+            return [(W, b)], "logistic", "identity"
+        return [(W, b)], ("softmax" if name == "LogisticRegression" else "ovr"), "identity"
+    if name == "ComplementNB":
+        W = np.asarray(clf.feature_log_prob_, dtype=np.float64).T
+        b = np.asarray(clf.class_log_prior_, dtype=np.float64) if n_classes == 1 else np.zeros(n_classes)
+        return [(W, b)], "softmax", "identity"
+    if name == "CosineCentroid":
+        W = np.asarray(clf.centroids_, dtype=np.float64).T * float(clf.scale)
+        return [(W, np.zeros(n_classes))], "softmax", "identity"
+    raise ValueError(f"Engine '{name}' kann nicht als Artefakt exportiert werden.")
+
+
+# ---------- Reduzierte Genauigkeit ----------
+def _quantize_int8(W: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetrische int8-Quantisierung pro Ausgabe-Spalte."""
+    amax = np.abs(W).max(axis=0) if W.size else np.zeros(W.shape[1])
+    scale = np.where(amax > 0, amax / 127.0, 1.0).astype(np.float32)
+    Wq = np.clip(np.rint(W / scale), -127, 127).astype(np.int8)
+    return Wq, scale
+
+def _cast_layers(layers: List[Tuple[np.ndarray, np.ndarray]], precision: str) -> List[Layer]:
+    if precision == "float64":
+        return [Layer(W, b) for W, b in layers]
+    out: List[Layer] = []
+    for i, (W, b) in enumerate(layers):
+        if precision == "int8" and i == 0:
+            Wq, scale = _quantize_int8(W)
+            out.append(Layer(Wq, b.astype(np.float32), scale))
+        else:
+            out.append(Layer(W.astype(np.float32), b.astype(np.float32)))
+    return out
+
+def _feature_cfg(cfg: Dict[str, Any], precision: str) -> Dict[str, Any]:
+    return dict(cfg, dtype="float64" if precision == "float64" else "float32")
+
+def _build_features(cfg: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+    kind = cfg.get("kind", "tfidf")
+    if kind == "tfidf":
+        return TfidfFeatures(arrays["vocab"], arrays["cols"], arrays.get("idf"), cfg)
+    if kind == "hashing":
+        from .hashing import HashingFeatures
+        return HashingFeatures.from_artifact(cfg, arrays)
+    raise ValueError(f"Unbekannter Feature-Typ '{kind}' im Artefakt.")
+
+
+def export_artifact(clf, vec, meta: Dict[str, Any], root: Path, precision: str = "float64",
+                    check_texts: Optional[Sequence[str]] = None,
+                    extra: Optional[Callable[[Path], None]] = None) -> Path:
+    """
+    Schreibt eine neue Version nach <root>/v-<version>/ und aktiviert sie.
+    Mit check_texts wird geprüft, dass die gewählte Genauigkeit auf diesen Texten
+    dieselbe argmax-Klasse liefert wie sklearn; sonst wird die nächstgenauere genommen.
+    extra(ordner) darf vor dem Aktivieren zusätzliche Dateien in die Version schreiben.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unbekannte Genauigkeit '{precision}'. Erlaubt: {', '.join(PRECISIONS)}")
+    root = Path(root)
+    version = str(meta.get("version") or "0")
+    cfg, arrays = _features_from_vectorizer(vec)
+    raw_layers, output, hidden = _layers_from_classifier(clf)
+    classes = [str(c) for c in clf.classes_]
+
+    if check_texts:
+        ref = np.asarray(clf.predict_proba(vec.transform(list(check_texts)))).argmax(axis=1)
+        for prec in PRECISIONS[PRECISIONS.index(precision)::-1]:
+            probe = CompiledIntentModel(
+                _build_features(_feature_cfg(cfg, prec), arrays),
+                _cast_layers(raw_layers, prec), classes, output, hidden_activation=hidden)
+            if (probe.predict_proba(probe.transform(check_texts)).argmax(axis=1) == ref).all():
+                break
+            log.warning("Artefakt: %s ändert argmax auf dem Prüfkorpus – nehme höhere Genauigkeit.", prec)
+        precision = prec
+    layers = _cast_layers(raw_layers, precision)
+
+    dest = root / f"v-{version}"
+    tmp = root / f".tmp-v-{version}-{os.getpid()}"
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    for name, arr in arrays.items():
+        np.save(tmp / f"{name}.npy", arr)
+    layer_files = []
+    for i, layer in enumerate(layers):
+        np.save(tmp / f"W{i}.npy", np.ascontiguousarray(layer.W))
+        np.save(tmp / f"b{i}.npy", np.ascontiguousarray(layer.b))
+        entry = {"W": f"W{i}.npy", "b": f"b{i}.npy"}
+        if layer.scale is not None:
+            np.save(tmp / f"s{i}.npy", np.ascontiguousarray(layer.scale))
+            entry["scale"] = f"s{i}.npy"
+        layer_files.append(entry)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "meta": dict(meta, precision=precision),
+        "classes": classes,
+        "precision": precision,
+        "features": dict(_feature_cfg(cfg, precision), arrays=sorted(arrays)),
+        "layers": layer_files,
+        "output": output,
+        "hidden_activation": hidden,
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    if extra is not None:
+        extra(tmp)
+
+    if dest.exists():
+        shutil.rmtree(dest)
+    os.replace(tmp, dest)
+    _set_current(root, dest.name)
+    _prune(root, keep=dest.name)
+    return dest
+
+
+def _set_current(root: Path, name: str) -> None:
+    tmp = root / f".CURRENT.{os.getpid()}"
+    tmp.write_text(name, encoding="utf-8")
+    os.replace(tmp, root / "CURRENT")
+
+
+def _prune(root: Path, keep: str) -> None:
+    """Alte Versionen aufräumen (unter Windows evtl. noch gemappt → dann liegen lassen)."""
+    versions = sorted((p for p in root.glob("v-*") if p.is_dir()), key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in [v for v in versions if v.name != keep][KEEP_VERSIONS - 1:]:
+        shutil.rmtree(p, ignore_errors=True)
+
+
+# ---------- Laden (Serving-Seite, nur NumPy) ----------
+def current_version(root: Path) -> Optional[str]:
+    """Name des aktiven Versionsordners (oder None, wenn noch kein Artefakt existiert)."""
+    try:
+        name = (Path(root) / "CURRENT").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return name or None
+
+
+def load_artifact(root: Path, mmap: bool = True) -> CompiledIntentModel:
+    root = Path(root)
+    name = current_version(root)
+    if not name:
+        raise FileNotFoundError(f"Kein Modell-Artefakt unter {root}")
+    path = root / name
+    manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+    if int(manifest.get("format", 0)) != ARTIFACT_FORMAT:
+        raise ValueError(f"Artefakt-Format {manifest.get('format')} nicht unterstützt (erwartet {ARTIFACT_FORMAT}).")
+
+    mode = "r" if mmap else None
+    def _arr(fname: str) -> np.ndarray:
+        return np.load(path / fname, mmap_mode=mode)
+
+    cfg = manifest["features"]
+    names = cfg.get("arrays", ["vocab", "cols", "idf"])
+    features = _build_features(cfg, {n: _arr(f"{n}.npy") for n in names if (path / f"{n}.npy").exists()})
+    layers = [Layer(_arr(l["W"]), _arr(l["b"]), _arr(l["scale"]) if l.get("scale") else None)
+              for l in manifest["layers"]]
+    return CompiledIntentModel(
+        features, layers, manifest["classes"], manifest["output"],
+        hidden_activation=manifest.get("hidden_activation", "relu"),
+        meta=manifest.get("meta", {}), path=path, precision=manifest.get("precision", "float64"),
+    )
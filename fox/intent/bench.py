@@ -0,0 +1,157 @@
+#===========================
+# Benchmark der Intent-Engines
+#===========================
+# Aufruf (im Projektordner):
+#   python -m fox.intent.bench
+#   python -m fox.intent.bench --engines mlp,cnb --db knowledge.db --json
+#   python -m fox.intent.bench --features hashing
+from __future__ import annotations
+import argparse
+import json
+import pickle
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from fox.labels import BASE_TRAIN
+from .artifact import PRECISIONS, export_artifact, load_artifact
+from .engines import ENGINES, FEATURE_MODES, fit_engine
+
+
+def load_corpus(db_path: Path | None = None) -> Tuple[List[str], List[str]]:
+    """BASE_TRAIN + persistierte training-Tabelle (dedupliziert, Reihenfolge bleibt)."""
+    persisted: List[Tuple[str, str]] = []
+    if db_path and Path(db_path).exists():
+        try:
+            with sqlite3.connect(db_path) as con:
+                persisted = con.execute("SELECT text, label FROM training ORDER BY id ASC").fetchall()
+        except sqlite3.Error:
+            persisted = []
+    pairs = list(dict.fromkeys(list(zip(BASE_TRAIN["texts"], BASE_TRAIN["labels"])) + persisted))
+    return [t for t, _ in pairs], [l for _, l in pairs]
+
+
+def _percentile_ms(samples: List[float], q: float) -> float:
+    return round(float(np.percentile(samples, q)) * 1000.0, 3) if samples else 0.0
+
+
+def _cv_accuracy(texts: List[str], labels_: List[str], engine: str, folds: int, seed: int,
+                 features: str = "tfidf") -> float | None:
+    from sklearn.model_selection import StratifiedKFold
+    y = np.asarray(labels_)
+    _, counts = np.unique(y, return_counts=True)
+    n_splits = min(folds, int(counts.min()))
+    if n_splits < 2:
+        return None
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    correct = 0
+    for tr, te in skf.split(texts, y):
+        vec, clf = fit_engine([texts[i] for i in tr], list(y[tr]), engine, random_state=seed, features=features)
+        pred = clf.predict(vec.transform([texts[i] for i in te]))
+        correct += int((pred == y[te]).sum())
+    return round(correct / len(texts), 4)
+
+
+def _latency(predict, texts: List[str], rounds: int) -> List[float]:
+    """Latenz pro Einzel-Anfrage (wie FoxAssistant.handle: transform + predict_proba)."""
+    lat: List[float] = []
+    for _ in range(rounds):
+        for t in texts:
+            s = time.perf_counter()
+            predict(t)
+            lat.append(time.perf_counter() - s)
+    return lat
+
+
+def _bench_compiled(vec, clf, texts: List[str], precision: str, rounds: int) -> Dict[str, Any]:
+    """Exportiert ins Artefakt (ohne Fallback) und misst den NumPy-Kernel."""
+    with tempfile.TemporaryDirectory() as tmp:
+        export_artifact(clf, vec, {"version": "bench"}, Path(tmp), precision=precision)
+        m = load_artifact(Path(tmp))
+        lat = _latency(lambda t: m.predict_proba(m.transform([t])), texts, rounds)
+        ref = np.asarray(clf.predict_proba(vec.transform(texts))).argmax(axis=1)
+        same = m.predict_proba(m.transform(texts)).argmax(axis=1) == ref
+        return {
+            "precision": precision,
+            "predict_p50_ms": _percentile_ms(lat, 50),
+            "predict_p99_ms": _percentile_ms(lat, 99),
+            "weight_bytes": m.nbytes,
+            "argmax_equal": bool(same.all()),
+        }
+
+
+def bench_engine(texts: List[str], labels_: List[str], engine: str,
+                 folds: int = 5, rounds: int = 3, seed: int = 42,
+                 precisions: List[str] | None = None, features: str = "tfidf") -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    vec, clf = fit_engine(texts, labels_, engine, random_state=seed, features=features)
+    train_s = time.perf_counter() - t0
+
+    lat = _latency(lambda t: clf.predict_proba(vec.transform([t])), texts, rounds)
+
+    return {
+        "engine": engine,
+        "features": features,
+        "train_s": round(train_s, 4),
+        "predict_p50_ms": _percentile_ms(lat, 50),
+        "predict_p99_ms": _percentile_ms(lat, 99),
+        "model_bytes": len(pickle.dumps((clf, vec))),
+        "cv_accuracy": _cv_accuracy(texts, labels_, engine, folds, seed, features),
+        "compiled": [_bench_compiled(vec, clf, texts, p, rounds) for p in (precisions or [])],
+    }
+
+
+def run(engines: List[str], db_path: Path | None = None, folds: int = 5, rounds: int = 3,
+        precisions: List[str] | None = None, features: str = "tfidf") -> Dict[str, Any]:
+    texts, labels_ = load_corpus(db_path)
+    return {
+        "n_samples": len(texts),
+        "n_labels": len(set(labels_)),
+        "features": features,
+        "results": [bench_engine(texts, labels_, e, folds=folds, rounds=rounds, precisions=precisions,
+                                 features=features)
+                    for e in engines],
+    }
+
+
+def _print_table(report: Dict[str, Any]) -> None:
+    print(f"Samples: {report['n_samples']}  Labels: {report['n_labels']}  Features: {report['features']}")
+    print(f"{'engine':<10}{'train_s':>10}{'p50_ms':>10}{'p99_ms':>10}{'bytes':>12}{'cv_acc':>9}")
+    for r in report["results"]:
+        acc = "-" if r["cv_accuracy"] is None else f"{r['cv_accuracy']:.3f}"
+        print(f"{r['engine']:<10}{r['train_s']:>10.3f}{r['predict_p50_ms']:>10.3f}"
+              f"{r['predict_p99_ms']:>10.3f}{r['model_bytes']:>12}{acc:>9}")
+        for c in r["compiled"]:
+            eq = "argmax=" if c["argmax_equal"] else "argmax≠"
+            print(f"  └ {c['precision']:<7}{'':>9}{c['predict_p50_ms']:>10.3f}"
+                  f"{c['predict_p99_ms']:>10.3f}{c['weight_bytes']:>12}  {eq}")
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Vergleicht die Intent-Engines (Training, Latenz, Größe, CV-Genauigkeit).")
+    ap.add_argument("--engines", default=",".join(ENGINES), help="Kommagetrennt, z. B. mlp,cnb,centroid")
+    ap.add_argument("--db", type=Path, default=Path("knowledge.db"), help="SQLite mit training-Tabelle")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--rounds", type=int, default=3, help="Wiederholungen für die Latenzmessung")
+    ap.add_argument("--precisions", default=",".join(PRECISIONS),
+                    help="NumPy-Kernel zusätzlich messen (leer = aus), z. B. float32,int8")
+    ap.add_argument("--features", default="tfidf", choices=FEATURE_MODES)
+    ap.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = ap.parse_args(argv)
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    precisions = [p.strip() for p in args.precisions.split(",") if p.strip()]
+    report = run(engines, db_path=args.db, folds=args.folds, rounds=args.rounds, precisions=precisions,
+                 features=args.features)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_table(report)
+
+
+if __name__ == "__main__":
+    main()
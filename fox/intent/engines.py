@@ -0,0 +1,153 @@
+#===========================
+# Intent-Engines (austauschbare Klassifikatoren)
+#===========================
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# sklearn wird erst beim Training importiert – Serving läuft über das NumPy-Artefakt.
+DEFAULT_ENGINE = "mlp"
+
+
+class CosineCentroid:
+    """
+    Nearest-Centroid über L2-normierte TF-IDF-Zeilen.
+    Wahrscheinlichkeiten = Softmax(scale * Kosinus-Ähnlichkeit zum Klassen-Zentroid).
+    """
+
+    def __init__(self, scale: float = 10.0):
+        self.scale = scale
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        self.classes_ = np.unique(y)
+        rows = []
+        for c in self.classes_:
+            v = np.asarray(X[y == c].mean(axis=0)).ravel()
+            n = np.linalg.norm(v)
+            rows.append(v / n if n else v)
+        self.centroids_ = np.vstack(rows)
+        return self
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.centroids_.T) * self.scale
+
+    def predict_proba(self, X):
+        z = self.decision_function(X)
+        z = z - z.max(axis=1, keepdims=True)
+        e = np.exp(z)
+        return e / e.sum(axis=1, keepdims=True)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def get_params(self, deep: bool = True):
+        return {"scale": self.scale}
+
+
+# ---------- Registry ----------
+def _mlp(random_state: int, max_iter: int):
+    from sklearn.neural_network import MLPClassifier
+    return MLPClassifier(
+        hidden_layer_sizes=(512, 256),
+        activation="relu",
+        solver="adam",
+        alpha=1e-4,
+        max_iter=max_iter,
+        early_stopping=True,
+        random_state=random_state,
+        verbose=False
+    )
+
+def _sgd(random_state: int, max_iter: int):
+    from sklearn.linear_model import SGDClassifier
+    return SGDClassifier(loss="log_loss", alpha=1e-4, max_iter=max(max_iter, 1000),
+                         tol=1e-4, random_state=random_state)
+
+def _logreg(random_state: int, max_iter: int):
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(C=10.0, max_iter=max(max_iter, 1000), random_state=random_state)
+
+def _cnb(random_state: int, max_iter: int):
+    from sklearn.naive_bayes import ComplementNB
+    return ComplementNB(alpha=0.3)
+
+def _centroid(random_state: int, max_iter: int):
+    return CosineCentroid()
+
+ENGINES: Dict[str, Callable[[int, int], Any]] = {
+    "mlp": _mlp,
+    "sgd": _sgd,
+    "logreg": _logreg,
+    "cnb": _cnb,
+    "centroid": _centroid,
+}
+
+
+FEATURE_MODES = ("tfidf", "hashing")
+
+
+class SparseFeatures:
+    """Adapter: NumPy-Featurizer (CSRRows) → scipy.sparse für sklearn (nur Trainings-Seite)."""
+
+    def __init__(self, features):
+        self.features = features
+
+    def fit_transform(self, texts: List[str]):
+        self.features.partial_fit(texts)
+        return self.transform(texts)
+
+    def partial_fit(self, texts: List[str]) -> "SparseFeatures":
+        self.features.partial_fit(texts)
+        return self
+
+    def transform(self, texts: List[str]):
+        return self.features.transform(texts).to_scipy()
+
+
+def make_vectorizer(features: str = "tfidf", n_features: int = 2 ** 14):
+    if features == "hashing":
+        from .hashing import HashingFeatures
+        return SparseFeatures(HashingFeatures(n_features=n_features))
+    if features != "tfidf":
+        raise ValueError(f"Unbekannter Feature-Modus '{features}'. Erlaubt: {', '.join(FEATURE_MODES)}")
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(ngram_range=(1, 2), lowercase=True, strip_accents=None, min_df=1)
+
+def make_classifier(engine: str, random_state: int = 42, max_iter: int = 400):
+    factory = ENGINES.get((engine or DEFAULT_ENGINE).lower())
+    if factory is None:
+        raise ValueError(f"Unbekannte Intent-Engine '{engine}'. Erlaubt: {', '.join(ENGINES)}")
+    return factory(random_state, max_iter)
+
+def fit_engine(texts: List[str], labels_: List[str], engine: str = DEFAULT_ENGINE,
+               random_state: int = 42, max_iter: int = 400,
+               features: str = "tfidf", n_features: int = 2 ** 14) -> Tuple[Any, Any]:
+    """Trainiert Vektorisierer + Klassifikator der gewählten Engine."""
+    vec = make_vectorizer(features, n_features)
+    X = vec.fit_transform(texts)
+    clf = make_classifier(engine, random_state=random_state, max_iter=max_iter)
+    clf.fit(X, labels_)
+    return vec, clf
+
+def partial_fit_engine(vec, clf, texts: List[str], labels_: List[str], epochs: int = 5,
+                       replay: Sequence[Tuple[str, str]] = ()) -> bool:
+    """
+    Inkrementelles Nachtrainieren (nur Hashing-Features + Engines mit partial_fit).
+    replay: alte (Text, Label)-Paare, die gegen Vergessen mittrainiert werden (ohne df-Update).
+    Gibt False zurück, wenn ein volles Training nötig ist (z. B. neues Label).
+    """
+    if not isinstance(vec, SparseFeatures) or not hasattr(clf, "partial_fit"):
+        return False
+    if set(labels_) - set(clf.classes_):
+        return False
+    vec.partial_fit(texts)  # Online-IDF nur mit den neuen Texten
+    batch_t = list(texts) + [t for t, _ in replay]
+    batch_l = list(labels_) + [l for _, l in replay]
+    X = vec.transform(batch_t)
+    if getattr(clf, "early_stopping", False):
+        clf.set_params(early_stopping=False)  # partial_fit unterstützt kein early_stopping
+    for _ in range(max(1, epochs)):
+        clf.partial_fit(X, batch_l)
+    return True
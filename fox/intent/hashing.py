@@ -0,0 +1,132 @@
+#===========================
+# Hashing-Features (feste Dimension, Online-IDF)
+#===========================
+# Wort-Uni/Bigramme + Zeichen-n-Gramme (innerhalb von Wörtern) werden per CRC32
+# in n_features Buckets gehasht. Kein Vokabular → Speicher bleibt konstant,
+# neue Wörter brauchen kein Refit. Die Dokumentfrequenzen (df) werden online
+# mitgezählt, damit IDF auch beim inkrementellen Lernen nachgeführt werden kann.
+from __future__ import annotations
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .runtime import CSRRows
+
+
+class HashingFeatures:
+    kind = "hashing"
+
+    def __init__(self, n_features: int = 2 ** 14, ngram_range=(1, 2), char_ngram_range=(3, 5),
+                 lowercase: bool = True, use_idf: bool = True, token_pattern: str = r"(?u)\b\w\w+\b",
+                 df: Optional[np.ndarray] = None, n_docs: int = 0, dtype: str = "float64"):
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(ngram_range)
+        self.char_ngram_range = tuple(char_ngram_range) if char_ngram_range else None
+        self.lowercase = lowercase
+        self.use_idf = use_idf
+        self.token_pattern = token_pattern
+        self.df = np.zeros(self.n_features, dtype=np.int64) if df is None else df
+        self.n_docs = int(n_docs)
+        self.dtype = np.dtype(dtype)
+        self._token_re = re.compile(token_pattern)
+        self._idf: Optional[np.ndarray] = None
+
+    # ---------- Terme & Hashing ----------
+    def terms(self, text: str) -> List[str]:
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+        out = []
+        min_n, max_n = self.ngram_range
+        for n in range(min_n, max_n + 1):
+            for i in range(len(tokens) - n + 1):
+                out.append("w:" + " ".join(tokens[i:i + n]))
+        if self.char_ngram_range:
+            cmin, cmax = self.char_ngram_range
+            for tok in tokens:
+                w = f" {tok} "
+                for n in range(cmin, cmax + 1):
+                    for i in range(len(w) - n + 1):
+                        out.append("c:" + w[i:i + n])
+        return out
+
+    def _cols(self, text: str) -> np.ndarray:
+        terms = self.terms(text or "")
+        return np.fromiter((zlib.crc32(t.encode("utf-8")) % self.n_features for t in terms),
+                           dtype=np.int64, count=len(terms))
+
+    # ---------- Online-IDF ----------
+    def partial_fit(self, texts: Sequence[str]) -> "HashingFeatures":
+        """Aktualisiert Dokumentfrequenzen; kann beliebig oft mit neuen Texten aufgerufen werden."""
+        if not self.use_idf:
+            return self
+        if not self.df.flags.writeable:
+            self.df = np.array(self.df)
+        for text in texts:
+            self.df[np.unique(self._cols(text))] += 1
+            self.n_docs += 1
+        self._idf = None
+        return self
+
+    @property
+    def idf(self) -> Optional[np.ndarray]:
+        if not self.use_idf:
+            return None
+        if self._idf is None:
+            self._idf = np.log((1.0 + self.n_docs) / (1.0 + self.df)) + 1.0
+        return self._idf
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["df"] = np.array(self.df)
+        state["_idf"] = None
+        return state
+
+    def transform(self, texts: Sequence[str]) -> CSRRows:
+        idf = self.idf
+        indptr = [0]
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        for text in texts:
+            idx, counts = np.unique(self._cols(text), return_counts=True)
+            val = counts.astype(np.float64)
+            if idf is not None:
+                val *= idf[idx]
+            if val.size:
+                val /= np.sqrt(np.dot(val, val))
+            indices.append(idx.astype(np.int32))
+            data.append(val.astype(self.dtype, copy=False))
+            indptr.append(indptr[-1] + idx.size)
+        return CSRRows(
+            np.asarray(indptr, dtype=np.int64),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            np.concatenate(data) if data else np.zeros(0, dtype=self.dtype),
+            self.n_features,
+        )
+
+    # ---------- Artefakt ----------
+    def config(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "n_features": self.n_features,
+            "ngram_range": list(self.ngram_range),
+            "char_ngram_range": list(self.char_ngram_range) if self.char_ngram_range else None,
+            "lowercase": self.lowercase,
+            "use_idf": self.use_idf,
+            "token_pattern": self.token_pattern,
+            "n_docs": self.n_docs,
+        }
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"df": np.asarray(self.df, dtype=np.int64)} if self.use_idf else {}
+
+    @classmethod
+    def from_artifact(cls, cfg: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> "HashingFeatures":
+        return cls(
+            n_features=cfg["n_features"], ngram_range=cfg.get("ngram_range", (1, 2)),
+            char_ngram_range=cfg.get("char_ngram_range"), lowercase=cfg.get("lowercase", True),
+            use_idf=cfg.get("use_idf", True), token_pattern=cfg.get("token_pattern", r"(?u)\b\w\w+\b"),
+            df=arrays.get("df"), n_docs=cfg.get("n_docs", 0), dtype=cfg.get("dtype", "float64"),
+        )
@@ -0,0 +1,232 @@
+#===========================
+# NumPy-Inferenz (ohne sklearn/scipy)
+#===========================
+from __future__ import annotations
+import re
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class CSRRows:
+    """Minimale CSR-Matrix (nur was Featurizer, Kernel und Ähnlichkeitsindex brauchen)."""
+    __slots__ = ("indptr", "indices", "data", "shape")
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_cols: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (len(indptr) - 1, int(n_cols))
+
+    def row(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        s, e = self.indptr[i], self.indptr[i + 1]
+        return self.indices[s:e], self.data[s:e]
+
+    def to_scipy(self):
+        """Nur für die Trainings-Seite (sklearn braucht scipy.sparse)."""
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+    def dot(self, W: np.ndarray) -> np.ndarray:
+        """Sparse × Dense: pro Zeile nur die Gewichtszeilen der aktiven Features."""
+        out = np.zeros((self.shape[0], W.shape[1]), dtype=np.result_type(self.data.dtype, W.dtype))
+        for i in range(self.shape[0]):
+            idx, val = self.row(i)
+            if idx.size:
+                out[i] = val @ W[idx]
+        return out
+
+
+# ---------- Featurizer (TF-IDF wie sklearn.TfidfVectorizer) ----------
+class TfidfFeatures:
+    """
+    Nachbau von TfidfVectorizer.transform für analyzer='word':
+    Vokabular liegt als sortiertes String-Array (mmap-fähig) + Spaltenindex vor.
+    """
+
+    def __init__(self, vocab: np.ndarray, cols: np.ndarray, idf: Optional[np.ndarray], cfg: Dict[str, Any]):
+        self.vocab = vocab
+        self.cols = cols
+        self.idf = idf
+        self.n_features = int(cfg["n_features"])
+        self.lowercase = bool(cfg.get("lowercase", True))
+        self.ngram_range = tuple(cfg.get("ngram_range", (1, 1)))
+        self.sublinear_tf = bool(cfg.get("sublinear_tf", False))
+        self.norm = cfg.get("norm", "l2")
+        self.dtype = np.dtype(cfg.get("dtype", "float64"))
+        self._token_re = re.compile(cfg.get("token_pattern", r"(?u)\b\w\w+\b"))
+
+    def terms(self, text: str) -> List[str]:
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        out = list(tokens) if min_n == 1 else []
+        n_tok = len(tokens)
+        for n in range(max(min_n, 2), min(max_n + 1, n_tok + 1)):
+            for i in range(n_tok - n + 1):
+                out.append(" ".join(tokens[i:i + n]))
+        return out
+
+    def _lookup(self, terms: Sequence[str]) -> np.ndarray:
+        """Spalten der bekannten Terme (-1 = unbekannt) per Binärsuche im sortierten Vokabular."""
+        if not terms or not self.vocab.size:
+            return np.full(len(terms), -1, dtype=np.int64)
+        # Feste Breite des Vokabulars: längere Terme würden abgeschnitten → sind sicher unbekannt
+        width = self.vocab.dtype.itemsize // 4
+        fits = np.fromiter((len(t) <= width for t in terms), dtype=bool, count=len(terms))
+        q = np.asarray(terms, dtype=self.vocab.dtype)
+        pos = np.searchsorted(self.vocab, q)
+        pos[pos >= self.vocab.size] = 0
+        hit = (self.vocab[pos] == q) & fits
+        return np.where(hit, self.cols[pos], -1)
+
+    def transform(self, texts: Sequence[str]) -> CSRRows:
+        indptr = [0]
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        for text in texts:
+            counts = Counter(self.terms(text or ""))
+            cols = self._lookup(list(counts))
+            mask = cols >= 0
+            idx = cols[mask]
+            val = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))[mask]
+            if self.sublinear_tf:
+                val = np.log(val) + 1.0
+            if self.idf is not None:
+                val = val * self.idf[idx]
+            if self.norm == "l2" and val.size:
+                n = np.sqrt(np.dot(val, val))
+                if n > 0:
+                    val = val / n
+            order = np.argsort(idx, kind="stable")
+            indices.append(idx[order].astype(np.int32))
+            data.append(val[order].astype(self.dtype, copy=False))
+            indptr.append(indptr[-1] + idx.size)
+        return CSRRows(
+            np.asarray(indptr, dtype=np.int64),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+            np.concatenate(data) if data else np.zeros(0, dtype=self.dtype),
+            self.n_features,
+        )
+
+
+# ---------- Ähnlichkeitsindex (bekannte Texte) ----------
+class SimilarityIndex:
+    """Invertierter Index über L2-normierte Trainingszeilen → max. Kosinus je Anfrage."""
+
+    def __init__(self, rows: CSRRows):
+        self.n = rows.shape[0]
+        order = np.argsort(rows.indices, kind="stable")
+        row_ids = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(rows.indptr))
+        self._rows = row_ids[order]
+        self._vals = rows.data[order]
+        self._colptr = np.zeros(rows.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows.indices, minlength=rows.shape[1]), out=self._colptr[1:])
+
+    def sims(self, idx: np.ndarray, val: np.ndarray, max_postings: Optional[int] = None) -> np.ndarray:
+        """
+        Kosinus einer Anfragezeile (idx, val) zu allen Zeilen. max_postings: Spalten mit
+        mehr Einträgen überspringen (sehr häufige Terme tragen kaum bei, kosten aber am meisten).
+        """
+        sims = np.zeros(self.n, dtype=np.float64)
+        for c, v in zip(idx, val):
+            s, e = self._colptr[c], self._colptr[c + 1]
+            if e > s and (max_postings is None or e - s <= max_postings):
+                sims[self._rows[s:e]] += v * self._vals[s:e]
+        return sims
+
+    def max_sims(self, X: CSRRows) -> List[float]:
+        out: List[float] = []
+        if self.n == 0:
+            return [0.0] * X.shape[0]
+        for i in range(X.shape[0]):
+            idx, val = X.row(i)
+            if not idx.size:
+                out.append(0.0)
+                continue
+            out.append(float(self.sims(idx, val).max()))
+        return out
+
+
+# ---------- Kernel ----------
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+def _logistic(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class Layer(NamedTuple):
+    """Affine Schicht; bei int8 ist W quantisiert und scale die Spalten-Skalierung."""
+    W: np.ndarray
+    b: np.ndarray
+    scale: Optional[np.ndarray] = None
+
+
+class CompiledIntentModel:
+    """
+    Serving-Modell aus dem Artefakt: Featurizer + Schichten (W, b) + Ausgabefunktion.
+    Gleiche Schnittstelle wie IntentModel (classes, transform, predict_proba, meta).
+    Keine Eingabe-Validierung pro Aufruf – X kommt immer aus self.transform.
+    """
+
+    def __init__(self, features: TfidfFeatures, layers: List[Layer],
+                 classes: List[str], output: str, hidden_activation: str = "relu",
+                 meta: Optional[Dict[str, Any]] = None, path: Any = None, precision: str = "float64"):
+        self.features = features
+        self.layers = [l if isinstance(l, Layer) else Layer(*l) for l in layers]
+        self._classes = list(classes)
+        self.output = output
+        self.hidden_activation = hidden_activation
+        self.meta = dict(meta or {})
+        self.path = path
+        self.precision = precision
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf der Gewichte (ohne Vokabular)."""
+        return sum(a.nbytes for l in self.layers for a in l if a is not None)
+
+    @property
+    def classes(self) -> List[str]:
+        return self._classes
+
+    def transform(self, texts: Sequence[str]) -> CSRRows:
+        return self.features.transform(texts)
+
+    def index(self, texts: Sequence[str]) -> SimilarityIndex:
+        return SimilarityIndex(self.transform(texts))
+
+    def decision_function(self, X: CSRRows) -> np.ndarray:
+        # Erste Schicht sparse: nur die Gewichtszeilen der aktiven Features werden gelesen
+        W0, b0, s0 = self.layers[0]
+        h = X.dot(W0)
+        if s0 is not None:
+            h *= s0
+        h += b0
+        for W, b, scale in self.layers[1:]:
+            if self.hidden_activation == "relu":
+                np.maximum(h, 0, out=h)
+            h = h @ W
+            if scale is not None:
+                h *= scale
+            h += b
+        return h
+
+    def predict_proba(self, X: CSRRows) -> np.ndarray:
+        z = self.decision_function(X)
+        if self.output == "softmax":
+            return _softmax(z)
+        if self.output == "logistic":  # binär: eine Ausgabe
+            p = _logistic(z[:, 0])
+            return np.column_stack([1.0 - p, p])
+        if self.output == "ovr":  # One-vs-Rest (SGD log_loss)
+            p = _logistic(z)
+            return p / p.sum(axis=1, keepdims=True)
+        raise ValueError(f"Unbekannte Ausgabefunktion '{self.output}'")
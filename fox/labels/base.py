@@ -16,5 +16,14 @@ LABEL_TEXTS = {
             "  termin: <beschreibung>\n"
             "  audio an | audio aus | save | reload | showmem | showtrain | classes | labelspath | quit\n"
         )
-    }
+    },
+    # Zwischenantworten (Streaming), während ein langsamer Skill noch läuft
+    "partial": {
+        "wetter": "Einen Moment, ich schaue nach dem Wetter …",
+    },
+    # Ersatzantworten, wenn ein Skill sein Zeitbudget überschreitet oder ausgelastet ist
+    "degraded": {
+        "wetter": "Der Wetterdienst antwortet gerade nicht. Versuch es gleich noch einmal.",
+        "_default": "Das dauert gerade zu lange. Versuch es gleich noch einmal.",
+    },
 }
\ No newline at end of file
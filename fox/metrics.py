@@ -0,0 +1,191 @@
+#===========================
+# Laufzeit-Metriken (Prometheus-Textformat)
+#===========================
+# Kleine Registry ohne Fremdpaket: Histogramme mit festen Buckets, Zähler und
+# Gauges, die erst beim Abruf berechnet werden (Cache-Trefferquoten, Version).
+# Erfassen = Bucket per bisect suchen + zwei Additionen unter einer Sperre
+# (~1 µs), das Formatieren passiert nur bei GET /metrics.
+#
+# Mehrere Worker (serve.py): jeder Prozess zählt für sich; fox_process_info
+# trägt die PID, damit Scrapes unterscheidbar bleiben.
+from __future__ import annotations
+import os
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Sekunden: von 50 µs (Cache-Treffer) bis 10 s (Wetter-API mit Timeout)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # pro Label-Kombination: [Zähler je Bucket (+Inf am Ende)], Summe
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][i] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(c), s[0]) for k, (c, s) in sorted(self._series.items())]
+        for values, counts, total in items:
+            cum = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cum += n
+                le = 'le="%s"' % _num(bound)
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cum}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, values)} {_num(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, values)} {cum}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        out += [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+        return out
+
+
+class Gauge:
+    """Wert wird erst beim Abruf berechnet: fn() → [(labelvalues, wert), ...]."""
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str],
+                 fn: Callable[[], Iterable[Tuple[LabelValues, float]]]):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} gauge"]
+        out += [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in self.fn()]
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[object] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines += m.render()
+        return "\n".join(lines) + "\n"
+
+
+class FoxMetrics:
+    """
+    Metriken für Server + FoxAssistant. observe_stage passt als
+    FoxAssistant.stage_observer; observe_request kommt aus der HTTP-Middleware.
+    """
+
+    def __init__(self, fox=None):
+        self.fox = fox
+        self.registry = Registry()
+        r = self.registry
+        self.requests = r.register(Histogram(
+            "fox_http_request_duration_seconds", "Dauer von HTTP-/WebSocket-Anfragen.",
+            ("method", "path", "status")))
+        self.stages = r.register(Histogram(
+            "fox_stage_duration_seconds", "Dauer der Stufen von FoxAssistant.handle.", ("stage",)))
+        self.skills = r.register(Histogram(
+            "fox_skill_duration_seconds", "Dauer der Skill-Aufrufe (ohne Reply-Cache-Treffer).", ("skill",)))
+        self.routed = r.register(Counter(
+            "fox_routed_total", "Beantwortete Eingaben je Ziel-Label (fallback = unsicher).", ("label",)))
+        r.register(Gauge("fox_cache_hit_ratio", "Trefferquote der Vorhersage-/Antwort-Caches.",
+                         ("cache",), self._cache_ratios))
+        r.register(Gauge("fox_cache_entries", "Einträge in den Vorhersage-/Antwort-Caches.",
+                         ("cache",), self._cache_sizes))
+        r.register(Gauge("fox_model_info", "Geladene Modellversion (Wert immer 1).",
+                         ("version", "engine"), self._model_info))
+        r.register(Gauge("fox_process_info", "Worker-Prozess (Wert immer 1).",
+                         ("pid",), lambda: [((str(os.getpid()),), 1)]))
+
+    # --- Erfassen (heißer Pfad) ---
+    def observe_stage(self, stage: str, seconds: float, label: Optional[str] = None) -> None:
+        if stage == "skill":
+            self.skills.observe(seconds, label or "-")
+            return
+        self.stages.observe(seconds, stage)
+        if stage == "route":
+            self.routed.inc(label or "-")
+        elif stage == "auto_calc" and label is not None:
+            self.routed.inc(label)
+
+    def observe_request(self, method: str, path: str, status: int, seconds: float) -> None:
+        self.requests.observe(seconds, method, path, str(status))
+
+    # --- Gauges (beim Abruf) ---
+    def _cache_stats(self) -> Dict[str, Dict]:
+        if self.fox is None:
+            return {}
+        stats = self.fox.cache_stats()
+        return {k: v for k, v in stats.items() if isinstance(v, dict)}
+
+    def _cache_ratios(self):
+        return [((name,), s.get("hit_rate", 0.0)) for name, s in sorted(self._cache_stats().items())]
+
+    def _cache_sizes(self):
+        return [((name,), s.get("size", 0)) for name, s in sorted(self._cache_stats().items())]
+
+    def _model_info(self):
+        if self.fox is None:
+            return []
+        meta = self.fox.model.meta
+        return [((str(self.fox.model_version), str(meta.get("engine", "-"))), 1)]
+
+    def render(self) -> str:
+        return self.registry.render()
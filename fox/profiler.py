@@ -0,0 +1,221 @@
+#===========================
+# Sampling-Profiler für laufende Requests (opt-in)
+#===========================
+# Ein Anteil `rate` der Requests (/handle, /learn, /ws) wird markiert; solange
+# markierte Requests laufen, liest ein Hintergrund-Thread alle `interval`
+# Sekunden deren Call-Stacks (sys._current_frames) mit. Nicht markierte
+# Requests kosten nur einen Zufallswert; ohne markierte Requests schläft der
+# Sampler.
+#
+# dump() schreibt nach <out_dir>:
+#   <zeit>-<pid>.folded   Collapsed Stacks ("a;b;c 12") für flamegraph.pl / speedscope
+#   <zeit>-<pid>.top.txt  Top-N Funktionen (self/inklusive) + langsamste Requests
+#
+# Steuerung: FOX_PROFILE_RATE (0 = aus), FOX_PROFILE_INTERVAL_MS, FOX_PROFILE_DIR,
+# FOX_PROFILE_DUMP_EVERY – oder zur Laufzeit über /admin/profile (server.py).
+from __future__ import annotations
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger("fox")
+
+MAX_SLOW = 20  # langsamste Requests im Report
+MAX_DEPTH = 128
+
+Frame = Tuple[str, str, int]  # (funktion, datei, erste zeile)
+_NOT_SAMPLED = nullcontext(False)
+
+
+def _frame_name(fr: Frame) -> str:
+    func, path, line = fr
+    return f"{func} ({os.path.basename(path)}:{line})"
+
+
+def _after_fork_hook(ref: "weakref.ref[SamplingProfiler]"):
+    def hook() -> None:
+        prof = ref()
+        if prof is not None:
+            prof._after_fork()
+    return hook
+
+
+class SamplingProfiler:
+    def __init__(self, rate: float = 0.0, interval: float = 0.005,
+                 out_dir: Path = Path("profiles"), dump_every: int = 0, top: int = 30):
+        self.rate = 0.0
+        self.interval = 0.005
+        self.out_dir = Path(out_dir)
+        self.dump_every = max(0, int(dump_every))
+        self.top = top
+        self._active: Dict[int, Tuple[str, Any]] = {}   # thread-id → (name, Einstiegs-Frame)
+        self._stacks: Counter = Counter()               # Tuple[Frame, ...] → Samples
+        self._slow: List[Tuple[float, str, int]] = []   # (ms, name, samples)
+        self._requests = 0
+        self._samples = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if hasattr(os, "register_at_fork"):
+            # Threads überleben fork nicht: im Worker (serve.py) Sperre/Thread neu anlegen
+            os.register_at_fork(after_in_child=_after_fork_hook(weakref.ref(self)))
+        self.configure(rate=rate, interval=interval)
+
+    @classmethod
+    def from_env(cls) -> "SamplingProfiler":
+        return cls(
+            rate=float(os.getenv("FOX_PROFILE_RATE", "0") or 0),
+            interval=float(os.getenv("FOX_PROFILE_INTERVAL_MS", "5")) / 1000.0,
+            out_dir=Path(os.getenv("FOX_PROFILE_DIR", "profiles")),
+            dump_every=int(os.getenv("FOX_PROFILE_DUMP_EVERY", "0")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0.0
+
+    def configure(self, rate: Optional[float] = None, interval: Optional[float] = None) -> None:
+        if rate is not None:
+            self.rate = min(1.0, max(0.0, float(rate)))
+        if interval is not None:
+            self.interval = max(0.0005, float(interval))
+        if self.enabled and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, name="fox-profiler", daemon=True)
+            self._thread.start()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._active = {}
+        self._thread = None
+        self.configure()
+
+    # --- Requests markieren ---
+    def request(self, name: str) -> ContextManager[bool]:
+        """Umschließt einen Request (with …); liefert True, wenn er gesampelt wird."""
+        if not self.enabled or random.random() >= self.rate:
+            return _NOT_SAMPLED
+        return self._sampled(name)
+
+    @contextmanager
+    def _sampled(self, name: str) -> Iterator[bool]:
+        ident = threading.get_ident()
+        entry = sys._getframe(2)  # Aufrufer des with-Blocks (contextmanager → __enter__ → Aufrufer)
+        with self._lock:
+            self._active[ident] = (name, entry)
+            before = self._samples
+        self._wake.set()
+        t0 = time.perf_counter()
+        try:
+            yield True
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            with self._lock:
+                self._active.pop(ident, None)
+                self._requests += 1
+                self._slow.append((ms, name, self._samples - before))
+                if len(self._slow) > 4 * MAX_SLOW:
+                    self._slow = sorted(self._slow, reverse=True)[:MAX_SLOW]
+                due = self.dump_every and self._requests % self.dump_every == 0
+            if due:
+                self.dump()
+
+    # --- Sampler-Thread ---
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            if not self._active:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, (name, entry) in self._active.items():
+                    fr = frames.get(ident)
+                    if fr is None or ident == own:
+                        continue
+                    self._stacks[self._walk(name, fr, entry)] += 1
+                    self._samples += 1
+            del frames
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _walk(name: str, fr, entry) -> Tuple[Frame, ...]:
+        stack: List[Frame] = []
+        while fr is not None and len(stack) < MAX_DEPTH:
+            code = fr.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            if fr is entry:  # Endpoint-Funktion ist die Wurzel; darüber liegt nur Server-Maschinerie
+                break
+            fr = fr.f_back
+        stack.append((name, "", 0))
+        return tuple(reversed(stack))
+
+    # --- Auswertung ---
+    def _snapshot(self) -> Tuple[Counter, List[Tuple[float, str, int]], int, int]:
+        with self._lock:
+            return Counter(self._stacks), sorted(self._slow, reverse=True)[:MAX_SLOW], self._requests, self._samples
+
+    def hot_functions(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        stacks, _, _, total = self._snapshot()
+        own: Counter = Counter()
+        incl: Counter = Counter()
+        for stack, cnt in stacks.items():
+            own[stack[-1]] += cnt
+            for fr in set(stack):
+                incl[fr] += cnt
+        total = max(1, total)
+        rows = [{"function": _frame_name(fr) if fr[1] else fr[0],
+                 "self": own.get(fr, 0), "self_pct": round(100.0 * own.get(fr, 0) / total, 2),
+                 "total": c, "total_pct": round(100.0 * c / total, 2)}
+                for fr, c in incl.items()]
+        rows.sort(key=lambda r: (r["self"], r["total"]), reverse=True)
+        return rows[: n or self.top]
+
+    def dump(self, reset: bool = False) -> Dict[str, str]:
+        """Schreibt .folded + .top.txt; gibt die Pfade zurück (leer, wenn nichts gesampelt wurde)."""
+        stacks, slow, requests, samples = self._snapshot()
+        if not samples:
+            return {}
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        folded = self.out_dir / f"{stem}.folded"
+        top = self.out_dir / f"{stem}.top.txt"
+        with open(folded, "w", encoding="utf-8") as fh:
+            for stack, cnt in stacks.most_common():
+                names = [_frame_name(fr) if fr[1] else fr[0] for fr in stack]
+                fh.write(";".join(n.replace(";", ":") for n in names) + f" {cnt}\n")
+        with open(top, "w", encoding="utf-8") as fh:
+            fh.write(f"# {requests} gesampelte Requests, {samples} Samples à {self.interval * 1000:.1f} ms\n\n")
+            fh.write(f"{'self%':>7}{'total%':>8}{'self':>7}  funktion\n")
+            for r in self.hot_functions():
+                fh.write(f"{r['self_pct']:>7.1f}{r['total_pct']:>8.1f}{r['self']:>7}  {r['function']}\n")
+            fh.write(f"\n# langsamste Requests\n{'ms':>10}{'samples':>9}  request\n")
+            for ms, name, n in slow:
+                fh.write(f"{ms:>10.2f}{n:>9}  {name}\n")
+        log.info("Profil geschrieben: %s (%d Samples).", folded, samples)
+        if reset:
+            self.reset()
+        return {"folded": str(folded), "top": str(top)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+            self._slow.clear()
+            self._requests = 0
+            self._samples = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"enabled": self.enabled, "rate": self.rate, "interval_ms": self.interval * 1000.0,
+                    "out_dir": str(self.out_dir), "dump_every": self.dump_every,
+                    "requests": self._requests, "samples": self._samples, "active": len(self._active),
+                    "running": self._thread is not None and self._thread.is_alive()}
@@ -0,0 +1,82 @@
+#===========================
+# Schnelle JSON-/NDJSON-Antworten für den API-Server
+#===========================
+# FastAPI schickt zurückgegebene dicts erst durch jsonable_encoder (rekursive
+# Kopie) und dann durch json.dumps. Endpoints, die FastJSONResponse direkt
+# zurückgeben, überspringen beides: python-rapidjson serialisiert in C
+# (ohne rapidjson → json.dumps als Fallback).
+#
+# Große Ergebnismengen (/knowledge/search, /memory) gibt es zusätzlich als
+# NDJSON-Stream (ein Objekt pro Zeile, in Blöcken gesendet) – der Client kann
+# Zeile für Zeile verarbeiten, der Server baut kein Riesen-Dokument im Speicher.
+from __future__ import annotations
+import json
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from starlette.responses import JSONResponse, StreamingResponse
+
+try:
+    import rapidjson
+except ImportError:  # optional – Fallback auf die Standardbibliothek
+    rapidjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK = 64 * 1024  # Bytes pro gesendetem Block
+
+
+def _default(obj: Any) -> Any:
+    """Typen, die weder rapidjson noch json kennen (NumPy-Skalare, Pfade, Datumswerte …)."""
+    if hasattr(obj, "item") and callable(obj.item):        # numpy.float32 & Co.
+        return obj.item()
+    if hasattr(obj, "tolist"):                               # numpy.ndarray
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        return str(obj)
+    if hasattr(obj, "model_dump"):                           # pydantic
+        return obj.model_dump()
+    raise TypeError(f"{type(obj).__name__} ist nicht JSON-serialisierbar")
+
+
+if rapidjson is not None:
+    def dumps(obj: Any) -> bytes:
+        return rapidjson.dumps(obj, ensure_ascii=False, default=_default).encode("utf-8")
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ndjson_chunks(items: Iterable[Any], chunk_bytes: int = NDJSON_CHUNK) -> Iterator[bytes]:
+    buf = bytearray()
+    for item in items:
+        buf += dumps(item)
+        buf += b"\n"
+        if len(buf) >= chunk_bytes:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
+
+
+class NDJSONResponse(StreamingResponse):
+    def __init__(self, items: Iterable[Any], status_code: int = 200,
+                 headers: Optional[Dict[str, str]] = None):
+        super().__init__(ndjson_chunks(items), status_code=status_code,
+                         headers=headers, media_type=NDJSON_MEDIA_TYPE)
+
+
+def wants_ndjson(fmt: Optional[str], accept: Optional[str]) -> bool:
+    """?format=ndjson oder Accept: application/x-ndjson."""
+    if fmt:
+        return fmt.lower() == "ndjson"
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
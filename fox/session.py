@@ -0,0 +1,187 @@
+#===========================
+# Gesprächszustand pro Client
+#===========================
+# Gedächtnis und letzte Vorhersage gehören dem Client, nicht dem gemeinsam
+# genutzten FoxAssistant. Jede Session hat ihre eigene kleine Sperre.
+#
+# SessionStore hält die Sessions nach Client-/Session-ID:
+#   - LRU: höchstens max_sessions Sessions, die am längsten ungenutzte fliegt
+#   - TTL: Sessions ohne Zugriff seit ttl Sekunden werden verworfen
+#   - Gesamt-Obergrenze für Gedächtnis-Einträge: gekürzt wird die GRÖSSTE
+#     Session (ältester Eintrag zuerst) – ein gesprächiger Client verdrängt
+#     also nur seine eigene Historie, nicht die der anderen. Die größte Session
+#     kommt aus einem Max-Heap (veraltete Einträge werden beim Lesen verworfen).
+# Sperr-Reihenfolge: Store-Sperre → Session-Sperre (nie umgekehrt).
+from __future__ import annotations
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAX_SESSION_ID = 128
+
+
+class Session:
+    def __init__(self, session_id: str = "default", maxlen: int = 200,
+                 store: Optional["SessionStore"] = None):
+        self.id = session_id
+        self.memory: deque = deque(maxlen=maxlen)
+        self.last_input: Optional[str] = None
+        self.last_topk: List[Tuple[str, float]] = []
+        self.last_seen = time.monotonic()
+        self._store = store
+        self._lock = threading.Lock()
+
+    def remember(self, entry: Dict[str, Any]) -> None:
+        self.remember_many((entry,))
+
+    def remember_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        if self._store is not None:
+            self._store._append(self, entries)
+        else:
+            self._extend(entries)
+
+    def _extend(self, entries: Iterable[Dict[str, Any]]) -> int:
+        with self._lock:
+            before = len(self.memory)
+            self.memory.extend(entries)
+            return len(self.memory) - before
+
+    def set_last(self, text: str, topk: List[Tuple[str, float]]) -> None:
+        with self._lock:
+            self.last_input = text
+            self.last_topk = topk
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Kopie des Gedächtnisses (sicher gegen gleichzeitiges Anhängen)."""
+        with self._lock:
+            return list(self.memory)
+
+    def page(self, offset: int = 0, limit: int = 50) -> Tuple[List[Dict[str, Any]], int]:
+        """Ausschnitt in chronologischer Reihenfolge + Gesamtzahl."""
+        with self._lock:
+            total = len(self.memory)
+            items = [self.memory[i] for i in range(max(0, offset), min(total, offset + max(0, limit)))]
+        return items, total
+
+    def _trim(self, n: int) -> int:
+        with self._lock:
+            n = min(n, len(self.memory))
+            for _ in range(n):
+                self.memory.popleft()
+            return n
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+
+class SessionStore:
+    def __init__(self, max_sessions: int = 1000, ttl: float = 3600.0,
+                 per_session: int = 100, max_entries: int = 20000):
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl = float(ttl)
+        self.per_session = max(1, int(per_session))
+        self.max_entries = max(1, int(max_entries))
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._entries = 0
+        self._heap: List[Tuple[int, int, Session]] = []  # (-Größe, Zähler, Session), teils veraltet
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.evicted_lru = 0
+        self.evicted_ttl = 0
+        self.trimmed = 0
+
+    @staticmethod
+    def valid_id(session_id: Optional[str]) -> bool:
+        return bool(session_id) and len(session_id) <= MAX_SESSION_ID and session_id.isprintable()
+
+    def get(self, session_id: str) -> Session:
+        """Session holen oder anlegen (zählt als Zugriff)."""
+        if not self.valid_id(session_id):
+            raise ValueError("Ungültige Session-ID.")
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            sess = self._sessions.get(session_id)
+            if sess is None:
+                sess = Session(session_id, self.per_session, store=self)
+                self._sessions[session_id] = sess
+                while len(self._sessions) > self.max_sessions:
+                    _, old = self._sessions.popitem(last=False)
+                    self._entries -= len(old)
+                    self.evicted_lru += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            sess.last_seen = now
+            return sess
+
+    def peek(self, session_id: str) -> Optional[Session]:
+        """Session ohne Anlegen/LRU-Update (z. B. für /memory)."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return self._sessions.get(session_id)
+
+    def _expire(self, now: float) -> None:
+        # OrderedDict ist nach letztem Zugriff sortiert → abgelaufene stehen vorne
+        if self.ttl <= 0:
+            return
+        while self._sessions:
+            sid, sess = next(iter(self._sessions.items()))
+            if now - sess.last_seen < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self._entries -= len(sess)
+            self.evicted_ttl += 1
+
+    def _append(self, sess: Session, entries: Iterable[Dict[str, Any]]) -> None:
+        # Anhängen und Zählen unter derselben Sperre: eine Verdrängung dazwischen kann
+        # den Zähler nicht mehr verschieben
+        with self._lock:
+            grown = sess._extend(entries)
+            if not grown or self._sessions.get(sess.id) is not sess:  # verdrängt → zählt nicht mehr
+                return
+            self._entries += grown
+            self._push(sess)
+            while self._entries > self.max_entries:
+                biggest = self._biggest()
+                if biggest is None:
+                    break
+                cut = biggest._trim(max(1, self._entries - self.max_entries))
+                if not cut:
+                    break
+                self._entries -= cut
+                self.trimmed += cut
+                self._push(biggest)
+
+    def _push(self, sess: Session) -> None:
+        heapq.heappush(self._heap, (-len(sess), next(self._seq), sess))
+        if len(self._heap) > 4 * len(self._sessions) + 64:  # veraltete Einträge aufräumen
+            self._heap = [(-len(x), next(self._seq), x) for x in self._sessions.values() if len(x)]
+            heapq.heapify(self._heap)
+
+    def _biggest(self) -> Optional[Session]:
+        while self._heap:
+            neg, _, sess = self._heap[0]
+            if self._sessions.get(sess.id) is sess and -neg == len(sess) and neg:
+                return sess
+            heapq.heappop(self._heap)
+        return None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "entries": self._entries,
+                "max_entries": self.max_entries,
+                "per_session": self.per_session,
+                "ttl_s": self.ttl,
+                "evicted_lru": self.evicted_lru,
+                "evicted_ttl": self.evicted_ttl,
+                "trimmed": self.trimmed,
+            }
@@ -3,7 +3,7 @@
 # ===========================
 
 # Geo
-from .geo_skills import geo_skill, resolve_place, search_places
+from .geo_skills import geo_skill, geo_skill_many, resolve_place, search_places
 
 # Wetter
 from .weather_skills import get_weather
@@ -19,8 +19,13 @@ from .knowledge import (
     init_db as init_knowledge_db,
     set_fact,
     get_fact,
+    get_facts,
+    lookup_fact,
+    lookup_facts,
+    semantic_fact,
     search_facts,
     add_training_pair,
+    add_training_pairs,
     list_training,
 )
 
@@ -29,11 +34,12 @@ from .gespräch_skills import gespraech_skill
 from .termin_skills import termin_skill
 
 __all__ = [
-    "geo_skill", "resolve_place", "search_places",
+    "geo_skill", "geo_skill_many", "resolve_place", "search_places",
     "get_weather",
     "time_skill",
     "mathe_skill", "try_auto_calc",
-    "init_knowledge_db", "set_fact", "get_fact", "search_facts",
-    "add_training_pair", "list_training",
+    "init_knowledge_db", "set_fact", "get_fact", "get_facts",
+    "lookup_fact", "lookup_facts", "semantic_fact", "search_facts",
+    "add_training_pair", "add_training_pairs", "list_training",
     "gespraech_skill", "termin_skill",
 ]
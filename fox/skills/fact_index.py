@@ -0,0 +1,175 @@
+#===========================
+# Semantische Fakten-Suche (TF-IDF, inkrementell)
+#===========================
+# do_wissen findet über lookup_fact nur exakte Keys. FactIndex ordnet freie Fragen
+# ("erzähl mir was über python") dem ähnlichsten Fakt zu: Key + Wertanfang werden mit
+# HashingFeatures (Wort-Uni/Bigramme + Zeichen-n-Gramme, Online-IDF) zu L2-normierten
+# TF-IDF-Zeilen, ein invertierter Index (SimilarityIndex) liefert den Kosinus zu allen
+# Fakten in einem Durchgang über die Posting-Listen der Anfrage-Terme.
+#
+# Inkrementell wie ein LSM-Baum:
+#   base   – großer, unveränderlicher Index (beim Aufbau bzw. Zusammenführen erstellt)
+#   delta  – kleiner Index für neue/geänderte Fakten seit dem letzten Zusammenführen
+#   dead   – überholte base-Zeilen (Key wurde neu geschrieben oder gelöscht)
+# Ist delta größer als max(MERGE_MIN, MERGE_RATIO · base), werden die lebenden Zeilen
+# ohne erneutes Vektorisieren zu einem neuen base zusammengeführt. Leser greifen einen
+# unveränderlichen Zustand (_State) und brauchen keine Sperre.
+from __future__ import annotations
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fox.intent.hashing import HashingFeatures
+from fox.intent.runtime import CSRRows, SimilarityIndex
+
+VALUE_CHARS = 200     # vom Wert nur der Anfang (Kernaussage steht vorne, Index bleibt klein)
+MERGE_MIN = 256
+MERGE_RATIO = 0.1
+MAX_DF = 0.3          # Terme in mehr als 30 % der Fakten ("was", "ist") überspringen …
+MIN_POSTINGS = 2048   # … aber nur, wenn ihre Posting-Liste auch wirklich lang ist
+
+
+def _doc(key: str, value: Optional[str]) -> str:
+    return f"{key} {(value or '')[:VALUE_CHARS]}"
+
+
+def _stack(parts: Sequence[Tuple[np.ndarray, np.ndarray]], n_cols: int, dtype) -> CSRRows:
+    indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum([idx.size for idx, _ in parts], out=indptr[1:])
+    return CSRRows(
+        indptr,
+        np.concatenate([idx for idx, _ in parts]) if parts else np.zeros(0, dtype=np.int32),
+        np.concatenate([val for _, val in parts]) if parts else np.zeros(0, dtype=dtype),
+        n_cols,
+    )
+
+
+class _State(NamedTuple):
+    base: SimilarityIndex
+    base_rows: CSRRows
+    base_keys: List[str]
+    base_pos: Dict[str, int]
+    dead: np.ndarray                 # bool je base-Zeile
+    delta: SimilarityIndex
+    delta_rows: List[Tuple[np.ndarray, np.ndarray]]
+    delta_keys: List[str]
+
+
+class FactIndex:
+    def __init__(self, n_features: int = 2 ** 18):
+        self.n_features = n_features
+        self.features = self._new_features()
+        self.build_seconds = 0.0
+        self.merges = 0
+        self._lock = threading.Lock()
+        self._state = self._make_state(_stack([], n_features, np.float32), [])
+
+    def _new_features(self) -> HashingFeatures:
+        # Zeichen-4-Gramme fangen Flexion ab ("frankreichs" ~ "frankreich") bei halb so
+        # vielen Termen wie 3–5-Gramme
+        return HashingFeatures(n_features=self.n_features, ngram_range=(1, 2), char_ngram_range=(4, 4),
+                               dtype="float32")
+
+    def _make_state(self, rows: CSRRows, keys: List[str]) -> _State:
+        empty = _stack([], self.n_features, np.float32)
+        return _State(SimilarityIndex(rows), rows, keys, {k: i for i, k in enumerate(keys)},
+                      np.zeros(len(keys), dtype=bool), SimilarityIndex(empty), [], [])
+
+    # --- Aufbau / Änderungen ---
+    def build(self, items: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """Kompletter Neuaufbau aus (key, value) – IDF wird dabei neu gezählt."""
+        t = time.perf_counter()
+        items = list(dict(items).items())  # letzter Wert je Key gewinnt
+        texts = [_doc(k, v) for k, v in items]
+        features = self._new_features()
+        # Ein Durchgang statt partial_fit + transform: erst TF-Zeilen (IDF noch 1), df aus
+        # den Spalten zählen (je Zeile eindeutig), dann mit IDF gewichten und neu normieren.
+        rows = features.transform(texts)
+        features.df = np.bincount(rows.indices, minlength=self.n_features).astype(np.int64)
+        features.n_docs = len(texts)
+        features._idf = None
+        data = rows.data * features.idf[rows.indices].astype(np.float32)
+        lens = np.diff(rows.indptr)
+        nonempty = lens > 0
+        norms = np.ones(len(texts), dtype=np.float32)
+        if nonempty.any():
+            norms[nonempty] = np.sqrt(np.add.reduceat(data * data, rows.indptr[:-1][nonempty]))
+        rows.data = data / np.repeat(norms, lens)
+        with self._lock:
+            self.features = features
+            self._state = self._make_state(rows, [k for k, _ in items])
+        self.build_seconds = time.perf_counter() - t
+
+    def upsert(self, items: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """Neue/geänderte Fakten (value None → entfernen) in den delta-Index übernehmen."""
+        items = dict(items)
+        if not items:
+            return
+        live = {k: v for k, v in items.items() if v is not None}
+        texts = [_doc(k, v) for k, v in live.items()]
+        with self._lock:
+            self.features.partial_fit(texts)
+            X = self.features.transform(texts)
+            st = self._state
+            dead = st.dead.copy()
+            for k in items:
+                i = st.base_pos.get(k)
+                if i is not None:
+                    dead[i] = True
+            keep = [i for i, k in enumerate(st.delta_keys) if k not in items]
+            delta_rows = [st.delta_rows[i] for i in keep] + [X.row(i) for i in range(X.shape[0])]
+            delta_keys = [st.delta_keys[i] for i in keep] + list(live)
+            live_base = len(st.base_keys) - int(dead.sum())
+            if len(delta_keys) > max(MERGE_MIN, MERGE_RATIO * live_base):
+                self._state = self._merge(st, dead, delta_rows, delta_keys)
+                self.merges += 1
+            else:
+                delta = SimilarityIndex(_stack(delta_rows, self.n_features, np.float32))
+                self._state = st._replace(dead=dead, delta=delta, delta_rows=delta_rows, delta_keys=delta_keys)
+
+    def remove(self, keys: Iterable[str]) -> None:
+        self.upsert((k, None) for k in keys)
+
+    def _merge(self, st: _State, dead: np.ndarray, delta_rows, delta_keys) -> _State:
+        base, alive = st.base_rows, ~dead
+        lens = np.diff(base.indptr)
+        mask = np.repeat(alive, lens)
+        delta = _stack(delta_rows, self.n_features, np.float32)
+        indptr = np.zeros(int(alive.sum()) + len(delta_keys) + 1, dtype=np.int64)
+        np.cumsum(np.concatenate([lens[alive], np.diff(delta.indptr)]), out=indptr[1:])
+        rows = CSRRows(indptr, np.concatenate([base.indices[mask], delta.indices]),
+                       np.concatenate([base.data[mask], delta.data]), self.n_features)
+        keys = [k for k, a in zip(st.base_keys, alive) if a] + list(delta_keys)
+        return self._make_state(rows, keys)
+
+    # --- Suche ---
+    def search(self, text: str, k: int = 1) -> List[Tuple[str, float]]:
+        """Die k ähnlichsten Fakten-Keys mit Kosinus (absteigend)."""
+        st = self._state
+        X = self.features.transform([text])
+        idx, val = X.row(0)
+        if not idx.size or not len(self):
+            return []
+        cap = max(MIN_POSTINGS, int(MAX_DF * st.base.n))
+        sims = st.base.sims(idx, val, max_postings=cap)
+        sims[st.dead] = 0.0
+        if st.delta_keys:
+            sims = np.concatenate([sims, st.delta.sims(idx, val)])
+        k = min(k, sims.size)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        n_base = len(st.base_keys)
+        return [(st.base_keys[i] if i < n_base else st.delta_keys[i - n_base], float(sims[i]))
+                for i in top if sims[i] > 0.0]
+
+    def __len__(self) -> int:
+        st = self._state
+        return len(st.base_keys) - int(st.dead.sum()) + len(st.delta_keys)
+
+    def stats(self) -> Dict[str, float]:
+        st = self._state
+        return {"facts": len(self), "base": len(st.base_keys), "delta": len(st.delta_keys),
+                "dead": int(st.dead.sum()), "merges": self.merges,
+                "nnz": int(st.base_rows.indices.size), "build_ms": round(self.build_seconds * 1000.0, 1)}
@@ -56,6 +56,35 @@ def _normalize(s: str) -> str:
     return (s or "").strip().lower()
 
 # ---------- Public: Suche ----------
+def _search_places(cur: sqlite3.Cursor, q: str, limit: int) -> List[Dict[str, Any]]:
+    cur.execute(
+        """
+        SELECT name, country_code, population, latitude, longitude, feature_class, feature_code
+        FROM places
+        WHERE name LIKE ? COLLATE NOCASE
+        ORDER BY population DESC NULLS LAST
+        LIMIT ?
+        """,
+        (f"%{q}%", int(limit))
+    )
+    rows = cur.fetchall()
+
+    out: List[Dict[str, Any]] = []
+    for (name, cc, pop, lat, lon, fclass, fcode) in rows:
+        country_name = _country_name_from_code(cur, cc) or cc
+        out.append({
+            "type": "place",
+            "name": name,
+            "country_code": cc,
+            "country": country_name,
+            "population": int(pop) if pop is not None else None,
+            "lat": float(lat) if lat is not None else None,
+            "lon": float(lon) if lon is not None else None,
+            "feature_class": fclass,
+            "feature_code": fcode,
+        })
+    return out
+
 def search_places(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Liefert Orte (nur Top-N) – Case-insensitive. Erwartet Index auf places(name).
@@ -63,40 +92,12 @@ def search_places(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     q = (query or "").strip()
     if not q:
         return []
-    like = f"%{q}%"
-
     with closing(_open()) as con, closing(con.cursor()) as cur:
-        cur.execute(
-            """
-            SELECT name, country_code, population, latitude, longitude, feature_class, feature_code
-            FROM places
-            WHERE name LIKE ? COLLATE NOCASE
-            ORDER BY population DESC NULLS LAST
-            LIMIT ?
-            """,
-            (like, int(limit))
-        )
-        rows = cur.fetchall()
-
-        out: List[Dict[str, Any]] = []
-        for (name, cc, pop, lat, lon, fclass, fcode) in rows:
-            country_name = _country_name_from_code(cur, cc) or cc
-            out.append({
-                "type": "place",
-                "name": name,
-                "country_code": cc,
-                "country": country_name,
-                "population": int(pop) if pop is not None else None,
-                "lat": float(lat) if lat is not None else None,
-                "lon": float(lon) if lon is not None else None,
-                "feature_class": fclass,
-                "feature_code": fcode,
-            })
-        return out
+        return _search_places(cur, q, limit)
 
-def best_match(query: str) -> Optional[Dict[str, Any]]:
-    """Beste Übereinstimmung für Ortsnamen – exakter Normalisierungsvergleich, sonst größte Bevölkerung."""
-    candidates = search_places(query, limit=10)
+def _best_match(cur: sqlite3.Cursor, query: str) -> Optional[Dict[str, Any]]:
+    q = (query or "").strip()
+    candidates = _search_places(cur, q, 10) if q else []
     if not candidates:
         return None
     qn = _normalize(query)
@@ -108,55 +109,65 @@ def best_match(query: str) -> Optional[Dict[str, Any]]:
         return max(with_pop, key=lambda x: x["population"])
     return candidates[0]
 
-def search_country_by_name(query: str) -> Optional[Dict[str, Any]]:
-    """
-    Länder-Suche über iso2 (englischer Name + ISO2 + Synonyme).
-    Gibt ein 'country'-Dict zurück (ohne Koordinaten).
-    """
+def best_match(query: str) -> Optional[Dict[str, Any]]:
+    """Beste Übereinstimmung für Ortsnamen – exakter Normalisierungsvergleich, sonst größte Bevölkerung."""
+    with closing(_open()) as con, closing(con.cursor()) as cur:
+        return _best_match(cur, query)
+
+def _search_country_by_name(cur: sqlite3.Cursor, query: str) -> Optional[Dict[str, Any]]:
     q_raw = (query or "").strip()
     if not q_raw:
         return None
     q = q_raw.lower()
 
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        # Name (englisch)
+    # Name (englisch)
+    try:
+        cur.execute("SELECT name, code FROM iso2 WHERE name LIKE ? COLLATE NOCASE LIMIT 1", (f"%{q_raw}%",))
+        row = cur.fetchone()
+        if row:
+            name, code = row
+            return {"type": "country", "name": name, "country": name, "iso2": code}
+    except Exception:
+        pass
+    # ISO2-Code
+    try:
+        cur.execute("SELECT name, code FROM iso2 WHERE code = ? COLLATE NOCASE LIMIT 1", (q_raw.upper(),))
+        row = cur.fetchone()
+        if row:
+            name, code = row
+            return {"type": "country", "name": name, "country": name, "iso2": code}
+    except Exception:
+        pass
+    # Synonyme (Deutsch → Englisch/Code)
+    for syn in COUNTRY_SYNONYMS.get(q, []):
         try:
-            cur.execute("SELECT name, code FROM iso2 WHERE name LIKE ? COLLATE NOCASE LIMIT 1", (f"%{q_raw}%",))
+            cur.execute("SELECT name, code FROM iso2 WHERE name LIKE ? COLLATE NOCASE LIMIT 1", (f"%{syn}%",))
             row = cur.fetchone()
             if row:
                 name, code = row
                 return {"type": "country", "name": name, "country": name, "iso2": code}
         except Exception:
             pass
-        # ISO2-Code
         try:
-            cur.execute("SELECT name, code FROM iso2 WHERE code = ? COLLATE NOCASE LIMIT 1", (q_raw.upper(),))
+            cur.execute("SELECT name, code FROM iso2 WHERE code = ? COLLATE NOCASE LIMIT 1", (syn.upper(),))
             row = cur.fetchone()
             if row:
                 name, code = row
                 return {"type": "country", "name": name, "country": name, "iso2": code}
         except Exception:
             pass
-        # Synonyme (Deutsch → Englisch/Code)
-        for syn in COUNTRY_SYNONYMS.get(q, []):
-            try:
-                cur.execute("SELECT name, code FROM iso2 WHERE name LIKE ? COLLATE NOCASE LIMIT 1", (f"%{syn}%",))
-                row = cur.fetchone()
-                if row:
-                    name, code = row
-                    return {"type": "country", "name": name, "country": name, "iso2": code}
-            except Exception:
-                pass
-            try:
-                cur.execute("SELECT name, code FROM iso2 WHERE code = ? COLLATE NOCASE LIMIT 1", (syn.upper(),))
-                row = cur.fetchone()
-                if row:
-                    name, code = row
-                    return {"type": "country", "name": name, "country": name, "iso2": code}
-            except Exception:
-                pass
     return None
 
+def search_country_by_name(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Länder-Suche über iso2 (englischer Name + ISO2 + Synonyme).
+    Gibt ein 'country'-Dict zurück (ohne Koordinaten).
+    """
+    if not (query or "").strip():
+        return None
+    with closing(_open()) as con, closing(con.cursor()) as cur:
+        return _search_country_by_name(cur, query)
+
 # ---------- Parsing/Resolver für Texte (nur Geo – kein Wetter) ----------
 _LOC_PAT = re.compile(r"\b(?:in|über|zu|nach|für)\s+([A-Za-zÄÖÜäöüß\-’']+)", re.IGNORECASE)
 _WHERE_IS_PAT = re.compile(r"\b(?:wo\s+ist|where\s+is)\s+([A-Za-zÄÖÜäöüß\-’']+)", re.IGNORECASE)
@@ -175,6 +186,15 @@ def _guess_place_query(text: str) -> Optional[str]:
         return tokens[-1]
     return None
 
+def _resolve_place(cur: sqlite3.Cursor, text: str) -> Optional[Dict[str, Any]]:
+    q = _guess_place_query(text) or (text or "").strip()
+    if not q:
+        return None
+    hit = _best_match(cur, q)
+    if hit:
+        return hit
+    return _search_country_by_name(cur, q)
+
 def resolve_place(text: str) -> Optional[Dict[str, Any]]:
     """
     Versucht zuerst 'places', dann 'iso2' (als country) – gibt entweder
@@ -183,10 +203,8 @@ def resolve_place(text: str) -> Optional[Dict[str, Any]]:
     q = _guess_place_query(text) or (text or "").strip()
     if not q:
         return None
-    hit = best_match(q)
-    if hit:
-        return hit
-    return search_country_by_name(q)
+    with closing(_open()) as con, closing(con.cursor()) as cur:
+        return _resolve_place(cur, text)
 
 # ---------- Ausgabe für Geo-Infos ----------
 def format_place_info(place: Dict[str, Any]) -> str:
@@ -211,3 +229,22 @@ def geo_skill(text: str, ctx: Dict[str, Any] | None = None) -> str:
     if not place:
         return "Sag mir einen Ort, z. B. 'Infos über Zürich'."
     return format_place_info(place)
+
+def geo_skill_many(texts: List[str]) -> List[str]:
+    """
+    Batch-Variante von geo_skill: eine DB-Verbindung für alle Texte,
+    gleiche Orts-Anfragen werden nur einmal aufgelöst.
+    """
+    if not texts:
+        return []
+    resolved: Dict[str, Optional[Dict[str, Any]]] = {}
+    with closing(_open()) as con, closing(con.cursor()) as cur:
+        for t in texts:
+            q = _guess_place_query(t) or (t or "").strip()
+            if q not in resolved:
+                resolved[q] = _resolve_place(cur, t) if q else None
+    out: List[str] = []
+    for t in texts:
+        place = resolved.get(_guess_place_query(t) or (t or "").strip())
+        out.append(format_place_info(place) if place else "Sag mir einen Ort, z. B. 'Infos über Zürich'.")
+    return out
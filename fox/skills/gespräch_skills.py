@@ -2,10 +2,11 @@
 # Gesprächs-Skill 
 # =============================
 from __future__ import annotations
-import re
 import random
 from typing import Optional, Dict
 
+from ..triggers import match_phrases
+
 # Die Sub-Klassen orientieren sich an deinen Label-Beispielen:
 # - smalltalk:  wie geht's, witz, was machst du, lieblingsessen
 # - begrüßung:  hi, hallo, guten morgen/abend/tag, servus, moin, grüezi
@@ -15,36 +16,15 @@ from typing import Optional, Dict
 # Siehe deine Trainingssätze in gespräch_labels.py.
 
 # --- Wörterlisten / Muster ---
-_GREET_WORDS = (
-    "hallo", "hi", "hey", "servus", "moin", "grüezi",
-    "guten morgen", "guten abend", "guten tag", "gute nacht"
-)
-_BYE_WORDS = (
-    "tschüss", "tschuess", "ciao", "auf wiedersehen",
-    "bis später", "bis spaeter", "bis bald", "mach's gut", "machs gut"
-)
-
-# Smalltalk-Trigger (Regex, robust gegen Varianten)
-_RE_HOW_ARE_YOU = re.compile(r"\b(wie\s+geht(?:'s| es)?( dir)?|wie\s+läuft'?s|alles\s+gut)\b", re.I)
-_RE_JOKE        = re.compile(r"\b(witz|joke)\b", re.I)
-_RE_WHAT_DO     = re.compile(r"\b(was\s+machst\s+du\s+so|was\s+machst\s+du)\b", re.I)
-_RE_FAVORITE    = re.compile(r"\b(lieblingsessen|lieblings\s*essen)\b", re.I)
-
-# Info-Trigger
-_RE_WHO_ARE_YOU = re.compile(r"\b(wer\s+bist\s+du)\b", re.I)
-_RE_WHAT_CAN    = re.compile(r"\b(was\s+kannst\s+du(?:\s+alles)?)\b", re.I)
-
-
-def _has_any(text: str, phrases: tuple[str, ...]) -> bool:
-    t = " " + (text or "").lower().strip() + " "
-    return any((" " + p + " ") in t for p in phrases)
-
-
-def _reply_greeting(t: str) -> str:
-    if "guten morgen" in t:   return "Guten Morgen! Wie kann ich dir helfen?"
-    if "guten abend" in t:    return "Guten Abend! Was brauchst du?"
-    if "guten tag" in t:      return "Guten Tag! Womit kann ich helfen?"
-    if "gute nacht" in t:     return "Gute Nacht! Ich bin trotzdem da, falls du noch was brauchst."
+# Begrüßung, Abschied, Smalltalk- und Info-Trigger liegen zentral in fox/triggers.py
+# (Klassen greet, bye, smalltalk.*, info.*) und werden dort mit einem Automaten erkannt.
+
+
+def _reply_greeting(greet: set[str]) -> str:
+    if "guten morgen" in greet:   return "Guten Morgen! Wie kann ich dir helfen?"
+    if "guten abend" in greet:    return "Guten Abend! Was brauchst du?"
+    if "guten tag" in greet:      return "Guten Tag! Womit kann ich helfen?"
+    if "gute nacht" in greet:     return "Gute Nacht! Ich bin trotzdem da, falls du noch was brauchst."
     return random.choice([
         "Hi! Wie kann ich dir helfen?",
         "Hey! Was kann ich für dich tun?",
@@ -60,13 +40,13 @@ def _reply_bye() -> str:
     ])
 
 
-def _reply_smalltalk(t: str) -> Optional[str]:
-    if _RE_HOW_ARE_YOU.search(t):
+def _reply_smalltalk(classes: set[str]) -> Optional[str]:
+    if "smalltalk.how" in classes:
         return random.choice([
             "Mir geht’s gut, danke! Und dir?",
         ])
     
-    if _RE_JOKE.search(t):
+    if "smalltalk.joke" in classes:
         jokes = [
             "Warum können Seeräuber schlecht programmieren? – Weil sie C nicht kennen… Arr!",
             "Ich habe einen Witz über UDP… egal, ob er ankommt. 😄",
@@ -74,18 +54,18 @@ def _reply_smalltalk(t: str) -> Optional[str]:
         ]
         return random.choice(jokes)
     
-    if _RE_WHAT_DO.search(t):
+    if "smalltalk.what_do" in classes:
         return "Ich helfe dir mit Zeit, Terminen, Mathe, Geo/Orten, Wetter und kurzem Wissen. Sag einfach, was du brauchst."
     
-    if _RE_FAVORITE.search(t):
+    if "smalltalk.favorite" in classes:
         return "Ich esse nicht – aber ich bin Fan von gut strukturiertem Code und klaren Antworten. 😄"
     return None
 
 
-def _reply_info(t: str) -> Optional[str]:
-    if _RE_WHO_ARE_YOU.search(t):
+def _reply_info(classes: set[str]) -> Optional[str]:
+    if "info.who" in classes:
         return "Ich bin Fox, dein Assistent. Frag mich nach Uhrzeit/Datum, Terminen, Mathe, Geo/Orten, Wetter oder kurzem Fakten-Wissen."
-    if _RE_WHAT_CAN.search(t):
+    if "info.what_can" in classes:
         return ("Ich kann: Uhrzeit/Datum sagen, einfache Termine speichern, Mathe rechnen, Orte/Geo-Infos auflösen, "
                 "Wetter abrufen (mit API-Key), und kurzes Wissen zusammenfassen. Sag einfach, was du willst.")
     return None
@@ -100,23 +80,25 @@ def gespraech_skill(text: str, ctx: Dict | None = None) -> str:
       - smalltalk   → 'wie geht's', Witz, 'was machst du so', 'Lieblingsessen'
       - sonst       → neutrale Rückfrage
     """
-    t = (text or "").strip().lower()
+    # Ein Scan über alle Trigger (fox/triggers.py)
+    hits = match_phrases(text)
+    classes = {c for c, _ in hits}
 
     # 1) Begrüßung
-    if _has_any(t, _GREET_WORDS):
-        return _reply_greeting(t)
+    if "greet" in classes:
+        return _reply_greeting({p for c, p in hits if c == "greet"})
 
     # 2) Verabschiedung
-    if _has_any(t, _BYE_WORDS):
+    if "bye" in classes:
         return _reply_bye()
 
     # 3) Info
-    info = _reply_info(t)
+    info = _reply_info(classes)
     if info:
         return info
 
     # 4) Smalltalk
-    small = _reply_smalltalk(t)
+    small = _reply_smalltalk(classes)
     if small:
         return small
 
@@ -1,94 +1,823 @@
+#===========================
+# Knowledge-DB (Facts, Notizen, Training)
+#===========================
+# Eine KnowledgeStore-Instanz je Datenbankdatei:
+#   - eine dauerhafte Verbindung pro Thread (keine connect()/PRAGMA-Kosten pro Aufruf)
+#   - Schema wird einmal pro Store angelegt (init_db beim Start oder erste Verbindung)
+#   - Prepared Statements bleiben im Statement-Cache der Verbindung (feste SQL-Texte,
+#     IN-Listen über json_each → ein Statement für jede Anzahl Keys)
+#   - Schreibzugriffe laufen in store.transaction(); verschachtelte Aufrufe teilen sich
+#     eine Transaktion, Batch-Funktionen (set_facts, add_training_pairs) schreiben
+#     mit executemany in einem Commit
+#   - Volltextsuche: FTS5-Indizes facts_fts (key, value) und notes_fts (title, content,
+#     tags) als External-Content-Tabellen, per Trigger synchron gehalten. Suche mit
+#     BM25-Ranking, Präfix-Treffern fürs letzte Wort ("pyth" → python), Limit und Keyset-Cursor
+#     (score, rowid) – kein Tabellenscan, kein OFFSET
+#   - FactCache vor get_fact/lookup_fact: Treffer und Fehlschläge im Speicher,
+#     set_fact/set_facts schreiben nach dem Commit durch (write-through). Schreibt ein
+#     anderer Prozess (serve.py-Worker), merkt das PRAGMA data_version – geprüft höchstens
+#     alle FACT_CACHE_CHECK Sekunden, dann wird der Cache geleert
+#   - semantic_fact: TF-IDF-Ähnlichkeit über Key + Wert (fact_index.FactIndex) für freie
+#     Fragen. Eigene Schreibzugriffe gehen direkt in den Index, fremde werden über
+#     updated_at (Index idx_facts_updated) nachgezogen
+#
+# DB_PATH bleibt ein Modul-Global (fox_eval/fox_load biegen ihn um); store() legt bei
+# geändertem Pfad einen neuen Store an. Vor einem fork() (serve.py) werden alle
+# Verbindungen geschlossen – SQLite-Verbindungen dürfen nicht in Kindprozesse wandern.
+from __future__ import annotations
+import json
+import logging
+import os
+import re
 import sqlite3
-from pathlib import Path
-from contextlib import closing
+import threading
 import time
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fox.cache import MISSING, FactCache
+from fox.skills.fact_index import FactIndex
+
+log = logging.getLogger("fox")
 
 DB_PATH = Path(__file__).resolve().parents[2] / "knowledge.db"
 
-def _open():
-    con = sqlite3.connect(DB_PATH)
-    con.execute("PRAGMA journal_mode=WAL;")
-    con.execute("PRAGMA temp_store=MEMORY;")
-    return con
+STATEMENT_CACHE = 64
+BUSY_TIMEOUT = 5.0  # Sekunden warten, wenn ein anderer Thread/Worker gerade schreibt
+SEARCH_LIMIT = 20
+FACT_CACHE_SIZE = int(os.getenv("FOX_FACT_CACHE", "4096"))                 # Einträge, 0 = aus
+FACT_CACHE_BYTES = int(os.getenv("FOX_FACT_CACHE_BYTES", str(4 << 20)))
+FACT_CACHE_CHECK = 0.1  # Sekunden zwischen zwei data_version-Prüfungen (andere Prozesse)
+SEMANTIC_MIN_SIM = float(os.getenv("FOX_WISSEN_MIN_SIM", "0.25"))  # Kosinus ab dem ein Fakt passt
+BULK_REINDEX = 5000  # größere Commits (Import) verwerfen den semantischen Index statt ihn fortzuschreiben
+SEMANTIC_SYNC_BUILD = 20000  # bis zu so vielen Fakten wird der Index beim ersten Zugriff gebaut, sonst im Hintergrund
+# BM25-Gewichte je Spalte: Treffer im Key zählen doppelt
+FACT_WEIGHTS = (2.0, 1.0)
+NOTE_WEIGHTS = (3.0, 1.0, 2.0)
+
+_SCHEMA = (
+    # Facts (Key/Value)
+    """
+    CREATE TABLE IF NOT EXISTS facts (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at REAL
+    )
+    """,
+    # Notizen (optional)
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        content TEXT,
+        tags TEXT,
+        created_at REAL,
+        updated_at REAL
+    )
+    """,
+    # Training (User-Text → Label)
+    """
+    CREATE TABLE IF NOT EXISTS training (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        text  TEXT NOT NULL,
+        label TEXT NOT NULL,
+        created_at REAL
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_training_unique
+    ON training(text, label)
+    """,
+    # Gelöschte Trainingspaare (fortlaufend über seq), damit TrainingCorpus auch
+    # Löschungen anderer Prozesse inkrementell nachziehen kann
+    """
+    CREATE TABLE IF NOT EXISTS training_deleted (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        label TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS training_ad AFTER DELETE ON training BEGIN
+        INSERT INTO training_deleted(id, text, label) VALUES (old.id, old.text, old.label);
+    END
+    """,
+    # Auto-Lernen: unsichere Eingaben (normalisiert) mit letzter Vorhersage, begrenzt
+    # über last_seen (älteste fliegen zuerst), siehe fox/autolearn.py
+    """
+    CREATE TABLE IF NOT EXISTS learn_queue (
+        text TEXT PRIMARY KEY,
+        label TEXT,
+        conf REAL,
+        topk TEXT,
+        via TEXT,
+        hits INTEGER NOT NULL DEFAULT 0,
+        first_seen REAL,
+        last_seen REAL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_learn_queue_seen
+    ON learn_queue(last_seen)
+    """,
+    # Änderungen seit dem letzten Stand (semantischer Index anderer Prozesse)
+    """
+    CREATE INDEX IF NOT EXISTS idx_facts_updated
+    ON facts(updated_at)
+    """,
+)
+
+# Volltextindex (External Content: Text steht nur in facts/notes). Die Trigger halten ihn
+# bei INSERT/UPDATE/DELETE synchron; set_fact schreibt per UPSERT, damit ein Überschreiben
+# ein UPDATE ist (REPLACE löscht ohne Delete-Trigger).
+_FTS = {
+    "facts_fts": (
+        """
+        CREATE VIRTUAL TABLE facts_fts USING fts5(
+            key, value, content='facts', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS facts_fts_ai AFTER INSERT ON facts BEGIN
+            INSERT INTO facts_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS facts_fts_ad AFTER DELETE ON facts BEGIN
+            INSERT INTO facts_fts(facts_fts, rowid, key, value) VALUES ('delete', old.rowid, old.key, old.value);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS facts_fts_au AFTER UPDATE ON facts BEGIN
+            INSERT INTO facts_fts(facts_fts, rowid, key, value) VALUES ('delete', old.rowid, old.key, old.value);
+            INSERT INTO facts_fts(rowid, key, value) VALUES (new.rowid, new.key, new.value);
+        END
+        """,
+    ),
+    "notes_fts": (
+        """
+        CREATE VIRTUAL TABLE notes_fts USING fts5(
+            title, content, tags, content='notes', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts(rowid, title, content, tags) VALUES (new.id, new.title, new.content, new.tags);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, title, content, tags)
+            VALUES ('delete', old.id, old.title, old.content, old.tags);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE ON notes BEGIN
+            INSERT INTO notes_fts(notes_fts, rowid, title, content, tags)
+            VALUES ('delete', old.id, old.title, old.content, old.tags);
+            INSERT INTO notes_fts(rowid, title, content, tags) VALUES (new.id, new.title, new.content, new.tags);
+        END
+        """,
+    ),
+}
+
+_SQL_SET_FACT = ("INSERT INTO facts(key,value,updated_at) VALUES(?,?,?) "
+                 "ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at")
+# Mehrzeilig über json_each: ein Statement je Block. FTS5 schreibt seine Puffer am Ende
+# jedes Statements weg – executemany mit Trigger wäre ~20× langsamer.
+_SQL_SET_FACTS = ("INSERT INTO facts(key,value,updated_at) "
+                  "SELECT value->>0, value->>1, ? FROM json_each(?) WHERE true "
+                  "ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at")
+WRITE_CHUNK = 5000
+_SQL_GET_FACT = "SELECT value FROM facts WHERE key=?"
+_SQL_GET_FACTS = "SELECT key,value FROM facts WHERE key IN (SELECT value FROM json_each(?))"
+# Keyset-Paginierung: (score, rowid) > Cursor; erste Seite mit (-inf, -1)
+_SQL_SEARCH_FACTS = f"""
+    SELECT f.key, f.value, m.score, m.rid FROM (
+        SELECT rowid AS rid, bm25(facts_fts, {FACT_WEIGHTS[0]}, {FACT_WEIGHTS[1]}) AS score
+        FROM facts_fts WHERE facts_fts MATCH ?
+    ) AS m JOIN facts AS f ON f.rowid = m.rid
+    WHERE (m.score, m.rid) > (?, ?) ORDER BY m.score, m.rid LIMIT ?
+"""
+_SQL_SEARCH_NOTES = f"""
+    SELECT n.id, n.title, n.content, n.tags, m.score FROM (
+        SELECT rowid AS rid, bm25(notes_fts, {NOTE_WEIGHTS[0]}, {NOTE_WEIGHTS[1]}, {NOTE_WEIGHTS[2]}) AS score
+        FROM notes_fts WHERE notes_fts MATCH ?
+    ) AS m JOIN notes AS n ON n.id = m.rid
+    WHERE (m.score, m.rid) > (?, ?) ORDER BY m.score, m.rid LIMIT ?
+"""
+_SQL_ADD_TRAINING = "INSERT OR IGNORE INTO training(text,label,created_at) VALUES(?,?,?)"
+_SQL_LIST_TRAINING = "SELECT text, label FROM training ORDER BY id ASC"
+_SQL_DELETE_TRAINING = "DELETE FROM training WHERE text=? AND label=?"
+# Inkrementell: neue Zeilen ab der Hochwassermarke, Löschungen bereits gelesener Zeilen
+_SQL_TRAINING_SINCE = "SELECT id, text, label FROM training WHERE id > ? ORDER BY id"
+_SQL_TRAINING_DELETED = ("SELECT id, text, label FROM training_deleted WHERE seq > ? AND id <= ? "
+                         "ORDER BY seq")
+_SQL_TRAINING_DELETED_SEQ = "SELECT COALESCE(MAX(seq), 0) FROM training_deleted"
+
+_SQL_ENQUEUE_LEARN = """
+INSERT INTO learn_queue(text, label, conf, topk, via, hits, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(text) DO UPDATE SET label=excluded.label, conf=excluded.conf, topk=excluded.topk,
+    via=excluded.via, hits=hits + excluded.hits, last_seen=excluded.last_seen
+"""
+_SQL_TRIM_LEARN = """
+DELETE FROM learn_queue WHERE text IN (
+    SELECT text FROM learn_queue ORDER BY last_seen
+    LIMIT max(0, (SELECT COUNT(*) FROM learn_queue) - ?)
+)
+"""
+_SQL_LEARN_QUEUE = ("SELECT text, label, conf, topk, via, hits, first_seen, last_seen FROM learn_queue "
+                    "WHERE hits >= ? ORDER BY hits DESC, last_seen DESC LIMIT ?")
+_SQL_TAKE_LEARN = "DELETE FROM learn_queue WHERE text=?"
+
+# Export: seitenweise über rowid (Keyset), nie die ganze Tabelle im Speicher
+_SQL_PAGE = {
+    "facts": "SELECT rowid, key, value, updated_at FROM facts WHERE rowid > ? ORDER BY rowid LIMIT ?",
+    "training": "SELECT id, text, label, created_at FROM training WHERE id > ? ORDER BY id LIMIT ?",
+}
+TABLE_COLUMNS = {"facts": ("key", "value", "updated_at"), "training": ("text", "label", "created_at")}
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_FIRST_PAGE = (float("-inf"), -1)
+
+
+def fts_query(q: str, prefix: bool = True) -> Optional[str]:
+    """
+    Freitext → FTS5-Ausdruck: alle Wörter müssen vorkommen (AND), das letzte auch als
+    Präfix ("was ist pyth" → python). Wörter werden gequotet, Operatoren/Sonderzeichen
+    der Eingabe haben keine Wirkung. None, wenn kein Wort übrig bleibt.
+    """
+    words = _WORD.findall(q or "")
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    if prefix:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def encode_cursor(score: float, rowid: int) -> str:
+    return f"{score!r}:{rowid}"
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[float, int]:
+    """Cursor aus einer vorherigen Seite; ValueError bei ungültigem Format."""
+    if not cursor:
+        return _FIRST_PAGE
+    score, _, rowid = cursor.rpartition(":")
+    return float(score), int(rowid)
+
+
+class KnowledgeStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._generation = 0
+        # (Thread, Verbindung) – für close(); Verbindungen beendeter Threads werden beim
+        # nächsten Öffnen aufgeräumt
+        self._cons: List[Tuple[weakref.ref, sqlite3.Connection]] = []
+        self.cache = FactCache(FACT_CACHE_SIZE, FACT_CACHE_BYTES)
+        # eigene Verbindung nur für PRAGMA data_version (Wert ist je Verbindung)
+        self._watch: Optional[sqlite3.Connection] = None
+        self._watch_version = 0
+        self._watch_lock = threading.Lock()
+        self._checked = 0.0
+        self._fact_index: Optional[FactIndex] = None
+        self._index_hwm = 0.0       # höchstes updated_at, das im Index steckt
+        self._index_stale = False   # fremde Schreibzugriffe seit dem letzten Abgleich
+        self._index_building = False
+        self._index_lock = threading.Lock()
+
+    # --- Verbindungen ---
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                              check_same_thread=False, cached_statements=STATEMENT_CACHE)
+        con.execute("PRAGMA journal_mode=WAL;")
+        con.execute("PRAGMA synchronous=NORMAL;")
+        con.execute("PRAGMA temp_store=MEMORY;")
+        if not self._schema_ready:
+            self._ensure_schema(con)
+        with self._lock:
+            alive = []
+            for ref, other in self._cons:
+                th = ref()
+                if th is not None and th.is_alive():
+                    alive.append((ref, other))
+                else:
+                    other.close()
+            alive.append((weakref.ref(threading.current_thread()), con))
+            self._cons = alive
+            gen = self._generation
+        self._local.con = con
+        self._local.gen = gen
+        self._local.depth = 0
+        self._local.pending = {}
+        return con
+
+    def _con(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None or self._local.gen != self._generation:
+            con = self._connect()
+        return con
+
+    def _check_foreign_writes(self) -> None:
+        """
+        Cache leeren, wenn seit der letzten Prüfung jemand anderes als die Watch-Verbindung
+        committet hat. Das schließt eigene Threads ein (harmlos: Schreiben ist selten).
+        """
+        now = time.monotonic()
+        if now - self._checked < FACT_CACHE_CHECK or not self._watch_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked = now
+            if self._watch is None:
+                self._watch = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+                self._watch_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+                self.cache.invalidate()  # Stand vor dieser Verbindung ist unbekannt
+                self._index_stale = True
+                return
+            ver = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if ver != self._watch_version:
+                self._watch_version = ver
+                self.cache.invalidate()
+                self._index_stale = True
+        finally:
+            self._watch_lock.release()
+
+    def _ensure_schema(self, con: sqlite3.Connection) -> None:
+        with self._lock:
+            if self._schema_ready:
+                return
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                for ddl in _SCHEMA:
+                    con.execute(ddl)
+                have = {r[0] for r in con.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name IN ('facts_fts','notes_fts')")}
+                for name, ddls in _FTS.items():
+                    if name not in have:
+                        con.execute(ddls[0])
+                    for ddl in ddls[1:]:
+                        con.execute(ddl)
+                    if name not in have:  # bestehende Daten einmalig indizieren
+                        con.execute(f"INSERT INTO {name}({name}) VALUES('rebuild')")
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            self._schema_ready = True
+
+    def init(self) -> None:
+        """Schema sicherstellen (einmal beim Start)."""
+        self._con()
+
+    def close(self) -> None:
+        """Alle Verbindungen schließen; Threads öffnen beim nächsten Zugriff neu."""
+        with self._lock:
+            cons, self._cons = self._cons, []
+            self._generation += 1
+        with self._watch_lock:
+            if self._watch is not None:
+                cons.append((None, self._watch))
+                self._watch = None
+        for _, con in cons:
+            con.close()
+        self.cache.invalidate()
+        self._index_stale = True
+
+    def checkpoint(self) -> None:
+        """WAL in die Hauptdatei schreiben (vor dem Kopieren der .db-Datei, z. B. Snapshots)."""
+        self._con().execute("PRAGMA wal_checkpoint(FULL);")
+
+    # --- Transaktionen ---
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Schreibtransaktion (BEGIN IMMEDIATE … COMMIT). Verschachtelt: nur die äußerste
+        committet, alle Schreibzugriffe darin landen in einem Commit.
+        """
+        con = self._con()
+        local = self._local
+        if local.depth:
+            local.depth += 1
+            try:
+                yield con
+            finally:
+                local.depth -= 1
+            return
+        con.execute("BEGIN IMMEDIATE")
+        local.depth = 1
+        try:
+            yield con
+        except BaseException:
+            local.depth = 0
+            pending, local.pending = local.pending, {}
+            con.execute("ROLLBACK")
+            if pending:
+                self.cache.invalidate(pending)
+            raise
+        local.depth = 0
+        pending, local.pending = local.pending, {}
+        con.execute("COMMIT")
+        if pending:
+            self.cache.write(pending)
+            if self._fact_index is not None:
+                if len(pending) > BULK_REINDEX:
+                    self._fact_index = None  # beim nächsten Zugriff neu aufbauen
+                else:
+                    self._fact_index.upsert(pending.items())
+
+    # --- Facts ---
+    def set_fact(self, key: str, value: str) -> None:
+        with self.transaction() as con:
+            con.execute(_SQL_SET_FACT, (key, value, time.time()))
+            self._local.pending[key] = value
+
+    def set_facts(self, items: Iterable[Tuple[str, str]]) -> int:
+        now = time.time()
+        rows = [(k, v) for k, v in items]
+        if rows:
+            with self.transaction() as con:
+                for i in range(0, len(rows), WRITE_CHUNK):
+                    con.execute(_SQL_SET_FACTS, (now, json.dumps(rows[i:i + WRITE_CHUNK], ensure_ascii=False)))
+                self._local.pending.update(rows)
+        return len(rows)
+
+    def get_fact(self, key: str) -> Optional[str]:
+        con = self._con()
+        self._check_foreign_writes()
+        val = self.cache.get(key)
+        if val is not None:
+            return None if val is MISSING else val
+        gen = self.cache.generation
+        row = con.execute(_SQL_GET_FACT, (key,)).fetchone()
+        val = row[0] if row else None
+        self.cache.put(key, val, gen)
+        return val
+
+    def get_facts(self, keys) -> dict[str, str]:
+        """{key: value} für alle vorhandenen Keys: Cache zuerst, der Rest in einer Abfrage."""
+        uniq = list(dict.fromkeys(k for k in keys if k))
+        if not uniq:
+            return {}
+        con = self._con()
+        self._check_foreign_writes()
+        out: Dict[str, str] = {}
+        todo = []
+        for k in uniq:
+            val = self.cache.get(k)
+            if val is None:
+                todo.append(k)
+            elif val is not MISSING:
+                out[k] = val
+        if todo:
+            gen = self.cache.generation
+            found = dict(con.execute(_SQL_GET_FACTS, (json.dumps(todo),)).fetchall())
+            for k in todo:
+                self.cache.put(k, found.get(k), gen)
+            out.update(found)
+        return out
+
+    def lookup_fact(self, text: str) -> Optional[str]:
+        """Wert zu `text`: exakter Key, sonst klein geschrieben. Höchstens eine DB-Abfrage."""
+        return self.lookup_facts([text])[0]
+
+    def lookup_facts(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Wie lookup_fact für viele Texte. Kandidaten (Text, Text.lower()) werden einmal
+        gebildet und der Reihe nach im Cache geprüft; was dort unbekannt ist, kommt für
+        alle Texte zusammen in eine Abfrage (Treffer und Fehlschläge landen im Cache).
+        """
+        con = self._con()
+        self._check_foreign_writes()
+        cands: List[Tuple[str, ...]] = []
+        out: List[Optional[str]] = []
+        todo: Dict[str, None] = {}
+        for t in texts:
+            low = t.lower()
+            keys = (t,) if low == t else (t, low)
+            cands.append(keys)
+            val = None
+            for i, k in enumerate(keys):
+                v = self.cache.get(k)
+                if v is None:             # unbekannt → ab hier aus der DB
+                    todo.update(dict.fromkeys(keys[i:]))
+                    break
+                if v is not MISSING:
+                    val = v
+                    break
+            out.append(val)
+        if not todo:
+            return out
+        gen = self.cache.generation
+        found = dict(con.execute(_SQL_GET_FACTS, (json.dumps(list(todo)),)).fetchall())
+        for k in todo:
+            self.cache.put(k, found.get(k), gen)
+        for n, keys in enumerate(cands):
+            if out[n] is None:  # Keys vor dem ersten unbekannten waren Fehlschläge → nur found zählt
+                out[n] = next((found[k] for k in keys if found.get(k)), None)
+        return out
+
+    # --- Semantische Suche ---
+    def fact_index(self) -> Optional[FactIndex]:
+        """
+        TF-IDF-Index über alle Fakten; beim ersten Zugriff aufgebaut (große Bestände im
+        Hintergrund – bis dahin None). Fremde Schreibzugriffe werden vorher nachgezogen.
+        """
+        idx = self._fact_index
+        if idx is not None:
+            if self._index_stale:
+                self._sync_index(idx)
+            return idx
+        with self._index_lock:
+            if self._fact_index is not None or self._index_building:
+                return self._fact_index
+            n = self._con().execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+            if n <= SEMANTIC_SYNC_BUILD:
+                self._build_index()
+                return self._fact_index
+            self._build_in_background()
+        return None
+
+    def _build_in_background(self) -> None:
+        # Aufrufer hält _index_lock; der alte Index (falls vorhanden) bleibt bis dahin aktiv
+        if self._index_building:
+            return
+        self._index_building = True
+        threading.Thread(target=self._build_index, name="fox-fact-index", daemon=True).start()
+
+    def _build_index(self) -> None:
+        try:
+            con = self._con()
+            con.execute("BEGIN")  # Lesetransaktion: hwm und Zeilen aus demselben Stand
+            try:
+                hwm = con.execute("SELECT MAX(updated_at) FROM facts").fetchone()[0] or 0.0
+                idx = FactIndex()
+                idx.build(con.execute("SELECT key, value FROM facts"))
+            finally:
+                con.execute("COMMIT")
+            self._index_hwm = hwm
+            self._fact_index = idx
+            self._index_stale = True  # während des Aufbaus Geschriebenes beim nächsten Zugriff nachziehen
+            log.info("Fakten-Index aufgebaut: %d Fakten in %.0f ms.", len(idx), idx.build_seconds * 1000.0)
+        finally:
+            self._index_building = False
+
+    def _sync_index(self, idx: FactIndex) -> None:
+        if not self._index_lock.acquire(blocking=False):
+            return  # gleicht gerade ein anderer Thread ab
+        try:
+            if not self._index_stale:
+                return
+            self._index_stale = False
+            con = self._con()
+            rows = con.execute("SELECT key, value, updated_at FROM facts WHERE updated_at >= ?",
+                               (self._index_hwm,)).fetchall()
+            if rows:
+                idx.upsert((k, v) for k, v, _ in rows)
+                self._index_hwm = max(self._index_hwm, max(u for _, _, u in rows))
+            # Gelöscht oder ohne updated_at geschrieben (DB-Browser) → komplett neu; große
+            # Bestände wie beim ersten Aufbau im Hintergrund (gelöschte Keys liefert get_fact
+            # bis dahin nicht mehr, semantic_fact überspringt sie)
+            n = con.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
+            if n != len(idx):
+                if n <= SEMANTIC_SYNC_BUILD:
+                    self._build_index()
+                else:
+                    self._build_in_background()
+        finally:
+            self._index_lock.release()
+
+    def semantic_fact(self, text: str, min_sim: float = SEMANTIC_MIN_SIM,
+                      k: int = 3) -> Optional[Tuple[str, str, float]]:
+        """Ähnlichster Fakt (key, value, kosinus) mit Kosinus ≥ min_sim, sonst None."""
+        idx = self.fact_index()
+        if idx is None:
+            return None
+        for key, score in idx.search(text, k):
+            if score < min_sim:
+                break
+            val = self.get_fact(key)
+            if val:
+                return key, val, score
+        return None
+
+    def search_facts_page(self, q: str, limit: int = SEARCH_LIMIT, after: Optional[str] = None,
+                          prefix: bool = True) -> Tuple[List[Tuple[str, str, float]], Optional[str]]:
+        """
+        Eine Seite Treffer [(key, value, score)] nach BM25 (bester zuerst) + Cursor für die
+        nächste Seite (None = keine weiteren). `after` ist der Cursor der vorherigen Seite.
+        """
+        match = fts_query(q, prefix)
+        if match is None or limit <= 0:
+            return [], None
+        score, rid = decode_cursor(after)
+        rows = self._con().execute(_SQL_SEARCH_FACTS, (match, score, rid, limit + 1)).fetchall()
+        nxt = encode_cursor(rows[limit - 1][2], rows[limit - 1][3]) if len(rows) > limit else None
+        return [(k, v, s) for k, v, s, _ in rows[:limit]], nxt
+
+    def iter_search_facts(self, q: str, after: Optional[str] = None, page: int = 500,
+                          prefix: bool = True) -> Iterator[Tuple[str, str, float]]:
+        """Alle Treffer (ab Cursor `after`) in Rangfolge, seitenweise nachgeladen (für Streaming)."""
+        decode_cursor(after)  # ungültiger Cursor → ValueError schon hier, nicht erst im Stream
+
+        def pages(after):
+            while True:
+                rows, after = self.search_facts_page(q, page, after, prefix)
+                yield from rows
+                if after is None:
+                    return
+        return pages(after)
+
+    def search_notes_page(self, q: str, limit: int = SEARCH_LIMIT, after: Optional[str] = None,
+                          prefix: bool = True) -> Tuple[List[dict], Optional[str]]:
+        match = fts_query(q, prefix)
+        if match is None or limit <= 0:
+            return [], None
+        score, rid = decode_cursor(after)
+        rows = self._con().execute(_SQL_SEARCH_NOTES, (match, score, rid, limit + 1)).fetchall()
+        nxt = encode_cursor(rows[limit - 1][4], rows[limit - 1][0]) if len(rows) > limit else None
+        return [{"id": i, "title": t, "content": c, "tags": g, "score": s}
+                for i, t, c, g, s in rows[:limit]], nxt
+
+    def rebuild_search_index(self) -> None:
+        """FTS-Indizes neu aufbauen (nach Schreibzugriffen an den Triggern vorbei, z. B. DB-Browser)."""
+        with self.transaction() as con:
+            for name in _FTS:
+                con.execute(f"INSERT INTO {name}({name}) VALUES('rebuild')")
+
+    # --- Training ---
+    def add_training_pairs(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        now = time.time()
+        rows = []
+        for text, label in pairs:
+            text = (text or "").strip()
+            label = (label or "").strip()
+            if text and label:
+                rows.append((text, label, now))
+        if rows:
+            with self.transaction() as con:
+                con.executemany(_SQL_ADD_TRAINING, rows)
+        return len(rows)
+
+    # --- Bulk ---
+    def iter_rows(self, table: str, page: int = 1000) -> Iterator[Tuple]:
+        """Alle Zeilen von facts/training (Spalten wie TABLE_COLUMNS), seitenweise gelesen."""
+        sql = _SQL_PAGE[table]
+        last = -1
+        while True:
+            rows = self._con().execute(sql, (last, page)).fetchall()
+            for r in rows:
+                yield r[1:]
+            if len(rows) < page:
+                return
+            last = rows[-1][0]
+
+    def count(self, table: str) -> int:
+        if table not in _SQL_PAGE and table != "learn_queue":
+            raise ValueError(f"Unbekannte Tabelle '{table}'.")
+        return self._con().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def list_training(self) -> List[Tuple[str, str]]:
+        return self._con().execute(_SQL_LIST_TRAINING).fetchall()
+
+    def delete_training(self, text: str, label: str) -> int:
+        with self.transaction() as con:
+            return con.execute(_SQL_DELETE_TRAINING, (text, label)).rowcount
+
+    # --- Auto-Lern-Warteschlange ---
+    def enqueue_learn(self, rows: Iterable[Tuple], max_rows: int) -> int:
+        """
+        (text, label, conf, topk_json, via, hits, ts) zusammenführen (hits addieren) und
+        auf max_rows Einträge kürzen; liefert die Zahl verdrängter Einträge.
+        """
+        rows = [(t, l, c, k, v, h, ts, ts) for t, l, c, k, v, h, ts in rows]
+        if not rows:
+            return 0
+        with self.transaction() as con:
+            con.executemany(_SQL_ENQUEUE_LEARN, rows)
+            return con.execute(_SQL_TRIM_LEARN, (max_rows,)).rowcount
+
+    def learn_queue(self, min_hits: int = 1, limit: int = 100) -> List[Tuple]:
+        """Einträge (text, label, conf, topk_json, via, hits, first_seen, last_seen), häufigste zuerst."""
+        return self._con().execute(_SQL_LEARN_QUEUE, (min_hits, limit)).fetchall()
+
+    def take_learn(self, texts: Iterable[str]) -> List[str]:
+        """Einträge entfernen; liefert die tatsächlich entfernten (andere Worker können schneller sein)."""
+        taken = []
+        with self.transaction() as con:
+            for t in texts:
+                if con.execute(_SQL_TAKE_LEARN, (t,)).rowcount:
+                    taken.append(t)
+        return taken
+
+    def training_changes(self, after_id: int = 0, after_seq: int = 0):
+        """
+        Änderungen an training seit (after_id, after_seq), aus einem konsistenten Stand:
+        (neue Zeilen [(id, text, label)] mit id > after_id, gelöschte Zeilen mit id <= after_id,
+        aktuelle Lösch-seq). Kosten hängen nur von der Zahl der Änderungen ab.
+        """
+        con = self._con()
+        con.execute("BEGIN")  # Lesetransaktion (kein Schreib-Lock wie bei transaction())
+        try:
+            deleted = con.execute(_SQL_TRAINING_DELETED, (after_seq, after_id)).fetchall()
+            seq = con.execute(_SQL_TRAINING_DELETED_SEQ).fetchone()[0]
+            rows = con.execute(_SQL_TRAINING_SINCE, (after_id,)).fetchall()
+        finally:
+            con.execute("COMMIT")
+        return rows, deleted, seq
+
+
+_store: Optional[KnowledgeStore] = None
+_store_source = None
+_store_lock = threading.Lock()
+
+
+def store() -> KnowledgeStore:
+    """Store für das aktuelle DB_PATH (wird einmal angelegt und dann wiederverwendet)."""
+    global _store, _store_source
+    s = _store
+    if s is not None and _store_source is DB_PATH:
+        return s
+    with _store_lock:
+        if _store is None or _store_source is not DB_PATH:
+            if _store is not None:
+                _store.close()
+            _store, _store_source = KnowledgeStore(DB_PATH), DB_PATH
+        return _store
+
+
+def _close_before_fork() -> None:
+    if _store is not None:
+        _store.close()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_close_before_fork)
+
 
 def init_db():
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        # Facts (Key/Value)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS facts (
-                key TEXT PRIMARY KEY,
-                value TEXT,
-                updated_at REAL
-            )
-        """)
-        # Notizen (optional)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT,
-                content TEXT,
-                tags TEXT,
-                created_at REAL,
-                updated_at REAL
-            )
-        """)
-        # NEU: Training (User-Text → Label)
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS training (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                text  TEXT NOT NULL,
-                label TEXT NOT NULL,
-                created_at REAL
-            )
-        """)
-        cur.execute("""
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_training_unique
-            ON training(text, label)
-        """)
-        con.commit()
+    store().init()
 
 # ---------- Facts ----------
 def set_fact(key: str, value: str):
-    now = time.time()
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        cur.execute("INSERT OR REPLACE INTO facts(key,value,updated_at) VALUES(?,?,?)",
-                    (key, value, now))
-        con.commit()
+    store().set_fact(key, value)
+
+def set_facts(items) -> int:
+    """Mehrere (key, value) in einer Transaktion schreiben."""
+    return store().set_facts(items)
 
 def get_fact(key: str) -> str | None:
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        cur.execute("SELECT value FROM facts WHERE key=?", (key,))
-        row = cur.fetchone()
-        return row[0] if row else None
+    return store().get_fact(key)
+
+def get_facts(keys) -> dict[str, str]:
+    """
+    Batch-Lookup: liefert {key: value} für alle vorhandenen Keys (eine Abfrage, json_each).
+    """
+    return store().get_facts(keys)
+
+def lookup_fact(text: str) -> str | None:
+    """Wissens-Lookup für Nutzereingaben: exakter Key, sonst klein geschrieben (ein Zugriff)."""
+    return store().lookup_fact(text)
 
-def search_facts(q: str):
-    like = f"%{q}%"
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        cur.execute("SELECT key,value FROM facts WHERE key LIKE ? OR value LIKE ?", (like, like))
-        return cur.fetchall()
+def lookup_facts(texts) -> list[str | None]:
+    return store().lookup_facts(list(texts))
+
+def semantic_fact(text: str, min_sim: float = SEMANTIC_MIN_SIM) -> tuple[str, str, float] | None:
+    """Ähnlichster Fakt zu einer freien Frage (TF-IDF-Kosinus ≥ min_sim)."""
+    return store().semantic_fact(text, min_sim)
+
+def search_facts(q: str, limit: int = SEARCH_LIMIT) -> list[tuple[str, str]]:
+    """Volltextsuche (BM25, Präfix-Treffer): die besten `limit` Treffer als (key, value)."""
+    rows, _ = store().search_facts_page(q, limit)
+    return [(k, v) for k, v, _ in rows]
+
+def search_facts_page(q: str, limit: int = SEARCH_LIMIT, after: str | None = None):
+    return store().search_facts_page(q, limit, after)
+
+def search_notes_page(q: str, limit: int = SEARCH_LIMIT, after: str | None = None):
+    return store().search_notes_page(q, limit, after)
 
 # ---------- Training ----------
 def add_training_pair(text: str, label: str) -> None:
     """
     Fügt (text,label) als Trainingsbeispiel hinzu (dedupe via UNIQUE-Index).
     """
-    text = (text or "").strip()
-    label = (label or "").strip()
-    if not text or not label:
-        return
-    now = time.time()
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        cur.execute("INSERT OR IGNORE INTO training(text,label,created_at) VALUES(?,?,?)",
-                    (text, label, now))
-        con.commit()
+    store().add_training_pairs([(text, label)])
+
+def add_training_pairs(pairs) -> int:
+    return store().add_training_pairs(pairs)
 
 def list_training() -> list[tuple[str, str]]:
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        cur.execute("SELECT text, label FROM training ORDER BY id ASC")
-        return [(t, l) for (t, l) in cur.fetchall()]
+    return store().list_training()
 
 def delete_training(text: str, label: str) -> int:
-    with closing(_open()) as con, closing(con.cursor()) as cur:
-        cur.execute("DELETE FROM training WHERE text=? AND label=?", (text, label))
-        con.commit()
-        return cur.rowcount
+    return store().delete_training(text, label)
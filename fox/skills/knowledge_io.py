@@ -0,0 +1,225 @@
+#===========================
+# Bulk-Import/-Export der Knowledge-DB (NDJSON/CSV)
+#===========================
+# Import liest zeilenweise aus einem beliebigen Textstrom (Datei, stdin oder der
+# HTTP-Body, siehe server.py) und schreibt blockweise (batch Zeilen je Transaktion)
+# als Upsert: facts über set_facts, training über add_training_pairs (executemany,
+# Duplikate werden ignoriert). Export liest seitenweise über die rowid und liefert
+# Blöcke von ~64 KB – weder Import noch Export halten die Tabelle im Speicher.
+#
+# Formate:
+#   ndjson  {"key": "...", "value": "..."} bzw. {"text": "...", "label": "..."}
+#           (auch ["key", "value"]) – eine Zeile je Eintrag
+#   csv     key,value bzw. text,label; eine Kopfzeile mit diesen Namen ist optional
+# Trainingszeilen werden wie bei /learn geprüft: Label über LEGACY_MAP normalisiert,
+# unbekannte Labels und leere Texte werden mit Zeilennummer übersprungen.
+from __future__ import annotations
+import csv
+import io
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from fox.labels import CLASSES, LEGACY_MAP
+from fox.responses import ndjson_chunks
+
+from .knowledge import TABLE_COLUMNS, store
+
+log = logging.getLogger("fox")
+
+FORMATS = ("ndjson", "csv")
+IMPORT_BATCH = 10000
+EXPORT_CHUNK = 64 * 1024
+MAX_ERRORS = 20  # so viele fehlerhafte Zeilen werden mit Zeilennummer gemeldet
+
+
+def guess_format(hint: Optional[str]) -> str:
+    """Format aus Dateiname oder Content-Type (Standard: ndjson)."""
+    h = (hint or "").lower()
+    if "csv" in h:
+        return "csv"
+    return "ndjson"
+
+
+class Progress:
+    """Zählt Zeilen und meldet Fortschritt + Durchsatz alle `every` Zeilen über `out`."""
+
+    def __init__(self, label: str, every: int = IMPORT_BATCH, total: Optional[int] = None,
+                 out: Optional[Callable[[str], None]] = None):
+        self.label = label
+        self.every = max(1, int(every))
+        self.total = total
+        self.out = out or log.info
+        self.rows = 0
+        self.skipped = 0
+        self.errors: List[str] = []
+        self._t0 = time.perf_counter()
+        self._next = self.every
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def add(self, rows: int, skipped: int = 0) -> None:
+        self.rows += rows
+        self.skipped += skipped
+        if self.rows >= self._next:
+            self._next = (self.rows // self.every + 1) * self.every
+            self.out(self.line())
+
+    def error(self, lineno: int, msg: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"Zeile {lineno}: {msg}")
+
+    def line(self) -> str:
+        rate = self.rows / max(self.seconds, 1e-9)
+        of = f"/{self.total}" if self.total is not None else ""
+        return f"{self.label}: {self.rows}{of} Zeilen, {self.skipped} übersprungen, {rate:,.0f} Zeilen/s"
+
+    def summary(self) -> Dict[str, Any]:
+        secs = self.seconds
+        return {"rows": self.rows, "skipped": self.skipped, "errors": self.errors,
+                "seconds": round(secs, 3), "rows_per_s": round(self.rows / max(secs, 1e-9), 1)}
+
+
+# ---------- Import ----------
+def _records(fh: TextIO, fmt: str, cols: Tuple[str, str], prog: Progress) -> Iterator[Tuple[int, str, str]]:
+    """(Zeile, a, b) aus dem Strom; kaputte Zeilen werden gezählt und übersprungen."""
+    a_name, b_name = cols
+    if fmt == "csv":
+        for n, row in enumerate(csv.reader(fh), 1):
+            if not row:
+                continue
+            if n == 1 and [c.strip().lower() for c in row[:2]] == [a_name, b_name]:
+                continue  # Kopfzeile
+            if len(row) < 2:
+                prog.error(n, "zu wenige Spalten")
+                continue
+            yield n, row[0], row[1]
+        return
+    for n, line in enumerate(fh, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+            if isinstance(obj, dict):
+                a, b = obj[a_name], obj[b_name]
+            else:
+                a, b = obj[0], obj[1]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            prog.error(n, f"{type(e).__name__}: {e}")
+            continue
+        yield n, str(a), "" if b is None else str(b)
+
+
+def import_stream(fh: TextIO, table: str = "facts", fmt: str = "ndjson", batch: int = IMPORT_BATCH,
+                  progress: Optional[Progress] = None) -> Dict[str, Any]:
+    """
+    Liest fh bis zum Ende und schreibt blockweise (je Block eine Transaktion).
+    Bricht der Strom ab, bleiben die bereits geschriebenen Blöcke erhalten.
+    """
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unbekannte Tabelle '{table}'.")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Format '{fmt}'.")
+    prog = progress or Progress(f"Import {table}", every=batch)
+    ks = store()
+    write = ks.set_facts if table == "facts" else ks.add_training_pairs
+    buf: List[Tuple[str, str]] = []
+
+    def flush() -> None:
+        rows = [(a.strip(), b) for a, b in buf if a.strip()] if table == "facts" else list(buf)
+        n = write(rows)
+        prog.add(n, skipped=len(buf) - n)
+        buf.clear()
+
+    for n, a, b in _records(fh, fmt, TABLE_COLUMNS[table][:2], prog):
+        if table == "training":
+            a, b = a.strip(), LEGACY_MAP.get(b.strip(), b.strip())
+            if not a:
+                prog.error(n, "leerer Text")
+                continue
+            if b not in CLASSES:
+                prog.error(n, f"unbekanntes Label '{b}'")
+                continue
+        buf.append((a, b))
+        if len(buf) >= batch:
+            flush()
+    if buf:
+        flush()
+    res = {"table": table, "format": fmt, **prog.summary()}
+    log.info("Import %s fertig: %d Zeilen in %.1f s (%.0f Zeilen/s), %d übersprungen.",
+             table, res["rows"], res["seconds"], res["rows_per_s"], res["skipped"])
+    return res
+
+
+# ---------- Export ----------
+def export_chunks(table: str = "facts", fmt: str = "ndjson", chunk_bytes: int = EXPORT_CHUNK,
+                  progress: Optional[Progress] = None) -> Iterator[bytes]:
+    """Tabelle als NDJSON/CSV in Blöcken von ~chunk_bytes (UTF-8)."""
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Unbekannte Tabelle '{table}'.")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unbekanntes Format '{fmt}'.")
+    cols = TABLE_COLUMNS[table]
+    rows = store().iter_rows(table)
+    if progress is not None:
+        rows = _counted(rows, progress)
+    if fmt == "ndjson":
+        return ndjson_chunks((dict(zip(cols, r)) for r in rows), chunk_bytes)
+    return _csv_chunks(cols, rows, chunk_bytes)
+
+
+def _counted(rows: Iterable[Tuple], prog: Progress) -> Iterator[Tuple]:
+    for r in rows:
+        yield r
+        prog.add(1)
+
+
+def _csv_chunks(cols: Tuple[str, ...], rows: Iterable[Tuple], chunk_bytes: int) -> Iterator[bytes]:
+    sio = io.StringIO()
+    writer = csv.writer(sio, lineterminator="\n")
+    writer.writerow(cols)
+    for row in rows:
+        writer.writerow(row)
+        if sio.tell() >= chunk_bytes:
+            yield sio.getvalue().encode("utf-8")
+            sio.seek(0)
+            sio.truncate()
+    if sio.tell():
+        yield sio.getvalue().encode("utf-8")
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Byte-Strom aus einer Funktion, die Blöcke liefert (None = Ende) – z. B. den
+    HTTP-Body aus der Event-Loop. Mit io.TextIOWrapper(..., newline="") zeilenweise lesbar.
+    """
+
+    def __init__(self, next_chunk: Callable[[], Optional[bytes]]):
+        self._next = next_chunk
+        self._buf = b""
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buf and not self._eof:
+            chunk = self._next()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buf = bytes(chunk)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+
+def text_stream(next_chunk: Callable[[], Optional[bytes]]) -> TextIO:
+    return io.TextIOWrapper(io.BufferedReader(ChunkReader(next_chunk), 1 << 16),
+                            encoding="utf-8-sig", newline="")
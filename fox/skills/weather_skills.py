@@ -1,12 +1,14 @@
 # fox/skills/weather_skills.py
 from __future__ import annotations
-import os, requests
+import os
 from typing import Optional
 from dotenv import load_dotenv
 
 # .env sicher laden (auch falls main es später lädt)
 load_dotenv()
 
+OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
 def _get_api_key() -> Optional[str]:
     """
     Holt den OpenWeather-Key aus der .env / Umgebung.
@@ -40,8 +42,9 @@ def get_weather(place: str) -> str:
         return ("Kein OpenWeather-Key gefunden. Lege in deiner .env an z. B.:\n"
                 "OPENWEATHER_API_KEY=DEIN_KEY")
 
+    import requests  # erst beim ersten Wetter-Abruf laden (schneller Server-Start)
     try:
-        url = "https://api.openweathermap.org/data/2.5/weather"
+        url = os.getenv("OPENWEATHER_URL", OPENWEATHER_URL)  # lokaler Ersatz z. B. für Lasttests
         params = {"q": q, "appid": api_key, "units": "metric", "lang": "de"}
         r = requests.get(url, params=params, timeout=6)
         if r.status_code == 401:
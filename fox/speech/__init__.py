@@ -1,8 +1,25 @@
 #===========================
 # Sprach Ein-/Ausgabe
 #===========================
+# Lazy: Whisper (→ torch), sounddevice und pyttsx3 werden erst beim ersten
+# Zugriff auf SpeechIn/Speech importiert. "import fox.speech" bleibt billig.
+from __future__ import annotations
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from .speech_in import SpeechIn
-from .speech_out import Speech
+if TYPE_CHECKING:
+    from .speech_in import SpeechIn
+    from .speech_out import Speech
 
-__all__ = ["SpeechIn", "Speech"]
\ No newline at end of file
+_LAZY = {"SpeechIn": ".speech_in", "Speech": ".speech_out"}
+
+__all__ = ["SpeechIn", "Speech"]
+
+
+def __getattr__(name: str) -> Any:
+    mod = _LAZY.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(mod, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,75 @@
+#===========================
+# Prozess-Synchronisation (mehrere Server-Worker)
+#===========================
+# Die Datei <MODEL_PATH>/CURRENT ist die einzige Wahrheit, welche Modellversion
+# gilt (wird beim Veröffentlichen atomar getauscht). Jeder Worker beobachtet sie
+# per stat() und lädt nach, sobald sich die Version ändert. Veröffentlichen
+# (Lernen/Training) läuft unter einer Datei-Sperre, damit sich Worker nicht
+# gegenseitig Trainingspaare überschreiben.
+from __future__ import annotations
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+class VersionWatcher:
+    """Billige Änderungsprüfung einer Versionsdatei (stat höchstens alle `interval` Sekunden)."""
+
+    def __init__(self, path: Path, interval: float = 0.1):
+        self.path = Path(path)
+        self.interval = interval
+        self._next_check = 0.0
+        self._stamp: Optional[Tuple[int, int, int]] = None
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def poll(self, force: bool = False) -> Optional[str]:
+        """Inhalt der Datei, falls sie sich seit dem letzten Aufruf geändert hat, sonst None."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return None
+        self._next_check = now + self.interval
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        try:
+            return self.path.read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Exklusive Sperre über Prozessgrenzen (fcntl bzw. msvcrt unter Windows)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gibt nach ~10 s auf → weiter warten
+                    continue
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,141 @@
+#===========================
+# Trigger-Erkennung (ein Automat für alle Schlüsselwörter)
+#===========================
+# Alle Trigger-Listen (Zeit, Wetter, Gespräch, Hotword) werden beim Import zu
+# EINEM Aho-Corasick-Automaten kompiliert. Ein Text wird einmal normalisiert und
+# einmal durchlaufen; heraus kommen alle getroffenen Trigger-Klassen.
+#
+# Modus pro Muster:
+#   word=False → Teilstring (wie bisher "k in s", z. B. "tag" trifft "montag")
+#   word=True  → ganzes Wort/Phrase (Wortgrenzen wie \b in Regex)
+from __future__ import annotations
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from .cache import normalize_text
+
+# --- Routing (main.py) ---
+TIME_TRIGGERS    = ("uhr", "zeit", "datum", "tag", "heute", "morgen")
+WEATHER_TRIGGERS = ("wetter", "temperatur", "grad", "kalt", "heiss", "heiß", "regen", "sonnig", "sturm", "schnee")
+
+# --- Gespräch (gespräch_skills.py) ---
+GREET_WORDS = (
+    "hallo", "hi", "hey", "servus", "moin", "grüezi",
+    "guten morgen", "guten abend", "guten tag", "gute nacht"
+)
+BYE_WORDS = (
+    "tschüss", "tschuess", "ciao", "auf wiedersehen",
+    "bis später", "bis spaeter", "bis bald", "mach's gut", "machs gut"
+)
+HOW_ARE_YOU  = ("wie geht", "wie läuft's", "wie läufts", "alles gut")
+JOKE         = ("witz", "joke")
+WHAT_DO      = ("was machst du",)
+FAVORITE     = ("lieblingsessen", "lieblings essen")
+WHO_ARE_YOU  = ("wer bist du",)
+WHAT_CAN     = ("was kannst du",)
+
+# --- Hotword (hotword.py) ---
+HOTWORDS = ("hey fox", "hey fuchs", "hi fox", "hallo fox")
+
+# Klasse → (Phrasen, ganze Wörter?)
+TRIGGER_CLASSES: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    "time":               (TIME_TRIGGERS, False),
+    "wetter":             (WEATHER_TRIGGERS, False),
+    "greet":              (GREET_WORDS, True),
+    "bye":                (BYE_WORDS, True),
+    "smalltalk.how":      (HOW_ARE_YOU, True),
+    "smalltalk.joke":     (JOKE, True),
+    "smalltalk.what_do":  (WHAT_DO, True),
+    "smalltalk.favorite": (FAVORITE, True),
+    "info.who":           (WHO_ARE_YOU, True),
+    "info.what_can":      (WHAT_CAN, True),
+    "hotword":            (HOTWORDS, False),
+}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class TriggerMatcher:
+    """Aho-Corasick über (Klasse, Phrase, ganze Wörter?)-Muster."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, str, bool]]):
+        self.patterns: List[Tuple[str, str, bool]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for cls, phrase, word in patterns:
+            phrase = normalize_text(phrase)
+            if phrase:
+                self._add(len(self.patterns), phrase)
+                self.patterns.append((cls, phrase, word))
+        self._build()
+
+    def _add(self, pid: int, phrase: str) -> None:
+        node = 0
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(pid)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                if node:
+                    f = self._fail[node]
+                    while f and ch not in self._goto[f]:
+                        f = self._fail[f]
+                    self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> List[Tuple[str, str]]:
+        """Alle Treffer (Klasse, Phrase) im bereits normalisierten Text, in Textreihenfolge."""
+        hits: List[Tuple[str, str]] = []
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                cls, phrase, word = self.patterns[pid]
+                if word:
+                    start = i - len(phrase) + 1
+                    if start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if i + 1 < n and _is_word_char(text[i + 1]):
+                        continue
+                hits.append((cls, phrase))
+        return hits
+
+
+MATCHER = TriggerMatcher(
+    (cls, phrase, word) for cls, (phrases, word) in TRIGGER_CLASSES.items() for phrase in phrases
+)
+
+
+@lru_cache(maxsize=1024)
+def _scan_normalized(text: str) -> Tuple[Tuple[str, str], ...]:
+    return tuple(MATCHER.scan(text))
+
+
+def match_phrases(text: str) -> Tuple[Tuple[str, str], ...]:
+    """(Klasse, Phrase)-Treffer; derselbe Text wird pro Anfrage nur einmal gescannt (Cache)."""
+    return _scan_normalized(normalize_text(text))
+
+
+def match_triggers(text: str) -> FrozenSet[str]:
+    """Menge der getroffenen Trigger-Klassen, z. B. {"time", "greet"}."""
+    return frozenset(cls for cls, _ in match_phrases(text))
@@ -0,0 +1,275 @@
+#===========================
+# Auswertung & Latenz-Benchmark für FoxAssistant
+#===========================
+# Läuft komplett offline in einem temporären Arbeitsordner mit Fixture-DBs
+# (knowledge.db + geo.db); die echten Datenbanken werden nur gelesen.
+#
+# Aufruf (im Projektordner):
+#   python fox_eval.py
+#   python fox_eval.py --db knowledge.db --folds 5 --rounds 3 --json eval.json
+#
+# Ergebnis:
+#   cv       → stratifizierte Kreuzvalidierung: Accuracy, Precision/Recall/F1 pro Label, Konfusionsmatrix
+#   latency  → Perzentile (ms) pro handle-Stufe: auto_calc, vectorize, predict, heuristics, route, skill, total
+from __future__ import annotations
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent
+STAGES = ("auto_calc", "vectorize", "predict", "heuristics", "route", "skill", "total")
+WEATHER_KEY_VARS = ("OPENWEATHER_API_KEY", "OPENWEATHER_KEY", "OPENWEATHERMAP_API_KEY",
+                    "OWM_KEY", "OPENWEAHTER_KEY", "openweahter_key")
+
+# ---------- Fixture-Daten ----------
+FIXTURE_FACTS = [
+    ("hauptstadt der schweiz", "Bern"),
+    ("was ist python", "Python ist eine Programmiersprache."),
+    ("wer bist du", "Ich bin Fox."),
+]
+FIXTURE_PLACES = [
+    ("Zürich", "CH", 421878, 47.3769, 8.5417, "P", "PPLA"),
+    ("Bern", "CH", 133883, 46.9481, 7.4474, "P", "PPLC"),
+    ("Basel", "CH", 177654, 47.5596, 7.5886, "P", "PPLA"),
+    ("Berlin", "DE", 3644826, 52.5200, 13.4050, "P", "PPLC"),
+    ("Paris", "FR", 2138551, 48.8566, 2.3522, "P", "PPLC"),
+    ("Tokyo", "JP", 8336599, 35.6895, 139.6917, "P", "PPLC"),
+    ("Switzerland", "CH", 8700000, 46.8, 8.2, "A", "PCLI"),
+    ("Japan", "JP", 125000000, 36.0, 138.0, "A", "PCLI"),
+]
+FIXTURE_ISO2 = [("CH", "Switzerland"), ("DE", "Germany"), ("FR", "France"), ("JP", "Japan")]
+
+
+def load_training(db_path: Optional[Path]) -> List[Tuple[str, str]]:
+    """training-Tabelle read-only lesen (fehlt sie, bleibt es bei BASE_TRAIN)."""
+    if not db_path or not Path(db_path).exists():
+        return []
+    try:
+        with closing(sqlite3.connect(f"file:{Path(db_path).resolve().as_posix()}?mode=ro", uri=True)) as con:
+            return con.execute("SELECT text, label FROM training ORDER BY id ASC").fetchall()
+    except sqlite3.Error:
+        return []
+
+
+def build_fixtures(work: Path, training: List[Tuple[str, str]], geo_db: Optional[Path] = None) -> None:
+    """Legt knowledge.db (Facts + Training) und geo.db im Arbeitsordner an."""
+    with closing(sqlite3.connect(work / "knowledge.db")) as con:
+        con.executescript("""
+            CREATE TABLE IF NOT EXISTS facts (key TEXT PRIMARY KEY, value TEXT, updated_at REAL);
+            CREATE TABLE IF NOT EXISTS notes (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, content TEXT,
+                                              tags TEXT, created_at REAL, updated_at REAL);
+            CREATE TABLE IF NOT EXISTS training (id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL,
+                                                 label TEXT NOT NULL, created_at REAL);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_training_unique ON training(text, label);
+        """)
+        now = time.time()
+        con.executemany("INSERT OR REPLACE INTO facts(key,value,updated_at) VALUES(?,?,?)",
+                        [(k, v, now) for k, v in FIXTURE_FACTS])
+        con.executemany("INSERT OR IGNORE INTO training(text,label,created_at) VALUES(?,?,?)",
+                        [(t, l, now) for t, l in training])
+        con.commit()
+
+    if geo_db and Path(geo_db).exists():
+        shutil.copyfile(geo_db, work / "geo.db")
+        return
+    with closing(sqlite3.connect(work / "geo.db")) as con:
+        con.executescript("""
+            CREATE TABLE places (name TEXT, country_code TEXT, population INTEGER, latitude REAL,
+                                 longitude REAL, feature_class TEXT, feature_code TEXT);
+            CREATE TABLE iso2 (code TEXT PRIMARY KEY, name TEXT);
+        """)
+        con.executemany("INSERT INTO places VALUES(?,?,?,?,?,?,?)", FIXTURE_PLACES)
+        con.executemany("INSERT INTO iso2 VALUES(?,?)", FIXTURE_ISO2)
+        con.commit()
+
+
+def _load_fox(work: Path):
+    """main erst nach dem Wechsel in den Arbeitsordner importieren (relative Pfade)."""
+    os.chdir(work)
+    sys.path.insert(0, str(ROOT))
+    import fox.skills.knowledge as kn
+    import fox.skills.geo_skills as geo
+    kn.DB_PATH = work / "knowledge.db"
+    geo.DB_PATH = (work / "geo.db").as_posix()
+    import main
+    for name in WEATHER_KEY_VARS:   # offline: Wetter-Skill antwortet ohne Netz
+        os.environ.pop(name, None)
+    return main
+
+
+# ---------- Kreuzvalidierung ----------
+def cross_validate(main, texts: List[str], labels_: List[str], folds: int) -> Dict[str, Any]:
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.metrics import confusion_matrix, precision_recall_fscore_support
+    from fox.intent import fit_engine
+
+    y = np.asarray([main.normalize_label(l) for l in labels_])
+    classes, counts = np.unique(y, return_counts=True)
+    n_splits = min(folds, int(counts.min()))
+    if n_splits < 2:
+        return {"skipped": f"zu wenige Beispiele pro Label (min {int(counts.min())})"}
+
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=main.RANDOM_STATE)
+    pred = np.empty_like(y)
+    for tr, te in skf.split(texts, y):
+        vec, clf = fit_engine([texts[i] for i in tr], list(y[tr]), main.INTENT_ENGINE,
+                              random_state=main.RANDOM_STATE, max_iter=main.MLP_MAX_ITER,
+                              features=main.INTENT_FEATURES, n_features=main.HASH_FEATURES)
+        pred[te] = clf.predict(vec.transform([texts[i] for i in te]))
+
+    p, r, f, s = precision_recall_fscore_support(y, pred, labels=classes, zero_division=0)
+    return {
+        "folds": n_splits,
+        "accuracy": round(float((pred == y).mean()), 4),
+        "macro_f1": round(float(f.mean()), 4),
+        "labels": {
+            str(c): {"precision": round(float(p[i]), 4), "recall": round(float(r[i]), 4),
+                     "f1": round(float(f[i]), 4), "support": int(s[i])}
+            for i, c in enumerate(classes)
+        },
+        "confusion": {"labels": [str(c) for c in classes],
+                      "matrix": confusion_matrix(y, pred, labels=classes).tolist()},
+    }
+
+
+# ---------- Latenz pro Stufe ----------
+def _percentiles(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"n": 0}
+    ms = np.asarray(samples) * 1000.0
+    return {"n": int(ms.size), "mean": round(float(ms.mean()), 4),
+            **{f"p{q}": round(float(np.percentile(ms, q)), 4) for q in (50, 90, 99)}}
+
+
+def measure_latency(fox, texts: List[str], rounds: int) -> Dict[str, Any]:
+    """handle() pro Text; Caches aus, damit jede Anfrage alle Stufen durchläuft."""
+    from fox.cache import LRUCache
+    fox._pred_cache = LRUCache(0)
+    fox._reply_cache = LRUCache(0)
+
+    current: Dict[str, float] = {}
+    skill_label: List[Optional[str]] = [None]
+
+    def observe(stage: str, seconds: float, label: Optional[str]) -> None:
+        current[stage] = current.get(stage, 0.0) + seconds
+        if stage == "skill":
+            skill_label[0] = label
+
+    samples: Dict[str, List[float]] = {s: [] for s in STAGES}
+    per_skill: Dict[str, List[float]] = {}
+    errors = 0
+    fox.handle(texts[0])  # Warm-up (mmap-Seiten, Caches der Skills)
+    fox.stage_observer = observe
+    try:
+        for _ in range(rounds):
+            for t in texts:
+                current.clear()
+                skill_label[0] = None
+                t0 = time.perf_counter()
+                try:
+                    fox.handle(t)
+                except Exception:
+                    errors += 1
+                    continue
+                current["total"] = time.perf_counter() - t0
+                if "route" in current:  # Routing-Overhead ohne Skill-Zeit
+                    current["route"] = max(0.0, current["route"] - current.get("skill", 0.0))
+                for stage, sec in current.items():
+                    samples.setdefault(stage, []).append(sec)
+                if skill_label[0] is not None:
+                    per_skill.setdefault(skill_label[0], []).append(current.get("skill", 0.0))
+    finally:
+        fox.stage_observer = None
+    return {
+        "requests": len(texts) * rounds,
+        "errors": errors,
+        "stages": {s: _percentiles(v) for s, v in samples.items()},
+        "skills": {k: _percentiles(v) for k, v in sorted(per_skill.items())},
+    }
+
+
+def run(db_path: Optional[Path], folds: int = 5, rounds: int = 3,
+        geo_db: Optional[Path] = None, work: Optional[Path] = None) -> Dict[str, Any]:
+    training = load_training(db_path)
+    tmp = None
+    if work is None:
+        tmp = tempfile.mkdtemp(prefix="fox_eval_")
+        work = Path(tmp)
+    work.mkdir(parents=True, exist_ok=True)
+    cwd = os.getcwd()
+    try:
+        build_fixtures(work, training, geo_db)
+        main = _load_fox(work)
+        fox = main.FoxAssistant()
+        texts, labels_ = fox.train_texts, fox.train_labels
+        return {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "model": {"engine": main.INTENT_ENGINE, "features": main.INTENT_FEATURES,
+                      "precision": fox.model.meta.get("precision"), "version": fox.model.meta.get("version")},
+            "n_samples": len(texts),
+            "n_labels": len(set(labels_)),
+            "cv": cross_validate(main, texts, labels_, folds),
+            "latency": measure_latency(fox, texts, rounds),
+        }
+    finally:
+        os.chdir(cwd)
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    m = report["model"]
+    print(f"Modell: engine={m['engine']} features={m['features']} precision={m['precision']}  "
+          f"Samples: {report['n_samples']}  Labels: {report['n_labels']}")
+    cv = report["cv"]
+    if "skipped" in cv:
+        print(f"CV übersprungen: {cv['skipped']}")
+    else:
+        print(f"\nCV ({cv['folds']} Folds): accuracy={cv['accuracy']:.3f}  macro_f1={cv['macro_f1']:.3f}")
+        print(f"{'label':<12}{'precision':>10}{'recall':>10}{'f1':>8}{'n':>6}")
+        for lbl, r in cv["labels"].items():
+            print(f"{lbl:<12}{r['precision']:>10.3f}{r['recall']:>10.3f}{r['f1']:>8.3f}{r['support']:>6}")
+    lat = report["latency"]
+    print(f"\nLatenz ({lat['requests']} Anfragen, {lat['errors']} Fehler) in ms")
+    print(f"{'stufe':<12}{'n':>7}{'p50':>10}{'p90':>10}{'p99':>10}")
+    for name, group in (("", lat["stages"]), ("skill:", lat["skills"])):
+        for stage, p in group.items():
+            if p["n"]:
+                print(f"{name + stage:<12}{p['n']:>7}{p['p50']:>10.3f}{p['p90']:>10.3f}{p['p99']:>10.3f}")
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="FoxAssistant auswerten: Kreuzvalidierung + Latenz pro Stufe (offline).")
+    ap.add_argument("--db", type=Path, default=ROOT / "knowledge.db", help="SQLite mit training-Tabelle (nur lesen)")
+    ap.add_argument("--geo-db", type=Path, default=None, help="Geo-DB statt Fixture (wird kopiert)")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--rounds", type=int, default=3, help="Durchläufe über den Korpus für die Latenz")
+    ap.add_argument("--work", type=Path, default=None, help="Arbeitsordner behalten (sonst temporär)")
+    ap.add_argument("--json", type=Path, default=None, help="Ergebnis als JSON schreiben ('-' = stdout)")
+    args = ap.parse_args(argv)
+
+    report = run(args.db, folds=args.folds, rounds=args.rounds, geo_db=args.geo_db,
+                 work=args.work.resolve() if args.work else None)
+    if args.json is None:
+        _print_report(report)
+    elif str(args.json) == "-":
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        _print_report(report)
+        print(f"\nJSON: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
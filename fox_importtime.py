@@ -0,0 +1,116 @@
+#===========================
+# Import-Zeit-Report für den API-Server
+#===========================
+# Misst in einem frischen Prozess, wie lange "import server" (→ server:app inkl.
+# FoxAssistant und Modell-Artefakt) dauert, listet die teuersten Imports
+# (python -X importtime) und prüft, dass kein Audio-/Trainings-Stack geladen wird.
+#
+# Aufruf (im Projektordner):
+#   python fox_importtime.py
+#   python fox_importtime.py --budget 1.0 --runs 5 --top 15 --json
+# Exit-Code 1, wenn das Budget überschritten oder ein schweres Modul geladen wurde.
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent
+# Module, die der Headless-Server nie laden darf
+HEAVY = ("torch", "whisper", "sounddevice", "pyttsx3", "sklearn", "scipy", "joblib", "requests")
+
+_CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+t = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t
+print("@@" + json.dumps({{"seconds": dt, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _run_child(module: str, cwd: Path, importtime: bool = False) -> Tuple[Dict[str, Any], str]:
+    code = _CHILD.format(root=str(ROOT), module=module, heavy=HEAVY)
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    env = dict(os.environ, FOX_LOG_LEVEL=os.getenv("FOX_LOG_LEVEL", "WARNING"))
+    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, env=env)
+    line = next((l for l in proc.stdout.splitlines() if l.startswith("@@")), None)
+    if proc.returncode != 0 or line is None:
+        raise RuntimeError(f"import {module} fehlgeschlagen:\n{proc.stderr[-2000:]}")
+    return json.loads(line[2:]), proc.stderr
+
+
+def _parse_importtime(stderr: str, top: int) -> List[Dict[str, Any]]:
+    """Zeilen 'import time: self | cumulative | name' → teuerste Pakete (kumuliert)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, self_us, cum_us, name = line.replace("import time:", "|", 1).split("|")
+            self_us, cum_us = int(self_us), int(cum_us)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append({"module": name.strip(), "self_ms": self_us / 1000.0,
+                     "cumulative_ms": cum_us / 1000.0, "depth": depth})
+    # nur Top-Level-Imports (depth 0) bzw. deren direkte Kinder sind aussagekräftig
+    rows = [r for r in rows if r["depth"] <= 1]
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def report(module: str = "server", cwd: Path = ROOT, runs: int = 3, top: int = 15,
+           budget: float = 1.0) -> Dict[str, Any]:
+    timings = []
+    loaded: List[str] = []
+    for _ in range(max(1, runs)):
+        res, _ = _run_child(module, cwd)
+        timings.append(res["seconds"])
+        loaded = res["loaded"]
+    _, stderr = _run_child(module, cwd, importtime=True)
+    best = min(timings)
+    return {
+        "module": module,
+        "runs": [round(t, 4) for t in timings],
+        "best_s": round(best, 4),
+        "budget_s": budget,
+        "heavy_loaded": loaded,
+        "ok": best <= budget and not loaded,
+        "top_imports": _parse_importtime(stderr, top),
+    }
+
+
+def _print_report(rep: Dict[str, Any]) -> None:
+    status = "OK" if rep["ok"] else "FEHLER"
+    print(f"import {rep['module']}: best {rep['best_s']:.3f}s (Budget {rep['budget_s']:.3f}s)  "
+          f"Läufe: {', '.join(f'{t:.3f}' for t in rep['runs'])}  → {status}")
+    print(f"Schwere Module geladen: {', '.join(rep['heavy_loaded']) or '-'}")
+    print(f"\n{'modul':<44}{'kumuliert_ms':>14}{'selbst_ms':>12}")
+    for r in rep["top_imports"]:
+        print(f"{'  ' * r['depth'] + r['module']:<44}{r['cumulative_ms']:>14.1f}{r['self_ms']:>12.1f}")
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Import-Zeit von server:app messen (frischer Prozess).")
+    ap.add_argument("--module", default="server")
+    ap.add_argument("--cwd", type=Path, default=ROOT, help="Arbeitsordner (Modell-Artefakt, knowledge.db)")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--budget", type=float, default=1.0, help="Sekunden")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    rep = report(args.module, cwd=args.cwd, runs=args.runs, top=args.top, budget=args.budget)
+    if args.json:
+        print(json.dumps(rep, ensure_ascii=False, indent=2))
+    else:
+        _print_report(rep)
+    sys.exit(0 if rep["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#===========================
+# Serialisierungs-Benchmark für API-Antworten
+#===========================
+# Vergleicht für typische große Antworten (/memory, /handle/batch,
+# /knowledge/search):
+#   fastapi   dict zurückgeben → jsonable_encoder + JSONResponse.render (json.dumps)
+#   fast      FastJSONResponse direkt zurückgeben → rapidjson, ohne jsonable_encoder
+#   ndjson    NDJSON-Blöcke (fox.responses.ndjson_chunks)
+# Mit --http zusätzlich Ende-zu-Ende über eine Mini-App (TestClient), damit auch
+# der Weg durch FastAPI/Starlette mitgemessen wird.
+#
+# Aufruf (im Projektordner):
+#   python fox_jsonbench.py
+#   python fox_jsonbench.py --repeat 200 --http --json
+from __future__ import annotations
+import argparse
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from fox.responses import FastJSONResponse, ndjson_chunks, rapidjson
+
+
+def _payloads() -> Dict[str, Any]:
+    memory = [{"ts": 1_700_000_000.0 + i, "user": f"wie ist das wetter in stadt {i}",
+               "label": "wetter", "conf": 0.91, "via": "direct",
+               "reply": f"In Stadt {i} sind es {i % 30} °C bei leichtem Regen."} for i in range(200)]
+    replies = [f"Antwort Nummer {i}: Es ist {i % 24:02d}:{i % 60:02d} Uhr." for i in range(1000)]
+    hits = [{"key": f"fakt_{i}", "value": f"Wert {i} – " + "lorem ipsum " * 4} for i in range(5000)]
+    return {
+        "memory_200": {"ok": True, "session": "bench", "total": 200, "offset": 0, "limit": 200,
+                       "next_offset": None, "memory": memory},
+        "batch_1000": {"ok": True, "count": len(replies), "replies": replies},
+        "search_5000": {"ok": True, "hits": hits},
+    }
+
+
+def _rows(payload: Dict[str, Any]) -> List[Any]:
+    for key in ("memory", "replies", "hits"):
+        if key in payload:
+            return payload[key]
+    return [payload]
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    """Bester Durchlauf aus `repeat` (ms) – robust gegen Ausreißer."""
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000.0
+
+
+def bench_render(repeat: int) -> List[Dict[str, Any]]:
+    out = []
+    for name, payload in _payloads().items():
+        rows = _rows(payload)
+        default = JSONResponse(None)
+        fast = FastJSONResponse(None)
+        t_default = _time(lambda: default.render(jsonable_encoder(payload)), repeat)
+        t_fast = _time(lambda: fast.render(payload), repeat)
+        t_ndjson = _time(lambda: b"".join(ndjson_chunks(rows)), repeat)
+        out.append({"payload": name, "bytes": len(fast.render(payload)),
+                    "fastapi_ms": round(t_default, 3), "fast_ms": round(t_fast, 3),
+                    "ndjson_ms": round(t_ndjson, 3), "speedup": round(t_default / max(t_fast, 1e-9), 1)})
+    return out
+
+
+def bench_http(repeat: int) -> List[Dict[str, Any]]:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from fox.responses import NDJSONResponse
+
+    payloads = _payloads()
+    app = FastAPI()
+
+    @app.get("/default/{name}")
+    def as_dict(name: str):
+        return payloads[name]
+
+    @app.get("/fast/{name}")
+    def as_fast(name: str):
+        return FastJSONResponse(payloads[name])
+
+    @app.get("/ndjson/{name}")
+    def as_ndjson(name: str):
+        return NDJSONResponse(_rows(payloads[name]))
+
+    out = []
+    with TestClient(app) as client:
+        for name in payloads:
+            res = {"payload": name}
+            for kind in ("default", "fast", "ndjson"):
+                res[f"{kind}_ms"] = round(_time(lambda: client.get(f"/{kind}/{name}").content, repeat), 3)
+            res["speedup"] = round(res["default_ms"] / max(res["fast_ms"], 1e-9), 1)
+            out.append(res)
+    return out
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="JSON-Serialisierung der API-Antworten messen.")
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--http", action="store_true", help="zusätzlich Ende-zu-Ende über TestClient")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args(argv)
+
+    rep: Dict[str, Any] = {"encoder": "rapidjson" if rapidjson is not None else "json (Fallback)",
+                           "repeat": args.repeat, "render": bench_render(args.repeat)}
+    if args.http:
+        rep["http"] = bench_http(max(1, args.repeat // 5))
+    if args.json:
+        print(json.dumps(rep, ensure_ascii=False, indent=2))
+        return
+
+    print(f"Encoder: {rep['encoder']}  (bester von {args.repeat} Läufen)\n")
+    print(f"{'payload':<14}{'bytes':>10}{'fastapi_ms':>12}{'fast_ms':>10}{'ndjson_ms':>11}{'faktor':>8}")
+    for r in rep["render"]:
+        print(f"{r['payload']:<14}{r['bytes']:>10}{r['fastapi_ms']:>12.3f}{r['fast_ms']:>10.3f}"
+              f"{r['ndjson_ms']:>11.3f}{r['speedup']:>7.1f}x")
+    if "http" in rep:
+        print(f"\nEnde-zu-Ende (TestClient)\n{'payload':<14}{'dict_ms':>10}{'fast_ms':>10}{'ndjson_ms':>11}{'faktor':>8}")
+        for r in rep["http"]:
+            print(f"{r['payload']:<14}{r['default_ms']:>10.3f}{r['fast_ms']:>10.3f}"
+                  f"{r['ndjson_ms']:>11.3f}{r['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
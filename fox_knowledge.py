@@ -0,0 +1,92 @@
+#===========================
+# Bulk-Import/-Export der Knowledge-DB (Kommandozeile)
+#===========================
+# Wie POST /knowledge/import und GET /knowledge/export, aber direkt auf der lokalen
+# DB (DB_PATH) – für große Dateien ohne Umweg über HTTP.
+# Fortschritt und Durchsatz laufen auf stderr mit, die Zusammenfassung auf stdout.
+#
+# Aufruf (im Projektordner):
+#   python fox_knowledge.py import fakten.ndjson
+#   python fox_knowledge.py import training.csv --table training --batch 20000 --json
+#   cat fakten.csv | python fox_knowledge.py import - --format csv
+#   python fox_knowledge.py export --table facts --format csv -o fakten.csv
+from __future__ import annotations
+import argparse
+import io
+import json
+import sys
+from typing import List
+
+from fox.skills.knowledge import store
+from fox.skills.knowledge_io import FORMATS, IMPORT_BATCH, Progress, export_chunks, guess_format, import_stream
+
+
+def _err(line: str) -> None:
+    print(line, file=sys.stderr, flush=True)
+
+
+def cmd_import(args) -> int:
+    fmt = args.format or guess_format(args.file)
+    prog = Progress(f"Import {args.table}", every=args.batch, out=_err)
+    if args.file == "-":
+        fh = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+        res = import_stream(fh, args.table, fmt, args.batch, prog)
+    else:
+        with open(args.file, encoding="utf-8-sig", newline="") as fh:
+            res = import_stream(fh, args.table, fmt, args.batch, prog)
+    if args.json:
+        print(json.dumps(res, ensure_ascii=False, indent=2))
+    else:
+        print(f"{res['rows']} Zeilen nach {args.table} importiert in {res['seconds']:.1f} s "
+              f"({res['rows_per_s']:,.0f} Zeilen/s), {res['skipped']} übersprungen.")
+        for e in res["errors"]:
+            print(f"  {e}")
+    return 0
+
+
+def cmd_export(args) -> int:
+    total = store().count(args.table)
+    prog = Progress(f"Export {args.table}", every=max(10000, total // 20), total=total, out=_err)
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in export_chunks(args.table, args.format, progress=prog):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    res = {"table": args.table, "format": args.format, **prog.summary()}
+    if args.json:
+        _err(json.dumps(res, ensure_ascii=False, indent=2))
+    else:
+        _err(f"{res['rows']} Zeilen aus {args.table} exportiert in {res['seconds']:.1f} s "
+             f"({res['rows_per_s']:,.0f} Zeilen/s).")
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Knowledge-DB (facts/training) als NDJSON/CSV importieren oder exportieren.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    imp = sub.add_parser("import", help="Datei (oder - für stdin) per Upsert importieren")
+    imp.add_argument("file")
+    imp.add_argument("--table", choices=("facts", "training"), default="facts")
+    imp.add_argument("--format", choices=FORMATS, help="Standard: aus der Dateiendung")
+    imp.add_argument("--batch", type=int, default=IMPORT_BATCH, help="Zeilen je Transaktion")
+    imp.add_argument("--json", action="store_true")
+    imp.set_defaults(fn=cmd_import)
+
+    exp = sub.add_parser("export", help="Tabelle als Stream ausgeben")
+    exp.add_argument("--table", choices=("facts", "training"), default="facts")
+    exp.add_argument("--format", choices=FORMATS, default="ndjson")
+    exp.add_argument("-o", "--output", default="-", help="Zieldatei (Standard: stdout)")
+    exp.add_argument("--json", action="store_true", help="Zusammenfassung als JSON (stderr)")
+    exp.set_defaults(fn=cmd_export)
+
+    args = ap.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,466 @@
+#===========================
+# Lasttest für die Fox-API (plattformunabhängig, offline)
+#===========================
+# Spielt einen gewichteten Korpus von Anfragen (/handle, /learn, /knowledge/*)
+# mit fester Parallelität (geschlossene Schleife) oder fester Rate (offene
+# Schleife, Latenz ab geplantem Startzeitpunkt) gegen den Server ab.
+#
+# Ohne --url startet das Skript selbst einen Server in einem temporären
+# Arbeitsordner mit Fixture-DBs (wie fox_eval.py) und einem lokalen
+# OpenWeather-Ersatz (Verzögerung/Fehlerquote einstellbar) – kein Netz nötig.
+#
+# Aufruf (im Projektordner):
+#   python fox_load.py --concurrency 16 --duration 20
+#   python fox_load.py --rate 200 --duration 30 --max-p99-ms 150 --max-error-rate 0.01
+#   python fox_load.py --url http://127.0.0.1:8010 --corpus lastkorpus.jsonl --json -
+#
+# Korpus (JSON Lines), {i} wird durch eine laufende Nummer ersetzt:
+#   {"name": "handle/zeit", "weight": 20, "method": "POST", "path": "/handle", "json": {"text": "wie spät ist es"}}
+#
+# Exit-Code 1, wenn eine Schwelle (--max-*, --min-rps, --gate) verletzt ist.
+from __future__ import annotations
+import argparse
+import http.client
+import json
+import os
+import queue
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = Path(__file__).resolve().parent
+
+# ---------- Korpus ----------
+def _handle(name: str, weight: float, text: str) -> Dict[str, Any]:
+    return {"name": name, "weight": weight, "method": "POST", "path": "/handle", "json": {"text": text}}
+
+DEFAULT_CORPUS: List[Dict[str, Any]] = [
+    _handle("handle/zeit", 15, "wie spät ist es"),
+    _handle("handle/gespräch", 15, "hallo fox"),
+    _handle("handle/gespräch", 5, "wer bist du"),
+    _handle("handle/mathe", 8, "was ist 12*7"),
+    _handle("handle/geo", 10, "wo liegt bern"),
+    _handle("handle/wissen", 10, "hauptstadt der schweiz"),
+    _handle("handle/wetter", 8, "wie ist das wetter in bern"),
+    _handle("handle/unbekannt", 5, "blubber quatsch {i}"),
+    {"name": "knowledge/get", "weight": 8, "method": "GET", "path": "/knowledge/get?key=was%20ist%20python"},
+    {"name": "knowledge/search", "weight": 5, "method": "GET", "path": "/knowledge/search?q=python"},
+    {"name": "knowledge/set", "weight": 3, "method": "POST", "path": "/knowledge/set",
+     "json": {"key": "lasttest {i}", "value": "wert {i}"}},
+    {"name": "learn", "weight": 0.2, "method": "POST", "path": "/learn",
+     "json": {"question": "sag mir etwas nettes {i}", "label": "gespräch"}},
+]
+
+
+def load_corpus(path: Optional[Path]) -> List[Dict[str, Any]]:
+    if path is None:
+        return DEFAULT_CORPUS
+    items = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        it = json.loads(line)
+        it.setdefault("method", "POST" if "json" in it else "GET")
+        it.setdefault("weight", 1.0)
+        it.setdefault("name", f"{it['method']} {it['path']}")
+        items.append(it)
+    if not items:
+        raise SystemExit(f"Korpus {path} ist leer.")
+    return items
+
+
+def _fill(value: Any, i: int) -> Any:
+    if isinstance(value, str):
+        return value.replace("{i}", str(i))
+    if isinstance(value, dict):
+        return {k: _fill(v, i) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, i) for v in value]
+    return value
+
+
+# ---------- OpenWeather-Ersatz ----------
+class WeatherStub:
+    """Antwortet wie /data/2.5/weather – mit einstellbarer Verzögerung und Fehlerquote."""
+
+    def __init__(self, delay_ms: float = 50.0, error_rate: float = 0.0):
+        self.delay = delay_ms / 1000.0
+        self.error_rate = error_rate
+        self.calls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.calls += 1
+                q = (parse_qs(urlsplit(self.path).query).get("q") or ["?"])[0]
+                time.sleep(stub.delay)
+                if random.random() < stub.error_rate:
+                    body, status = b'{"cod": 500, "message": "stub error"}', 500
+                else:
+                    body, status = json.dumps({
+                        "name": q, "sys": {"country": "CH"},
+                        "main": {"temp": 21.4, "feels_like": 20.9, "humidity": 55},
+                        "weather": [{"description": "leicht bewölkt"}], "wind": {"speed": 3.2},
+                    }).encode("utf-8"), 200
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/data/2.5/weather"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ---------- Server im Arbeitsordner ----------
+_SERVER_BOOT = """
+import os, sys
+from pathlib import Path
+sys.path.insert(0, {root!r})
+os.chdir({work!r})
+import fox.skills.knowledge as kn
+import fox.skills.geo_skills as geo
+kn.DB_PATH = Path({work!r}) / "knowledge.db"
+geo.DB_PATH = os.path.join({work!r}, "geo.db")
+import uvicorn, server
+uvicorn.run(server.app, host="127.0.0.1", port={port}, log_level="warning")
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def local_server(work: Path, weather_url: str, startup_timeout: float = 120.0) -> Iterator[str]:
+    """Startet server:app mit Fixture-DBs; liefert die Basis-URL."""
+    from fox_eval import build_fixtures, load_training
+    build_fixtures(work, load_training(ROOT / "knowledge.db"))
+    port = _free_port()
+    env = dict(os.environ, OPENWEATHER_URL=weather_url, OPENWEATHER_API_KEY="lasttest",
+               FOX_LOG_LEVEL=os.getenv("FOX_LOG_LEVEL", "WARNING"))
+    log = open(work / "server.log", "w", encoding="utf-8")
+    proc = subprocess.Popen([sys.executable, "-c", _SERVER_BOOT.format(root=str(ROOT), work=str(work), port=port)],
+                            cwd=work, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server beendet (Code {proc.returncode}), siehe {work / 'server.log'}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+                conn.request("GET", "/")
+                if conn.getresponse().status == 200:
+                    break
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("Server nicht rechtzeitig bereit")
+            time.sleep(0.2)
+        yield base
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        log.close()
+
+
+# ---------- Lastgenerator ----------
+class Recorder:
+    def __init__(self):
+        self.lat: Dict[str, List[float]] = {}
+        self.status: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ms: float, status: str) -> None:
+        with self._lock:
+            self.lat.setdefault(name, []).append(ms)
+            st = self.status.setdefault(name, {})
+            st[status] = st.get(status, 0) + 1
+
+
+class _Conn(threading.local):
+    conn: Optional[http.client.HTTPConnection] = None
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"n": 0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    v = sorted(values)
+    pick = lambda p: v[min(len(v) - 1, int(round(p / 100.0 * (len(v) - 1))))]
+    return {"n": len(v), "p50": round(pick(50), 3), "p90": round(pick(90), 3), "p99": round(pick(99), 3),
+            "max": round(v[-1], 3), "mean": round(sum(v) / len(v), 3)}
+
+
+class LoadRunner:
+    def __init__(self, base_url: str, corpus: List[Dict[str, Any]], timeout: float = 30.0, seed: int = 0):
+        u = urlsplit(base_url)
+        self.host, self.port = u.hostname or "127.0.0.1", u.port or 80
+        self.prefix = u.path.rstrip("/")
+        self.corpus = corpus
+        self.weights = [float(it.get("weight", 1.0)) for it in corpus]
+        self.timeout = timeout
+        self.seed = seed
+        self._local = _Conn()
+        self._counter = 0
+        self._counter_lock = threading.Lock()
+
+    def _next_i(self) -> int:
+        with self._counter_lock:
+            self._counter += 1
+            return self._counter
+
+    def _send(self, item: Dict[str, Any]) -> str:
+        """Eine Anfrage über die Keep-Alive-Verbindung des Threads; liefert den Status als Text."""
+        i = self._next_i()
+        path = self.prefix + _fill(item["path"], i)
+        body, headers = None, {}
+        if "json" in item:
+            body = json.dumps(_fill(item["json"], i), ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        for attempt in (0, 1):
+            conn = self._local.conn
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request(item["method"], path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                return str(resp.status)
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                self._local.conn = None
+                if attempt:  # zweiter Versuch auf frischer Verbindung ebenfalls fehlgeschlagen
+                    return type(e).__name__
+        return "error"
+
+    def closed_loop(self, concurrency: int, duration: float, rec: Recorder) -> float:
+        deadline = time.perf_counter() + duration
+
+        def worker(n: int) -> None:
+            rnd = random.Random(self.seed + n)
+            while time.perf_counter() < deadline:
+                item = rnd.choices(self.corpus, self.weights)[0]
+                t0 = time.perf_counter()
+                status = self._send(item)
+                rec.add(item["name"], (time.perf_counter() - t0) * 1000.0, status)
+
+        return self._run_threads(worker, concurrency)
+
+    def open_loop(self, rate: float, duration: float, concurrency: int, rec: Recorder,
+                  poisson: bool = False) -> float:
+        """Feste Ankunftsrate; Latenz zählt ab dem geplanten Start (keine 'coordinated omission')."""
+        jobs: "queue.Queue[Optional[Tuple[float, Dict[str, Any]]]]" = queue.Queue()
+
+        def worker(n: int) -> None:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                planned, item = job
+                status = self._send(item)
+                rec.add(item["name"], (time.perf_counter() - planned) * 1000.0, status)
+
+        def schedule() -> None:
+            rnd = random.Random(self.seed)
+            start = time.perf_counter()
+            t = start
+            while t < start + duration:
+                delay = t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                jobs.put((t, rnd.choices(self.corpus, self.weights)[0]))
+                t += rnd.expovariate(rate) if poisson else 1.0 / rate
+            for _ in range(concurrency):
+                jobs.put(None)
+
+        threading.Thread(target=schedule, daemon=True).start()
+        return self._run_threads(worker, concurrency)
+
+    @staticmethod
+    def _run_threads(worker, n: int) -> float:
+        t0 = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(k,), daemon=True) for k in range(max(1, n))]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        return time.perf_counter() - t0
+
+
+# ---------- Auswertung & Schwellen ----------
+def summarize(rec: Recorder, elapsed: float) -> Dict[str, Any]:
+    def block(lat: List[float], status: Dict[str, int]) -> Dict[str, Any]:
+        n = sum(status.values())
+        rejected = status.get("503", 0)
+        errors = sum(c for s, c in status.items() if not s.startswith("2") and s != "503")
+        return {"requests": n, "rps": round(n / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(errors / n, 4) if n else 0.0,
+                "reject_rate": round(rejected / n, 4) if n else 0.0,
+                "status": dict(sorted(status.items())), "latency_ms": _percentiles(lat)}
+
+    all_lat: List[float] = []
+    all_status: Dict[str, int] = {}
+    per: Dict[str, Any] = {}
+    for name in sorted(rec.lat):
+        per[name] = block(rec.lat[name], rec.status[name])
+        all_lat += rec.lat[name]
+        for s, c in rec.status[name].items():
+            all_status[s] = all_status.get(s, 0) + c
+    return {"elapsed_s": round(elapsed, 3), "total": block(all_lat, all_status), "endpoints": per}
+
+
+def check_gates(report: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    fails = []
+    tot = report["total"]
+    lat = tot["latency_ms"]
+    if args.max_p50_ms is not None and lat["p50"] > args.max_p50_ms:
+        fails.append(f"p50 {lat['p50']:.1f} ms > {args.max_p50_ms} ms")
+    if args.max_p99_ms is not None and lat["p99"] > args.max_p99_ms:
+        fails.append(f"p99 {lat['p99']:.1f} ms > {args.max_p99_ms} ms")
+    if args.max_error_rate is not None and tot["error_rate"] > args.max_error_rate:
+        fails.append(f"Fehlerquote {tot['error_rate']:.4f} > {args.max_error_rate}")
+    if args.max_reject_rate is not None and tot["reject_rate"] > args.max_reject_rate:
+        fails.append(f"503-Quote {tot['reject_rate']:.4f} > {args.max_reject_rate}")
+    if args.min_rps is not None and tot["rps"] < args.min_rps:
+        fails.append(f"Durchsatz {tot['rps']:.1f}/s < {args.min_rps}/s")
+    for gate in args.gate:
+        # NAME:p99=120  |  NAME:error_rate=0.01
+        try:
+            name, rule = gate.rsplit(":", 1)
+            key, limit = rule.split("=", 1)
+            limit_f = float(limit)
+        except ValueError:
+            raise SystemExit(f"Ungültige Schwelle '{gate}' (Format NAME:p99=MS)")
+        ep = report["endpoints"].get(name)
+        if ep is None:
+            fails.append(f"{name}: keine Anfragen")
+            continue
+        value = ep["latency_ms"].get(key, ep.get(key))
+        if value is None:
+            raise SystemExit(f"Unbekannte Kennzahl '{key}' in '{gate}'")
+        if value > limit_f:
+            fails.append(f"{name}: {key} {value} > {limit_f}")
+    return fails
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    cfg = report["config"]
+    mode = f"rate={cfg['rate']}/s" if cfg["rate"] else f"concurrency={cfg['concurrency']}"
+    print(f"Ziel: {cfg['url']}  {mode}  Dauer {report['elapsed_s']:.1f}s")
+    print(f"\n{'anfrage':<20}{'n':>7}{'rps':>9}{'fehler%':>9}{'503%':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    rows = list(report["endpoints"].items()) + [("GESAMT", report["total"])]
+    for name, r in rows:
+        l = r["latency_ms"]
+        print(f"{name:<20}{r['requests']:>7}{r['rps']:>9.1f}{100 * r['error_rate']:>9.2f}"
+              f"{100 * r['reject_rate']:>7.2f}{l['p50']:>9.2f}{l['p90']:>9.2f}{l['p99']:>9.2f}{l['max']:>9.2f}")
+    if report.get("weather_stub_calls") is not None:
+        print(f"\nOpenWeather-Ersatz: {report['weather_stub_calls']} Aufrufe")
+    print("\nSchwellen: " + ("OK" if not report["failures"] else "VERLETZT"))
+    for f in report["failures"]:
+        print(f"  - {f}")
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    corpus = load_corpus(args.corpus)
+    stub = WeatherStub(args.weather_delay_ms, args.weather_error_rate)
+    tmp = None
+    try:
+        if args.url:
+            server_cm = _nullserver(args.url)
+        else:
+            tmp = Path(tempfile.mkdtemp(prefix="fox_load_"))
+            server_cm = local_server(tmp, stub.url)
+        with server_cm as base:
+            runner = LoadRunner(base, corpus, timeout=args.timeout, seed=args.seed)
+
+            def phase(duration: float, rec: Recorder) -> float:
+                if args.rate:
+                    return runner.open_loop(args.rate, duration, args.concurrency, rec, poisson=args.poisson)
+                return runner.closed_loop(args.concurrency, duration, rec)
+
+            if args.warmup > 0:
+                phase(args.warmup, Recorder())
+            rec = Recorder()
+            elapsed = phase(args.duration, rec)
+        report = summarize(rec, elapsed)
+        report["config"] = {"url": args.url or "lokal", "rate": args.rate, "concurrency": args.concurrency,
+                            "duration_s": args.duration, "warmup_s": args.warmup, "poisson": args.poisson,
+                            "corpus": str(args.corpus) if args.corpus else "default",
+                            "weather_delay_ms": args.weather_delay_ms}
+        report["weather_stub_calls"] = None if args.url else stub.calls
+        report["failures"] = check_gates(report, args)
+        return report
+    finally:
+        stub.close()
+        if tmp is not None and not args.keep:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+@contextmanager
+def _nullserver(url: str) -> Iterator[str]:
+    yield url.rstrip("/")
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Lasttest für die Fox-API mit Schwellen (Regression-Gate).")
+    ap.add_argument("--url", default=None, help="laufender Server (sonst lokal mit Fixture-DBs starten)")
+    ap.add_argument("--corpus", type=Path, default=None, help="JSON-Lines-Korpus (sonst eingebauter)")
+    ap.add_argument("--concurrency", type=int, default=8, help="parallele Clients (bei --rate: max. offene Anfragen)")
+    ap.add_argument("--rate", type=float, default=None, help="Anfragen pro Sekunde (offene Schleife)")
+    ap.add_argument("--poisson", action="store_true", help="zufällige statt gleichmäßiger Ankünfte")
+    ap.add_argument("--duration", type=float, default=15.0, help="Sekunden Messung")
+    ap.add_argument("--warmup", type=float, default=2.0, help="Sekunden Aufwärmen (nicht gezählt)")
+    ap.add_argument("--timeout", type=float, default=30.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--weather-delay-ms", type=float, default=50.0, help="Antwortzeit des OpenWeather-Ersatzes")
+    ap.add_argument("--weather-error-rate", type=float, default=0.0)
+    ap.add_argument("--keep", action="store_true", help="Arbeitsordner des lokalen Servers behalten")
+    ap.add_argument("--max-p50-ms", type=float, default=None)
+    ap.add_argument("--max-p99-ms", type=float, default=None)
+    ap.add_argument("--max-error-rate", type=float, default=0.01, help="Anteil Fehler (ohne 503)")
+    ap.add_argument("--max-reject-rate", type=float, default=None, help="Anteil 503 (Überlast)")
+    ap.add_argument("--min-rps", type=float, default=None)
+    ap.add_argument("--gate", action="append", default=[], help="pro Anfrage, z. B. handle/zeit:p99=50")
+    ap.add_argument("--json", type=Path, default=None, help="Ergebnis als JSON schreiben ('-' = stdout)")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+    if args.json is None:
+        _print_report(report)
+    elif str(args.json) == "-":
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        args.json.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        _print_report(report)
+        print(f"\nJSON: {args.json}")
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,20 @@
 from __future__ import annotations
-import os, sys, time
+import itertools, json, os, sys, time
+from typing import Callable, Optional
 import requests
 
 from fox.speech.speech_in import SpeechIn
 from fox.speech.speech_out import Speech
+from fox.triggers import match_triggers
 
 USE_SERVER   = True
 SERVER_URL   = os.getenv("FOX_SERVER_URL", "http://127.0.0.1:8010/handle")
+WS_URL       = os.getenv("FOX_WS_URL", "ws://127.0.0.1:8010/ws")   # leer → nur HTTP
+SESSION_ID   = os.getenv("FOX_SESSION", "hotword")
 LANG         = os.getenv("FOX_LANG", "de")
 DEVICE_INDEX = os.getenv("FOX_MIC", None)
 MAX_HOTWORD_WINDOW = 4.0
 MAX_COMMAND_WINDOW = 10.0
-HOTWORDS = ("hey fox", "hey fuchs", "hi fox", "hallo fox")
 
 fox = None
 if not USE_SERVER:
@@ -19,13 +22,80 @@ if not USE_SERVER:
     fox = FoxAssistant()
 
 def contains_hotword(text: str) -> bool:
-    t = (text or "").strip().lower()
-    if not t: return False
-    return any(hw in t for hw in HOTWORDS)
+    return "hotword" in match_triggers(text)
 
-def ask_server(text: str) -> str:
+class FoxLink:
+    """
+    Dauerhafte WebSocket-Verbindung zum Server (/ws): kein Verbindungsaufbau pro
+    Befehl, Zwischenantworten (z. B. "ich schaue nach dem Wetter") kommen sofort.
+    Bricht die Verbindung ab, wird beim nächsten Befehl neu verbunden; klappt das
+    nicht, geht der Befehl per HTTP an /handle. Nur dann: ist der Befehl einmal
+    gesendet, läuft er auf dem Server – bleibt die Antwort aus, wird er nicht
+    wiederholt (sonst z. B. ein Termin doppelt), sondern ein Fehler gemeldet.
+    """
+
+    def __init__(self, url: str = WS_URL, session: str = SESSION_ID, timeout: float = 20.0):
+        self.url = f"{url}?session={session}" if url else ""
+        self.session = session
+        self.timeout = timeout
+        self._ws = None
+        self._ids = itertools.count(1)
+
+    def _connect(self):
+        if self._ws is None:
+            from websockets.sync.client import connect  # optional; sonst HTTP
+            self._ws = connect(self.url, open_timeout=5, ping_interval=20)
+            json.loads(self._ws.recv(timeout=5))  # hello
+        return self._ws
+
+    def close(self) -> None:
+        if self._ws is not None:
+            try: self._ws.close()
+            except Exception: pass
+            self._ws = None
+
+    def ask(self, text: str, on_partial: Optional[Callable[[str], None]] = None) -> str:
+        if self.url:
+            try:
+                mid = self._send(text)
+            except Exception as e:
+                print(f"[Hotword] WebSocket nicht verfügbar ({e}) – nutze HTTP.")
+                self.close()
+            else:
+                try:
+                    return self._receive(mid, on_partial)
+                except Exception as e:
+                    self.close()  # späte Antwort dieses Befehls nicht dem nächsten zuordnen
+                    return f"Keine Antwort vom Server: {str(e) or type(e).__name__}"
+        return ask_server(text, self.session)
+
+    def _send(self, text: str) -> int:
+        ws = self._connect()
+        mid = next(self._ids)
+        ws.send(json.dumps({"id": mid, "text": text}, ensure_ascii=False))
+        return mid
+
+    def _receive(self, mid: int, on_partial: Optional[Callable[[str], None]]) -> str:
+        ws = self._ws
+        deadline = time.monotonic() + self.timeout
+        while True:
+            msg = json.loads(ws.recv(timeout=max(0.1, deadline - time.monotonic())))
+            kind = msg.get("type")
+            if kind == "ping":
+                ws.send(json.dumps({"type": "pong", "t": msg.get("t")}))
+            elif msg.get("id") != mid:
+                continue
+            elif kind == "partial":
+                if msg.get("text") and on_partial is not None:
+                    on_partial(msg["text"])
+            elif kind == "reply":
+                return (msg.get("reply") or "").strip()
+            elif kind == "error":
+                return f"Server-Fehler: {msg.get('error')}"
+
+def ask_server(text: str, session: Optional[str] = None) -> str:
     try:
-        r = requests.post(SERVER_URL, json={"text": text}, timeout=20)
+        r = requests.post(SERVER_URL, json={"text": text, "session": session}, timeout=20)
         if r.ok:
             data = r.json()
             return (data.get("reply") or "").strip()
@@ -38,6 +108,7 @@ def main():
     mic = SpeechIn(lang=LANG, model_path=None, device=device)
     tts = Speech(enabled=True)
     tts.say("Hotword aktiviert.")
+    link = FoxLink() if USE_SERVER else None
 
     while True:
         try:
@@ -49,12 +120,14 @@ def main():
             if not cmd:
                 tts.say("Ich habe nichts verstanden.")
                 continue
-            reply = ask_server(cmd) if USE_SERVER else fox.handle(cmd)
+            reply = link.ask(cmd, on_partial=tts.say) if USE_SERVER else fox.handle(cmd)
             print(f"[User]: {cmd}")
             print(f"[Fox ]: {reply}")
             tts.say(reply)
         except KeyboardInterrupt:
             tts.say("Hotword aus.")
+            if link is not None:
+                link.close()
             break
         except Exception as e:
             print(f"[Hotword] Warnung: {e}")
@@ -4,20 +4,27 @@ import os
 import re
 import json
 import logging
-import sqlite3
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from collections import deque
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
 from datetime import datetime
+from uuid import uuid4
+import random
 
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neural_network import MLPClassifier
+# sklearn/joblib nur fürs Training – Serving läuft NumPy-only über das Artefakt
+from fox.cache import LRUCache, normalize_text
+from fox.session import Session, SessionStore
+from fox.sync import VersionWatcher, file_lock
+from fox.triggers import match_triggers
+from fox.intent import DEFAULT_ENGINE, CompiledIntentModel, export_artifact, load_artifact, current_version
 
 # ===== Skills zentral laden =====
 from fox.skills import (
     geo_skill,
+    geo_skill_many,
     get_weather,
     mathe_skill,
     try_auto_calc,
@@ -26,13 +33,21 @@ from fox.skills import (
     termin_skill,
     init_knowledge_db,
     set_fact,
-    get_fact,
-    search_facts,
+    lookup_fact,
+    lookup_facts,
+    semantic_fact,
+    add_training_pairs,
 )
+from fox.skills.knowledge import store as knowledge_store
+from fox.corpus import TrainingCorpus
+from fox.autolearn import AutoLearner
 
 # ===== Sprach Ein-/Ausgabe =====
-from fox.speech import SpeechIn, Speech
-import sounddevice as sd
+# Whisper/torch, sounddevice und pyttsx3 werden erst im CLI geladen (siehe main());
+# der API-Server braucht kein Audio.
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from fox.speech import Speech
 
 # ===== Labels =====
 import fox.labels as labels
@@ -47,19 +62,48 @@ load_dotenv()
 # =========================
 # Konfiguration & Konstanten
 # =========================
-MODEL_PATH       = Path("fox_intent.pkl")
+MODEL_PATH       = Path("fox_intent")          # versioniertes Artefakt (Ordner, mmap)
+LEGACY_MODEL_PATH = Path("fox_intent.pkl")     # alter joblib-Pickle, wird beim Start migriert
 CALENDAR_PATH    = Path("calendar.json")
 
 CONF_THRESHOLD   = 0.60
 SIM_THRESHOLD    = 0.72
-MEMORY_SIZE      = 200
+MEMORY_SIZE      = 200                          # Gedächtnis der Default-Session (CLI)
+SESSION_MAX      = int(os.getenv("FOX_SESSION_MAX", "1000"))        # gleichzeitige Sessions (LRU)
+SESSION_TTL      = float(os.getenv("FOX_SESSION_TTL", "3600"))      # Sekunden ohne Zugriff
+SESSION_MEMORY   = int(os.getenv("FOX_SESSION_MEMORY", "100"))      # Einträge pro Session
+MEMORY_TOTAL     = int(os.getenv("FOX_MEMORY_TOTAL", "20000"))      # Einträge über alle Sessions
 RANDOM_STATE     = 42
 MLP_MAX_ITER     = 400
-
-AUTO_LEARN            = True
+INTENT_ENGINE    = os.getenv("FOX_INTENT_ENGINE", DEFAULT_ENGINE).lower()  # mlp | sgd | logreg | cnb | centroid
+MODEL_PRECISION  = os.getenv("FOX_MODEL_PRECISION", "float32").lower()     # float64 | float32 | int8
+INTENT_FEATURES  = os.getenv("FOX_INTENT_FEATURES", "tfidf").lower()       # tfidf | hashing
+HASH_FEATURES    = int(os.getenv("FOX_HASH_FEATURES", str(2 ** 14)))       # feste Dimension (hashing)
+INCREMENTAL_EPOCHS = 5      # partial_fit-Durchläufe pro Lern-Batch (nur hashing)
+INCREMENTAL_REPLAY = 32     # alte Beispiele, die beim inkrementellen Lernen mitlaufen
+
+PREDICTION_CACHE_SIZE = int(os.getenv("FOX_PREDICTION_CACHE", "2048"))   # 0 = aus
+REPLY_CACHE_SIZE      = int(os.getenv("FOX_REPLY_CACHE", "512"))         # 0 = aus
+# Nur Skills mit zeitunabhängiger Antwort (Zeit/Wetter/Termin/Gespräch nie; Wissen ändert sich per /knowledge/set)
+REPLY_CACHE_LABELS    = {l.strip() for l in os.getenv("FOX_REPLY_CACHE_LABELS", "geo,mathe").split(",") if l.strip()}
+
+# Zwischenantworten fürs Streaming (/ws), bevor ein langsamer Skill fertig ist
+PARTIAL_TEXTS         = labels.LABEL_TEXTS.get("partial", {})
+# Zeitbudgets (Sekunden) für langsame I/O-Skills; der Server führt sie in einem eigenen
+# Pool aus und antwortet nach Ablauf mit LABEL_TEXTS["degraded"]. Format "label:sek,…"
+SKILL_BUDGETS         = {l.split(":")[0].strip(): float(l.split(":")[1])
+                         for l in os.getenv("FOX_SKILL_BUDGETS", "wetter:2.5").split(",") if ":" in l}
+
+# Auto-Lernen (fox/autolearn.py): unsichere Eingaben sammeln, gebündelt nachtrainieren
+AUTO_LEARN            = os.getenv("FOX_AUTO_LEARN", "1") != "0"                # sammeln + Vorschläge
+AUTO_LEARN_ACCEPT     = os.getenv("FOX_AUTO_LEARN_ACCEPT", "0") == "1"        # Vorschläge ungeprüft lernen (Self-Training!)
 AUTO_LEARN_MIN_CONF   = 0.15
 AUTO_LEARN_MAX_LEN    = 120
-AUTO_LEARN_BLACKLIST  = {}
+AUTO_LEARN_BLACKLIST  = {b.strip() for b in os.getenv("FOX_AUTO_LEARN_BLACKLIST", "").split(",") if b.strip()}  # Labels oder Wörter
+AUTO_LEARN_MIN_HITS   = int(os.getenv("FOX_AUTO_LEARN_MIN_HITS", "2"))        # so oft muss eine Eingabe vorkommen
+AUTO_LEARN_QUEUE_MAX  = int(os.getenv("FOX_AUTO_LEARN_QUEUE", "5000"))        # Einträge in learn_queue
+AUTO_LEARN_BATCH      = int(os.getenv("FOX_AUTO_LEARN_BATCH", "200"))         # höchstens so viele Paare je Nachtraining
+AUTO_LEARN_INTERVAL   = float(os.getenv("FOX_AUTO_LEARN_INTERVAL", "600"))    # Sekunden zwischen zwei Reviews
 
 LOG_LEVEL = os.getenv("FOX_LOG_LEVEL", "INFO").upper()
 logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO),
@@ -70,63 +114,6 @@ for name in ("comtypes", "comtypes.client", "comtypes.gen", "pyttsx3"):
     lg.setLevel(logging.WARNING)
     lg.propagate = False
 
-# ======================
-# Knowledge-DB (Training)
-# ======================
-def _knowledge_db_path() -> Path:
-    root = Path("knowledge.db")
-    if root.exists():
-        return root
-    fox_db = Path(__file__).resolve().parent / "fox" / "knowledge.db"
-    if fox_db.exists():
-        return fox_db
-    return root
-
-def _open_knowledge():
-    p = _knowledge_db_path()
-    con = sqlite3.connect(p)
-    con.execute("PRAGMA journal_mode=WAL;")
-    con.execute("PRAGMA temp_store=MEMORY;")
-    return con
-
-def _ensure_training_table():
-    try:
-        with _open_knowledge() as con:
-            con.execute("""
-                CREATE TABLE IF NOT EXISTS training(
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    text  TEXT NOT NULL,
-                    label TEXT NOT NULL,
-                    created_at REAL
-                )
-            """)
-            con.execute("""
-                CREATE UNIQUE INDEX IF NOT EXISTS idx_training_unique
-                ON training(text, label)
-            """)
-            con.commit()
-    except Exception as e:
-        log.warning("Konnte training-Tabelle nicht anlegen: %s", e)
-
-def db_add_training_pair(text: str, label: str) -> None:
-    text = (text or "").strip()
-    label = (label or "").strip()
-    if not text or not label:
-        return
-    _ensure_training_table()
-    with _open_knowledge() as con:
-        con.execute(
-            "INSERT OR IGNORE INTO training(text,label,created_at) VALUES(?,?,?)",
-            (text, label, datetime.now().timestamp())
-        )
-        con.commit()
-
-def db_list_training() -> list[tuple[str, str]]:
-    _ensure_training_table()
-    with _open_knowledge() as con:
-        cur = con.execute("SELECT text, label FROM training ORDER BY id ASC")
-        return [(t, l) for (t, l) in cur.fetchall()]
-
 # ======================
 # Utils / Helfer
 # ======================
@@ -145,16 +132,11 @@ def extract_datetime(text: str) -> Dict[str, Optional[str]]:
     clock = f"{int(m.group(1)):02d}:{int(m.group(2)):02d}" if m else None
     return {"when": when, "time": clock}
 
-TIME_TRIGGERS    = ("uhr", "zeit", "datum", "tag", "heute", "morgen")
-WEATHER_TRIGGERS = ("wetter", "temperatur", "grad", "kalt", "heiss", "heiß", "regen", "sonnig", "sturm", "schnee")
-
 def has_time_trigger(s: str) -> bool:
-    s = (s or "").lower()
-    return any(k in s for k in TIME_TRIGGERS)
+    return "time" in match_triggers(s)
 
 def has_weather_trigger(s: str) -> bool:
-    s = (s or "").lower()
-    return any(k in s for k in WEATHER_TRIGGERS)
+    return "wetter" in match_triggers(s)
 
 def extract_weather_query(text: str) -> str:
     t = (text or "").strip()
@@ -181,107 +163,300 @@ def process_input(fox, speech: Speech, user_text: str) -> None:
 # ===========================
 @dataclass
 class IntentModel:
-    clf: MLPClassifier
-    vectorizer: TfidfVectorizer
+    """Trainings-Seite (sklearn). Zum Servieren wird das exportierte Artefakt geladen."""
+    clf: Any
+    vectorizer: Any
     meta: Dict[str, Any]
 
+    @property
+    def classes(self) -> List[str]:
+        return list(self.clf.classes_)
+
+    def transform(self, texts: List[str]):
+        return self.vectorizer.transform(texts)
+
+    def predict_proba(self, X):
+        return self.clf.predict_proba(X)
+
     @staticmethod
-    def fit_from_texts(texts: List[str], labels_: List[str]) -> "IntentModel":
-        vec = TfidfVectorizer(ngram_range=(1, 2), lowercase=True, strip_accents=None, min_df=1)
-        X = vec.fit_transform(texts)
-        clf = MLPClassifier(
-            hidden_layer_sizes=(512, 256),
-            activation="relu",
-            solver="adam",
-            alpha=1e-4,
-            max_iter=MLP_MAX_ITER,
-            early_stopping=True,
-            random_state=RANDOM_STATE,
-            verbose=False
-        )
-        clf.fit(X, labels_)
-        meta = {"n_samples": len(texts), "trained_at": datetime.now().isoformat(timespec="seconds")}
+    def _new_meta(n_samples: int, engine: str, features: str) -> Dict[str, Any]:
+        now = datetime.now()
+        return {"n_samples": n_samples, "engine": engine, "features": features,
+                "trained_at": now.isoformat(timespec="seconds"),
+                "version": f"{now:%Y%m%d%H%M%S}-{uuid4().hex[:8]}"}
+
+    @staticmethod
+    def fit_from_texts(texts: List[str], labels_: List[str], engine: Optional[str] = None) -> "IntentModel":
+        from fox.intent.engines import fit_engine
+        engine = (engine or INTENT_ENGINE).lower()
+        vec, clf = fit_engine(texts, labels_, engine, random_state=RANDOM_STATE, max_iter=MLP_MAX_ITER,
+                              features=INTENT_FEATURES, n_features=HASH_FEATURES)
+        return IntentModel(clf=clf, vectorizer=vec, meta=IntentModel._new_meta(len(texts), engine, INTENT_FEATURES))
+
+    def partial_fit(self, texts: List[str], labels_: List[str], replay: Sequence[Tuple[str, str]] = ()) -> bool:
+        """Inkrementell nachtrainieren (Hashing-Features); False → volles Training nötig."""
+        from fox.intent.engines import partial_fit_engine
+        if not partial_fit_engine(self.vectorizer, self.clf, texts, labels_,
+                                  epochs=INCREMENTAL_EPOCHS, replay=replay):
+            return False
+        self.meta = IntentModel._new_meta(self.meta.get("n_samples", 0) + len(texts),
+                                          self.meta.get("engine", INTENT_ENGINE), INTENT_FEATURES)
+        return True
+
+    def save(self, path: Path, check_texts: Optional[List[str]] = None) -> None:
+        # check_texts: argmax muss bei reduzierter Genauigkeit identisch bleiben (sonst Fallback)
+        # Hashing: sklearn-Zustand mitsichern, damit später inkrementell weitergelernt werden kann
+        def _trainer(folder: Path) -> None:
+            import joblib
+            joblib.dump((self.clf, self.vectorizer, self.meta), folder / "trainer.joblib")
+        export_artifact(self.clf, self.vectorizer, self.meta, path,
+                        precision=MODEL_PRECISION, check_texts=check_texts,
+                        extra=_trainer if self.meta.get("features") == "hashing" else None)
+
+    @staticmethod
+    def load_trainer(path: Path) -> Optional["IntentModel"]:
+        """sklearn-Zustand der aktiven Version (nur bei Hashing-Features vorhanden)."""
+        name = current_version(path)
+        f = Path(path) / name / "trainer.joblib" if name else None
+        if f is None or not f.exists():
+            return None
+        import joblib
+        clf, vec, meta = joblib.load(f)
         return IntentModel(clf=clf, vectorizer=vec, meta=meta)
 
-    def save(self, path: Path) -> None:
-        joblib.dump((self.clf, self.vectorizer, self.meta), path)
+    @staticmethod
+    def load(path: Path) -> CompiledIntentModel:
+        return load_artifact(path)
 
     @staticmethod
-    def load(path: Path) -> "IntentModel":
+    def load_legacy(path: Path) -> "IntentModel":
+        import joblib
         data = joblib.load(path)
         if isinstance(data, tuple) and len(data) == 3:
             clf, vec, meta = data
         else:
             clf, vec = data
             meta = {}
+        meta = dict(meta)
+        meta.setdefault("engine", "mlp")
+        meta.setdefault("features", "tfidf")
+        meta.setdefault("version", f"legacy-{uuid4().hex[:8]}")
         return IntentModel(clf=clf, vectorizer=vec, meta=meta)
 
 # ==========================
 # Fox Assistant Core
 # ==========================
+class ModelSnapshot(NamedTuple):
+    """
+    Unveränderlicher Modellstand (Modell + Trainingstexte + Index).
+    Ein Request holt sich EINMAL self._snap und arbeitet durchgehend damit;
+    Lernen/Reload bauen einen neuen Snapshot und tauschen nur die Referenz (RCU).
+    """
+    model: CompiledIntentModel
+    train_texts: Tuple[str, ...]
+    train_labels: Tuple[str, ...]
+    index: Any                      # SimilarityIndex über train_texts
+    texts_lc: FrozenSet[str]
+    exact_labels: Dict[str, str]    # nach dem Bau nicht mehr verändert
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.model.meta.get("version")
+
+    @staticmethod
+    def build(model: CompiledIntentModel, texts: List[str], labels_: List[str]) -> "ModelSnapshot":
+        exact: Dict[str, str] = {}
+        for tt, ll in zip(texts, labels_):
+            exact.setdefault((tt or "").strip().lower(), ll)
+        return ModelSnapshot(
+            model=model,
+            train_texts=tuple(texts),
+            train_labels=tuple(labels_),
+            index=model.index(list(texts)),
+            texts_lc=frozenset((t or "").strip().lower() for t in texts),
+            exact_labels=exact,
+        )
+
+
+class Turn(NamedTuple):
+    """
+    Ein Request zwischen Intent-Entscheidung und Skill (prepare → run_turn → complete).
+    reply ist gesetzt, wenn prepare schon fertig geantwortet hat.
+    """
+    text: str
+    session: Session
+    label: Optional[str]
+    conf: float
+    version: Optional[str]
+    reply: Optional[str] = None
+
+
 class FoxAssistant:
+    """
+    Nebenläufigkeit:
+    - Lesen (handle, handle_many, topk_predict …) ohne Sperre auf einem Snapshot
+    - Schreiben (learn_pair, reload_model, sync_model) seriell unter _write_lock
+      (+ Datei-Sperre über Prozesse) und am Ende ein atomarer Referenz-Tausch
+    - Gedächtnis/letzte Vorhersage liegen in Session-Objekten, nicht hier
+    """
+
     def __init__(self):
-        self.memory = deque(maxlen=MEMORY_SIZE)
-        self._load_training_from_db()
+        self.default_session = Session("default", MEMORY_SIZE)
+        self.sessions = SessionStore(SESSION_MAX, SESSION_TTL, SESSION_MEMORY, MEMORY_TOTAL)
+        self._pred_cache = LRUCache(PREDICTION_CACHE_SIZE)   # Text → (label, conf, known, topk)
+        self._reply_cache = LRUCache(REPLY_CACHE_SIZE)       # (label, Text) → Antwort
+        # Optional: bekommt (Stufe, Sekunden, Label) je handle-Stufe (Auswertung/Metriken)
+        self.stage_observer: Optional[Callable[[str, float, Optional[str]], None]] = None
+        self._write_lock = threading.RLock()
+        self._trainer: Optional[IntentModel] = None   # nur unter _write_lock
+        self._corpus = TrainingCorpus(BASE_TRAIN["texts"], BASE_TRAIN["labels"])  # nur unter _write_lock
+        # Unsichere Eingaben → learn_queue; review() lernt gebündelt (start() startet den Thread)
+        self.autolearn = AutoLearner(
+            self.score_many, self.learn_pairs, sync=self.sync_model, enabled=AUTO_LEARN, auto_accept=AUTO_LEARN_ACCEPT, conf_threshold=CONF_THRESHOLD,
+            min_conf=AUTO_LEARN_MIN_CONF, max_len=AUTO_LEARN_MAX_LEN, blacklist=AUTO_LEARN_BLACKLIST,
+            min_hits=AUTO_LEARN_MIN_HITS, queue_max=AUTO_LEARN_QUEUE_MAX, batch=AUTO_LEARN_BATCH,
+            interval=AUTO_LEARN_INTERVAL)
+
+        # Modell laden oder trainieren (bei Engine-/Feature-Wechsel per Config neu trainieren).
+        # Unter der Publish-Sperre, damit parallel startende Worker nur einmal trainieren.
+        texts, labels_ = self._load_training()
+        with self.publish_lock():
+            model = self._load_model(texts)
+            if (model is not None and model.meta.get("engine", "mlp") == INTENT_ENGINE
+                    and model.meta.get("features", "tfidf") == INTENT_FEATURES):
+                log.info("Modell geladen (%s, engine=%s, features=%s).", MODEL_PATH, INTENT_ENGINE, INTENT_FEATURES)
+            else:
+                model = self._train_and_publish(texts, labels_)
+                log.info("Modell neu trainiert (%d Samples).", len(texts))
+        self._watcher = VersionWatcher(MODEL_PATH / "CURRENT")
+        self._watcher.poll(force=True)
+        self._publish(model, texts, labels_)
+
+    # ----- Kompatibilität (lesen immer den aktuellen Snapshot bzw. die Default-Session) -----
+    @property
+    def model(self) -> CompiledIntentModel:
+        return self._snap.model
+
+    @property
+    def train_texts(self) -> List[str]:
+        return list(self._snap.train_texts)
+
+    @property
+    def train_labels(self) -> List[str]:
+        return list(self._snap.train_labels)
+
+    @property
+    def train_index(self):
+        return self._snap.index
+
+    @property
+    def memory(self) -> deque:
+        return self.default_session.memory
+
+    @property
+    def last_input(self) -> Optional[str]:
+        return self.default_session.last_input
+
+    @property
+    def last_topk(self) -> List[tuple[str, float]]:
+        return self.default_session.last_topk
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._snap.version
+
+    def session(self, session_id: Optional[str] = None) -> Session:
+        """Session eines Clients (ohne ID → Default-Session von CLI/Hotword)."""
+        return self.sessions.get(session_id) if session_id else self.default_session
+
+    def current_snapshot(self) -> ModelSnapshot:
+        return self._snap
 
-        # Modell laden oder trainieren
-        if MODEL_PATH.exists():
-            self.model = IntentModel.load(MODEL_PATH)
-            log.info("Modell geladen (%s).", MODEL_PATH)
-        else:
-            self.model = IntentModel.fit_from_texts(self.train_texts, self.train_labels)
-            self.model.save(MODEL_PATH)
-            log.info("Modell neu trainiert (%d Samples).", len(self.train_texts))
-
-        self.last_input: Optional[str] = None
-        self.last_topk: List[tuple[str, float]] = []
-        self._rebuild_train_matrix()
-
-    def _load_training_from_db(self) -> None:
-        persisted = db_list_training() or []
-        base_texts = list(BASE_TRAIN["texts"])
-        base_labels = list(BASE_TRAIN["labels"])
-        add_texts  = [t for (t, _) in persisted]
-        add_labels = [l for (_, l) in persisted]
-        pairs = list(dict.fromkeys(zip(base_texts + add_texts, base_labels + add_labels)))
-        if pairs:
-            self.train_texts, self.train_labels = map(list, zip(*pairs))
-        else:
-            self.train_texts, self.train_labels = [], []
+    @staticmethod
+    def publish_lock():
+        """Prozessübergreifende Sperre für Lernen/Veröffentlichen (mehrere Worker)."""
+        return file_lock(MODEL_PATH.with_name(MODEL_PATH.name + ".lock"))
+
+    def _publish(self, model: CompiledIntentModel, texts: List[str], labels_: List[str]) -> None:
+        """Neuen Snapshot bauen und per Referenz-Tausch aktivieren; Caches an die Version binden."""
+        snap = ModelSnapshot.build(model, texts, labels_)
+        self._snap = snap
+        self._pred_cache.bind(snap.version)
+        self._reply_cache.bind(snap.version)
+
+    def _load_model(self, texts: List[str]) -> Optional[CompiledIntentModel]:
+        if current_version(MODEL_PATH):
+            return IntentModel.load(MODEL_PATH)
+        if LEGACY_MODEL_PATH.exists():
+            IntentModel.load_legacy(LEGACY_MODEL_PATH).save(MODEL_PATH, check_texts=texts)
+            log.info("Pickle-Modell %s ins Artefakt %s migriert.", LEGACY_MODEL_PATH, MODEL_PATH)
+            return IntentModel.load(MODEL_PATH)
+        return None
 
-    def _rebuild_train_matrix(self) -> None:
-        try:
-            self.train_X = self.model.vectorizer.transform(self.train_texts)
-        except Exception:
-            from scipy.sparse import csr_matrix
-            self.train_X = csr_matrix((0, 0))
-        self._train_texts_lc = set((t or "").strip().lower() for t in self.train_texts)
+    def _train_and_publish(self, texts: List[str], labels_: List[str]) -> CompiledIntentModel:
+        """Trainiert (sklearn), schreibt eine neue Artefakt-Version und lädt sie NumPy-only."""
+        self._trainer = IntentModel.fit_from_texts(texts, labels_)
+        self._trainer.save(MODEL_PATH, check_texts=texts)
+        return IntentModel.load(MODEL_PATH)
+
+    def _learn_incremental(self, new_texts: List[str], new_labels: List[str],
+                           texts: List[str], labels_: List[str]) -> Optional[CompiledIntentModel]:
+        """Hashing-Modus: neue Paare (+ kleiner Replay-Anteil) per partial_fit statt Neutraining."""
+        if INTENT_FEATURES != "hashing":
+            return None
+        trainer = self._trainer or IntentModel.load_trainer(MODEL_PATH)
+        if trainer is None:
+            return None
+        picks = random.sample(range(len(texts)), min(INCREMENTAL_REPLAY, len(texts)))
+        replay = [(texts[i], labels_[i]) for i in picks]
+        if not trainer.partial_fit(new_texts, new_labels, replay=replay):
+            return None
+        trainer.save(MODEL_PATH, check_texts=texts)
+        self._trainer = trainer
+        log.info("Inkrementell gelernt (%d neue Beispiele).", len(new_texts))
+        return IntentModel.load(MODEL_PATH)
+
+    def _load_training(self) -> Tuple[List[str], List[str]]:
+        """BASE_TRAIN + training-Tabelle (dedupliziert); liest nur Zeilen seit dem letzten Aufruf."""
+        self._corpus.sync()
+        return self._corpus.texts, self._corpus.labels
 
     def label_for_exact_text(self, text: str) -> Optional[str]:
-        t = (text or "").strip().lower()
-        for tt, ll in zip(self.train_texts, self.train_labels):
-            if (tt or "").strip().lower() == t:
-                return ll
-        return None
+        return self._snap.exact_labels.get((text or "").strip().lower())
 
     def is_known_text(self, text: str) -> tuple[bool, float]:
+        st = self._snap
         t = (text or "").strip()
         if not t: return (False, 0.0)
-        if t.lower() in self._train_texts_lc: return (True, 1.0)
+        if t.lower() in st.texts_lc: return (True, 1.0)
+        max_sim = self._max_train_sims(st, st.model.transform([t]))[0]
+        return (max_sim >= SIM_THRESHOLD, max_sim)
+
+    @staticmethod
+    def _max_train_sims(st: ModelSnapshot, X) -> List[float]:
+        """Maximale Ähnlichkeit jeder Zeile von X zu den Trainingstexten (invertierter Index)."""
         try:
-            x = self.model.vectorizer.transform([t])
-            if getattr(self, "train_X", None) is None or self.train_X.shape[0] == 0:
-                return (False, 0.0)
-            sims = (self.train_X @ x.T).toarray().ravel()
-            max_sim = float(sims.max()) if sims.size else 0.0
-            return (max_sim >= SIM_THRESHOLD, max_sim)
+            return st.index.max_sims(X)
         except Exception:
-            return (False, 0.0)
+            return [0.0] * X.shape[0]
+
+    def _observe(self, stage: str, t0: float, label: Optional[str] = None) -> float:
+        """Meldet die Dauer einer Stufe an stage_observer; gibt die Endzeit zurück."""
+        now = time.perf_counter()
+        if self.stage_observer is not None:
+            self.stage_observer(stage, now - t0, label)
+        return now
 
     # ===== Routing =====
     def route(self, label: str, text: str, ctx: Dict[str, Any]) -> str:
         label = normalize_label(label)
-        slots = ctx.get("slots", {})
+        t0 = time.perf_counter()
+        try:
+            return self._run_skill(label, text, ctx)
+        finally:
+            self._observe("skill", t0, label)
+
+    def _run_skill(self, label: str, text: str, ctx: Dict[str, Any]) -> str:
         if label == "gespräch":  return gespraech_skill(text, ctx)
         if label == "time":      return time_skill(text, ctx)
         if label == "geo":       return geo_skill(text, ctx)
@@ -291,11 +466,45 @@ class FoxAssistant:
         if label == "termin":    return self.do_termin(text)
         return self.fallback(text, ctx)
 
+    def route_many(self, label: str, texts: List[str], confs: List[float]) -> List[str]:
+        """Routet mehrere Texte mit gleichem Label; Geo & Wissen laufen als Batch-Abfragen."""
+        label = normalize_label(label)
+        if label == "geo":    return geo_skill_many(texts)
+        if label == "wissen": return self.do_wissen_many(texts)
+        return [self.route(label, t, {"conf": c}) for t, c in zip(texts, confs)]
+
+    def _route_cached(self, label: str, text: str, conf: float, version: Optional[str] = None) -> str:
+        if label not in REPLY_CACHE_LABELS:
+            return self.route(label, text, {"conf": conf})
+        key = (label, normalize_text(text))
+        reply = self._reply_cache.get(key)
+        if reply is None:
+            reply = self.route(label, text, {"conf": conf})
+            self._reply_cache.put(key, reply, version=version)
+        return reply
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {"prediction": self._pred_cache.stats(), "reply": self._reply_cache.stats(),
+                "facts": knowledge_store().cache.stats(), "reply_labels": sorted(REPLY_CACHE_LABELS)}
+
     def do_wissen(self, text: str) -> str:
-        val = get_fact(text) or get_fact(text.lower())
+        # exakter Key zuerst, sonst der ähnlichste Fakt (TF-IDF) über der Schwelle
+        val = lookup_fact(text)
+        if not val:
+            hit = semantic_fact(text)
+            val = hit[1] if hit else None
         if val: return str(val)
         return "Ich kenne dazu noch keine Antwort."
 
+    def do_wissen_many(self, texts: List[str]) -> List[str]:
+        out = []
+        for t, val in zip(texts, lookup_facts(texts)):
+            if not val:
+                hit = semantic_fact(t)
+                val = hit[1] if hit else None
+            out.append(str(val) if val else "Ich kenne dazu noch keine Antwort.")
+        return out
+
     def do_wetter(self, text: str) -> str:
         q = extract_weather_query(text)
         if not q: return "Sag mir eine Stadt für Wetter (z. B. 'Wetter in Bern')."
@@ -317,88 +526,322 @@ class FoxAssistant:
         return "Das weiß ich (noch) nicht."
 
     # ===== Prediction =====
-    def topk_predict(self, text: str, k: int = 3) -> List[tuple[str, float]]:
-        X = self.model.vectorizer.transform([text])
-        proba = self.model.clf.predict_proba(X)[0]
-        classes = [normalize_label(c) for c in self.model.clf.classes_]
+    @staticmethod
+    def _topk_from_proba(st: ModelSnapshot, proba, k: int = 3) -> List[tuple[str, float]]:
+        classes = [normalize_label(c) for c in st.model.classes]
         pairs = list(zip(classes, proba))
         pairs.sort(key=lambda x: x[1], reverse=True)
         return pairs[:k]
 
-    # ===== Handle =====
-    def handle(self, user: str) -> str:
-        t = (user or "").strip()
-        if not t: return ""
-
-        auto = try_auto_calc(t)
-        if auto is not None:
-            reply = f"Das Ergebnis ist {round(auto, 6)}."
-            self.memory.append({"user": t, "fox": reply, "via": "auto-mathe"})
-            return reply
+    def topk_predict(self, text: str, k: int = 3) -> List[tuple[str, float]]:
+        st = self._snap
+        X = st.model.transform([text])
+        return self._topk_from_proba(st, st.model.predict_proba(X)[0], k=k)
 
-        X = self.model.vectorizer.transform([t])
-        proba = self.model.clf.predict_proba(X)[0]
+    @staticmethod
+    def _decide(st: ModelSnapshot, t: str, proba, max_sim: float) -> tuple[str, float, bool]:
+        """Modell-Vorhersage + Heuristiken (exakter Treffer, Trigger) → (label, conf, known)."""
         idx = int(proba.argmax())
-        label = normalize_label(self.model.clf.classes_[idx])
+        label = normalize_label(st.model.classes[idx])
         conf = float(proba[idx])
 
-        self.last_input = t
-        try: self.last_topk = self.topk_predict(t, k=3)
-        except Exception: self.last_topk = []
-
-        known, _ = self.is_known_text(t)
-        exact_lbl = self.label_for_exact_text(t)
+        known = t.lower() in st.texts_lc or max_sim >= SIM_THRESHOLD
+        exact_lbl = st.exact_labels.get(t.strip().lower())
         if exact_lbl:
             label = normalize_label(exact_lbl)
             conf = max(conf, 0.999)
-        if has_weather_trigger(t):
+        triggers = match_triggers(t)
+        if "wetter" in triggers:
             label = "wetter"; conf = max(conf, 0.66)
-        elif has_time_trigger(t):
+        elif "time" in triggers:
             label = "time"; conf = max(conf, 0.66)
+        return label, conf, known
 
-        if known or conf >= CONF_THRESHOLD:
-            reply = self.route(label, t, {"conf": conf})
-            self.memory.append({"user": t, "fox": reply, "label": label, "conf": conf, "via": "direct"})
-            return reply
+    # ===== Handle =====
+    def _predict_cached(self, st: ModelSnapshot, t: str) -> tuple[str, float, bool, List[tuple[str, float]]]:
+        """(label, conf, known, topk) für einen Text; Wiederholungen kommen aus dem Cache."""
+        key = normalize_text(t)
+        hit = self._pred_cache.get(key)
+        if hit is not None:
+            return hit
+        t0 = time.perf_counter()
+        X = st.model.transform([t])
+        t0 = self._observe("vectorize", t0)
+        proba = st.model.predict_proba(X)[0]
+        t0 = self._observe("predict", t0)
+        try: topk = self._topk_from_proba(st, proba, k=3)
+        except Exception: topk = []
+        label, conf, known = self._decide(st, t, proba, self._max_train_sims(st, X)[0])
+        self._observe("heuristics", t0, label)
+        res = (label, conf, known, topk)
+        self._pred_cache.put(key, res, version=st.version)
+        return res
+
+    def _predict_many(self, st: ModelSnapshot, texts: List[str]) -> List[tuple[str, float, bool, List[tuple[str, float]]]]:
+        """Wie _predict_cached für viele Texte: eine Sparse-Matrix, ein predict_proba."""
+        X = st.model.transform(texts)
+        P = st.model.predict_proba(X)
+        sims = self._max_train_sims(st, X)
+        out = []
+        for row, t in enumerate(texts):
+            label, conf, known = self._decide(st, t, P[row], sims[row])
+            try: topk = self._topk_from_proba(st, P[row], k=3)
+            except Exception: topk = []
+            res = (label, conf, known, topk)
+            self._pred_cache.put(normalize_text(t), res, version=st.version)
+            out.append(res)
+        return out
+
+    def score_many(self, texts: List[str]) -> List[tuple[str, float, bool, List[tuple[str, float]]]]:
+        """(label, conf, known, topk) je Text mit dem aktuellen Modell (Auto-Lernen)."""
+        items = [(t or "").strip() for t in texts]
+        return self._predict_many(self._snap, items) if items else []
+
+    def handle(self, user: str, session: Optional[Session] = None,
+               on_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        on_partial (Streaming): wird nach der Intent-Entscheidung und VOR dem Skill
+        aufgerufen – {"label", "conf", "text"}; text ist eine Zwischenantwort für
+        langsame Skills (z. B. Wetter-API) oder None.
+        """
+        return self.prepare(user, session, on_partial).reply or ""
+
+    def prepare(self, user: str, session: Optional[Session] = None,
+                on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+                defer: FrozenSet[str] = frozenset()) -> Turn:
+        """
+        Intent entscheiden und – außer für Labels in `defer` – gleich beantworten.
+        Für aufgeschobene Labels (langsame I/O-Skills) liefert es einen Turn ohne
+        reply; der Aufrufer führt run_turn (z. B. in einem eigenen Pool mit Zeitbudget)
+        aus und schließt mit complete ab.
+        """
+        t = (user or "").strip()
+        sess = session if session is not None else self.default_session
+        st = self._snap  # ein Snapshot für den ganzen Request
+        if not t: return Turn(t, sess, None, 0.0, st.version, "")
+
+        t0 = time.perf_counter()
+        auto = try_auto_calc(t)
+        self._observe("auto_calc", t0, "auto-mathe" if auto is not None else None)
+        if auto is not None:
+            reply = f"Das Ergebnis ist {round(auto, 6)}."
+            sess.remember({"user": t, "fox": reply, "via": "auto-mathe"})
+            return Turn(t, sess, None, 1.0, st.version, reply)
 
+        label, conf, known, topk = self._predict_cached(st, t)
+        sess.set_last(t, topk)
+        if conf < CONF_THRESHOLD:
+            self.autolearn.record(t, label, conf, topk, "low" if known else "fallback")
+
+        if known or conf >= CONF_THRESHOLD:
+            if on_partial is not None:
+                on_partial({"label": label, "conf": conf, "text": PARTIAL_TEXTS.get(label)})
+            turn = Turn(t, sess, label, conf, st.version)
+            if label in defer:
+                return turn
+            return turn._replace(reply=self.complete(turn, self.run_turn(turn)))
+
+        t0 = time.perf_counter()
         reply = self.fallback(t, {"conf": conf})
-        self.memory.append({"user": t, "fox": reply, "label": label, "conf": conf, "via": "fallback"})
+        self._observe("route", t0, "fallback")
+        sess.remember({"user": t, "fox": reply, "label": label, "conf": conf, "via": "fallback"})
+        return Turn(t, sess, label, conf, st.version, reply)
+
+    def run_turn(self, turn: Turn) -> str:
+        """Skill eines Turns ausführen (ohne Gedächtnis-Eintrag)."""
+        # "route" umfasst Reply-Cache + Skill; "skill" wird in route() separat gemeldet
+        t0 = time.perf_counter()
+        reply = self._route_cached(turn.label, turn.text, turn.conf, version=turn.version)
+        self._observe("route", t0, turn.label)
         return reply
 
-    # ===== Persistenz / Lernen =====
+    def complete(self, turn: Turn, reply: str, via: str = "direct") -> str:
+        if turn.session is not None:  # None: Batch ohne remember
+            turn.session.remember({"user": turn.text, "fox": reply, "label": turn.label,
+                                   "conf": turn.conf, "via": via})
+        return reply
+
+    def degraded(self, turn: Turn, reason: str = "timeout") -> str:
+        """Ersatzantwort, wenn ein Skill sein Zeitbudget reißt oder sein Pool voll ist."""
+        texts = labels.LABEL_TEXTS.get("degraded", {})
+        reply = texts.get(turn.label) or texts.get("_default") or "Das dauert gerade zu lange."
+        self._observe("route", time.perf_counter(), "degraded")
+        return self.complete(turn, reply, via=f"degraded-{reason}")
+
+    def handle_many(self, texts: List[str], remember: bool = False,
+                    session: Optional[Session] = None) -> List[str]:
+        return self.prepare_many(texts, remember, session)[0]  # type: ignore[return-value]
+
+    def prepare_many(self, texts: List[str], remember: bool = False, session: Optional[Session] = None,
+                     defer: FrozenSet[str] = frozenset()) -> Tuple[List[Optional[str]], Dict[int, Turn]]:
+        """
+        Batch-Variante von handle (Replay, Auswertung, Backlogs):
+        - alle Texte werden in EINER Sparse-Matrix vektorisiert und vorhergesagt
+        - Ergebnisse werden pro Skill gruppiert (Geo/Wissen als Batch-Abfragen)
+        - Antworten kommen in Eingabe-Reihenfolge zurück
+        Mit remember=True landen die Einträge wie bei handle im Gedächtnis der Session.
+        last_input/last_topk bleiben unverändert.
+        Labels in `defer` (langsame I/O-Skills) werden wie bei prepare nicht ausgeführt:
+        ihre Antwort ist None, dafür gibt es {Index: Turn} für run_turn + complete
+        (Turn.session ist None, wenn remember=False).
+        """
+        st = self._snap
+        items = [(t or "").strip() for t in texts]
+        replies: List[str] = [""] * len(items)
+        entries: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        decided: Dict[int, tuple[str, float, bool, List[tuple[str, float]]]] = {}
+        pending: List[int] = []
+        for i, t in enumerate(items):
+            if not t:
+                continue
+            auto = try_auto_calc(t)
+            if auto is not None:
+                replies[i] = f"Das Ergebnis ist {round(auto, 6)}."
+                entries[i] = {"user": t, "fox": replies[i], "via": "auto-mathe"}
+                continue
+            hit = self._pred_cache.get(normalize_text(t))
+            if hit is not None:
+                decided[i] = hit
+            else:
+                pending.append(i)
+
+        if pending:
+            for i, res in zip(pending, self._predict_many(st, [items[i] for i in pending])):
+                decided[i] = res
+
+        groups: Dict[str, List[int]] = {}
+        fallback_idx: List[int] = []
+        turns: Dict[int, Turn] = {}
+        sess = session if session is not None else self.default_session
+        for i in sorted(decided):
+            label, conf, known, topk = decided[i]
+            if conf < CONF_THRESHOLD:
+                self.autolearn.record(items[i], label, conf, topk, "low" if known else "fallback")
+            if not (known or conf >= CONF_THRESHOLD):
+                fallback_idx.append(i)
+                continue
+            if label in defer:
+                turns[i] = Turn(items[i], sess if remember else None, label, conf, st.version)
+                continue
+            cached = self._reply_cache.get((label, normalize_text(items[i]))) if label in REPLY_CACHE_LABELS else None
+            if cached is not None:
+                replies[i] = cached
+                entries[i] = {"user": items[i], "fox": cached, "label": label, "conf": conf, "via": "direct"}
+            else:
+                groups.setdefault(label, []).append(i)
+
+        for label, idxs in groups.items():
+            outs = self.route_many(label, [items[i] for i in idxs], [decided[i][1] for i in idxs])
+            for i, reply in zip(idxs, outs):
+                replies[i] = reply
+                entries[i] = {"user": items[i], "fox": reply, "label": label, "conf": decided[i][1], "via": "direct"}
+                if label in REPLY_CACHE_LABELS:
+                    self._reply_cache.put((label, normalize_text(items[i])), reply, version=st.version)
+        for i in fallback_idx:
+            label, conf = decided[i][:2]
+            replies[i] = self.fallback(items[i], {"conf": conf})
+            entries[i] = {"user": items[i], "fox": replies[i], "label": label, "conf": conf, "via": "fallback"}
+
+        if remember:
+            sess.remember_many(e for e in entries if e is not None)
+        return [None if i in turns else r for i, r in enumerate(replies)], turns
+
+    # ===== Persistenz / Lernen (Schreiber: seriell unter _write_lock, dann Snapshot-Tausch) =====
     def fit_fresh(self) -> None:
-        self.model = IntentModel.fit_from_texts(self.train_texts, self.train_labels)
-        self.model.save(MODEL_PATH)
-        self._rebuild_train_matrix()
-        log.info("Neu trainiert (%d Samples).", len(self.train_texts))
+        with self._write_lock, self.publish_lock():
+            texts, labels_ = self._load_training()
+            self._publish(self._train_and_publish(texts, labels_), texts, labels_)
+            self._watcher.poll(force=True)
+        log.info("Neu trainiert (%d Samples).", len(texts))
 
     def learn_pair(self, question: str, label: str) -> None:
-        label = normalize_label(label)
-        if label not in CLASSES:
-            raise ValueError(f"Unbekanntes Label '{label}'.")
-        q = (question or "").strip()
-        if not q: raise ValueError("Leere Eingabe kann nicht gelernt werden.")
-        db_add_training_pair(q, label)
-        self._load_training_from_db()
-        self.fit_fresh()
-        self.save_all()
-        make_snapshot([MODEL_PATH, _knowledge_db_path()], tag="learn")
+        self.learn_pairs([(question, label)])
+
+    def learn_pairs(self, pairs: List[tuple[str, str]]) -> int:
+        """Mehrere (Frage, Label) speichern und EINMAL nachtrainieren (Auto-Lernen, Batches)."""
+        new_texts, new_labels = [], []
+        for question, label in pairs:
+            label = normalize_label(label)
+            if label not in CLASSES:
+                raise ValueError(f"Unbekanntes Label '{label}'.")
+            q = (question or "").strip()
+            if not q: raise ValueError("Leere Eingabe kann nicht gelernt werden.")
+            new_texts.append(q)
+            new_labels.append(label)
+        if not new_texts:
+            return 0
+        # Sperre: Trainingsstand (DB) lesen, trainieren und veröffentlichen ohne dass ein
+        # anderer Thread/Worker dazwischen eine ältere Version als CURRENT setzt.
+        # Laufende Requests arbeiten solange auf dem alten Snapshot weiter.
+        with self._write_lock, self.publish_lock():
+            # anderer Worker hat seit dem letzten Request veröffentlicht → erst dessen Stand
+            # laden (setzt auch den Trainer zurück), sonst überschreibt partial_fit sein Lernen
+            self.sync_model()
+            add_training_pairs(zip(new_texts, new_labels))
+            texts, labels_ = self._load_training()
+            model = self._learn_incremental(new_texts, new_labels, texts, labels_)
+            if model is None:
+                model = self._train_and_publish(texts, labels_)
+                log.info("Neu trainiert (%d Samples).", len(texts))
+            self._publish(model, texts, labels_)
+            self._watcher.poll(force=True)
+        self.autolearn.forget(new_texts)  # bestätigt → nicht mehr in der Warteschlange
+        log.info("Modell gespeichert & Index aktualisiert.")
+        knowledge_store().checkpoint()  # WAL in die .db, sonst fehlt im Snapshot der letzte Stand
+        make_snapshot([MODEL_PATH, knowledge_store().path], tag="learn")
+        return len(new_texts)
+
+    def reload_model(self) -> None:
+        # Trainingspaare können von einem anderen Worker stammen → auch aus der DB neu lesen
+        with self._write_lock:
+            texts, labels_ = self._load_training()
+            self._trainer = None
+            self._publish(IntentModel.load(MODEL_PATH), texts, labels_)
+            self._watcher.poll(force=True)
+        log.info("Modell neu geladen (version=%s).", self.model_version)
+
+    def _loaded_name(self) -> Optional[str]:
+        path = self._snap.model.path
+        return path.name if path is not None else None
+
+    def pending_version(self) -> Optional[str]:
+        """
+        Name einer von einem anderen Prozess veröffentlichten Version (CURRENT), sonst None.
+        Billig genug für jeden Request: stat() höchstens alle 100 ms.
+        """
+        name = self._watcher.poll()
+        if not name or name == self._loaded_name():
+            return None
+        return name
+
+    def sync_model(self) -> bool:
+        """Lädt nach, falls CURRENT auf eine andere Version zeigt (andere Worker)."""
+        with self._write_lock:
+            name = current_version(MODEL_PATH)
+            if not name or name == self._loaded_name():
+                return False
+            self.reload_model()
+            return True
 
     def save_all(self) -> None:
-        self.model.save(MODEL_PATH)
-        self._rebuild_train_matrix()
+        # Das Artefakt wird beim Training geschrieben; fehlt es, wird neu veröffentlicht.
+        with self._write_lock:
+            if current_version(MODEL_PATH) is None:
+                self.fit_fresh()
         log.info("Modell gespeichert & Index aktualisiert.")
 
 # ========= CLI-Loop =========
 def main():
     print("🦊 Fox Assistant — Befehle:")
     print(labels.LABEL_TEXTS["cli"]["help"].rstrip())
+    from fox.speech import SpeechIn, Speech  # lädt Audio-Stack erst hier
     fox = FoxAssistant()
     speech = Speech(enabled=True)
     mic = SpeechIn(model_name="small", lang="de")
 
-    _ensure_training_table()
     init_knowledge_db()
+    fox.autolearn.start()
 
     while True:
         try: user = input("Du: ").strip()
@@ -416,6 +859,7 @@ def main():
                 set_fact(key.lower(), val); print(f"Gemerkt: {key} = {val}"); continue
             except Exception: print("Fehler bei 'merke'"); continue
         process_input(fox, speech, user)
+    fox.autolearn.stop()
 
 if __name__ == "__main__":
     main()
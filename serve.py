@@ -0,0 +1,126 @@
+#===========================
+# Mehrprozess-Server (Pre-Fork)
+#===========================
+# Lädt server:app (FoxAssistant, Modell-Artefakt, Ähnlichkeitsindex) EINMAL im
+# Elternprozess und forkt danach N Worker, die sich den Socket teilen. Die
+# Speicherseiten des Modells bleiben so zwischen allen Workern geteilt
+# (Copy-on-Write; die Gewichte sind zusätzlich per mmap im Page-Cache).
+#
+# Versionen: /learn bzw. /reload in einem Worker veröffentlicht über
+# fox_intent/CURRENT; alle anderen Worker übernehmen die Version beim nächsten
+# Request (Middleware in server.py, Header X-Fox-Model-Version).
+#
+# Aufruf (im Projektordner):
+#   python serve.py --workers 4 --host 127.0.0.1 --port 8010
+# Unter Windows gibt es kein fork → Fallback auf uvicorn --workers (ohne geteilte Seiten,
+# Versionsabgleich funktioniert trotzdem).
+from __future__ import annotations
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+log = logging.getLogger("fox")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+    config = uvicorn.Config(app, log_level=log_level, lifespan="off")
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+
+
+def _exit_on_signal(signum, frame) -> None:
+    # statt SIG_DFL: uvicorn löst das Signal nach dem Herunterfahren erneut aus, der
+    # Worker soll dann noch sein finally (Puffer schreiben) erreichen
+    raise SystemExit(0)
+
+
+def serve_prefork(host: str, port: int, workers: int, log_level: str = "warning") -> None:
+    sock = _bind(host, port)
+    os.environ["FOX_PREFORK"] = "1"  # server.py: Hintergrund-Threads erst in den Workern
+    import server  # Modell + Index vor dem Fork laden
+    gc.collect()
+    gc.freeze()  # Objekte aus dem GC nehmen → Refcount-Scans schreiben geteilte Seiten nicht um
+    log.info("Pre-Fork: Modell %s geladen, starte %d Worker auf %s:%d.",
+             server.fox.model_version, workers, host, port)
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, _exit_on_signal)
+            signal.signal(signal.SIGTERM, _exit_on_signal)
+            try:
+                server.fox.autolearn.start()
+                _run_worker(server.app, sock, log_level)
+            finally:
+                # os._exit überspringt atexit: Puffer und Profil des Workers selbst schreiben
+                server.fox.autolearn.stop()
+                server.profiler.dump()
+                os._exit(0)
+        children[pid] = slot
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for slot in range(workers):
+        spawn(slot)
+
+    # Supervisor: abgestürzte Worker neu starten (erben weiterhin die geteilten Seiten)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            log.warning("Worker %d (pid %d) beendet (Status %d) – starte neu.", slot, pid, status)
+            time.sleep(0.5)
+            spawn(slot)
+    sock.close()
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Fox-API mit mehreren Worker-Prozessen (Pre-Fork).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8010)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--log-level", default="warning")
+    args = ap.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        import uvicorn
+        uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+        return
+    serve_prefork(args.host, args.port, max(1, args.workers), log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,78 @@
 from __future__ import annotations
-from fastapi import FastAPI, HTTPException
+import asyncio
+import atexit
+import json
+import os
+import time
+from uuid import uuid4
+import anyio
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from fox.responses import FastJSONResponse, NDJSONResponse, NDJSON_MEDIA_TYPE, dumps, wants_ndjson
+from fastapi.concurrency import run_in_threadpool
 
 # === Knowledge DB ===
-from fox.skills.knowledge import init_db, set_fact, get_fact, search_facts
+from fox.skills.knowledge import init_db, set_fact, get_fact, store as knowledge_store
+from fox.skills import knowledge_io
 init_db()
 
 # Deine Fox-Logik wiederverwenden
-from main import FoxAssistant, IntentModel, labels, MODEL_PATH
+from main import FoxAssistant, labels, MODEL_PATH, SKILL_BUDGETS
+from backup import make_snapshot
 
 app = FastAPI(title="CrownFox Local API", version="1.1.0", description="Lokale REST-API für Fox")
 
 # Singleton-Instanz (einmal starten)
 fox = FoxAssistant()
 
+# Laufzeit-Metriken (/metrics): Stufen/Skills kommen über den stage_observer
+from fox.metrics import FoxMetrics
+metrics = FoxMetrics(fox)
+fox.stage_observer = metrics.observe_stage
+
+# Sampling-Profiler (opt-in: FOX_PROFILE_RATE oder POST /admin/profile)
+from fox.profiler import SamplingProfiler
+profiler = SamplingProfiler.from_env()
+atexit.register(profiler.dump)
+
+# Auto-Lernen im Hintergrund (FOX_AUTO_LEARN=0 → aus); beim Beenden Puffer in die DB.
+# Pre-Fork (FOX_PREFORK, serve.py): nicht im Supervisor – der bedient keine Requests,
+# hätte nur das Start-Modell und teilt sich beim Fork die DB-Verbindungen. serve.py
+# startet den Thread in jedem Worker und ruft dort auch stop().
+if os.getenv("FOX_PREFORK") != "1":
+    fox.autolearn.start()
+atexit.register(fox.autolearn.stop)
+ADMIN_TOKEN = os.getenv("FOX_ADMIN_TOKEN", "")
+
+# Zulassung: eigene Spuren für Inferenz, langsame I/O-Skills und Training (fox/admission.py)
+from fox.admission import Lane, Lanes, Overloaded
+lanes = Lanes(
+    cpu=Lane("cpu", int(os.getenv("FOX_CPU_WORKERS", str(os.cpu_count() or 4))),
+             int(os.getenv("FOX_CPU_QUEUE", "64"))),
+    io=Lane("io", int(os.getenv("FOX_IO_WORKERS", "8")), int(os.getenv("FOX_IO_QUEUE", "16"))),
+    learn=Lane("learn", 1, int(os.getenv("FOX_LEARN_QUEUE", "4")), retry_after=10.0),
+)
+IO_LABELS = frozenset(SKILL_BUDGETS)
+
 # ---------- Schemas ----------
 class HandleReq(BaseModel):
     text: str
+    session: Optional[str] = None  # Client-/Session-ID (sonst Header X-Fox-Session)
+
+class HandleBatchReq(BaseModel):
+    texts: List[str]
+    remember: bool = False  # Einträge ins Gedächtnis übernehmen?
+    session: Optional[str] = None
+
+MAX_BATCH = 1000
+MEMORY_PAGE_MAX = 500
+SEARCH_PAGE_MAX = 200
+WS_PING_INTERVAL = float(os.getenv("FOX_WS_PING", "20"))  # Sekunden ohne Verkehr → Ping
+WS_MAX_PIPELINE = 64                                        # unbeantwortete Nachrichten pro Verbindung
 
 class LearnReq(BaseModel):
     question: str
@@ -37,13 +89,61 @@ class KnowledgeSetReq(BaseModel):
     key: str
     value: str
 
+class AutoLearnAcceptReq(BaseModel):
+    pairs: List[LearnReq]  # bestätigte Labels (z. B. Vorschläge aus /admin/autolearn/review)
+
+class ProfileReq(BaseModel):
+    rate: float                          # Anteil gesampelter Requests (0 = aus, 1 = alle)
+    interval_ms: Optional[float] = None  # Abstand der Stack-Samples
+
 # ---------- Helpers ----------
 def ok(msg: str, **extra):
     return {"ok": True, "msg": msg, **extra}
 
+def check_admin(token: Optional[str]) -> None:
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin-Token fehlt oder ist falsch")
+
+def _prepare(text: str, sess, on_partial, name: str):
+    with profiler.request(name):
+        return fox.prepare(text, sess, on_partial, defer=IO_LABELS)
+
+def _run_turn(turn, name: str) -> str:
+    with profiler.request(name):
+        return fox.run_turn(turn)
+
+async def answer(text: str, sess, on_partial=None, name: str = "POST /handle") -> str:
+    """
+    Intent + schnelle Skills in der cpu-Spur; langsame I/O-Skills (SKILL_BUDGETS) in der
+    io-Spur mit Zeitbudget → bei Überschreitung/Überlast eine Ersatzantwort statt Warten.
+    """
+    turn = await lanes.cpu.run(_prepare, text, sess, on_partial, name)
+    if turn.reply is not None:
+        return turn.reply
+    return await _finish(turn, name)
+
+async def _finish(turn, name: str) -> str:
+    """Zurückgestellten Turn in der io-Spur ausführen (Budget aus SKILL_BUDGETS)."""
+    try:
+        reply = await lanes.io.run(_run_turn, turn, name, budget=SKILL_BUDGETS[turn.label])
+    except TimeoutError:
+        return fox.degraded(turn, "timeout")
+    except Overloaded:
+        return fox.degraded(turn, "busy")
+    return fox.complete(turn, reply)
+
+def get_session(session_id: Optional[str]):
+    try:
+        return fox.session(session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ---------- App + Middleware ----------
 
-app = FastAPI(title="CrownFox Local API", version="1.1.0", description="Lokale REST-API für Fox")
+# FastJSONResponse (rapidjson) für alle Routen; große/heiße Endpoints geben sie direkt
+# zurück und sparen so auch FastAPIs jsonable_encoder.
+app = FastAPI(title="CrownFox Local API", version="1.1.0", description="Lokale REST-API für Fox",
+              default_response_class=FastJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # für lokale Tests ok
@@ -51,29 +151,221 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def model_version_sync(request, call_next):
+    t0 = time.perf_counter()
+    # Mehrere Worker: neue Version (CURRENT) übernehmen, bevor der Request läuft
+    if fox.pending_version() is not None:
+        await run_in_threadpool(fox.sync_model)
+    response = await call_next(request)
+    response.headers["X-Fox-Model-Version"] = str(fox.model_version)
+    # Pfad-Vorlage der Route statt roher URL → begrenzte Label-Anzahl
+    route = request.scope.get("route")
+    metrics.observe_request(request.method, getattr(route, "path", "unmatched"),
+                            response.status_code, time.perf_counter() - t0)
+    return response
+
+@app.exception_handler(Overloaded)
+async def overloaded(request, exc: Overloaded):
+    return FastJSONResponse(status_code=503, headers={"Retry-After": str(int(max(1, exc.retry_after)))},
+                        content={"ok": False, "detail": str(exc), "lane": exc.lane})
+
 # ---------- Routes ----------
 @app.get("/")
 def root():
-    return {
+    return FastJSONResponse({
         "name": "CrownFox",
         "version": "1.1.0",
         "labels": labels.CLASSES,
         "model_meta": fox.model.meta,
-        "conf_threshold": 0.60
-    }
+        "conf_threshold": 0.60,
+        "cache": fox.cache_stats(),
+        "sessions": fox.sessions.stats(),
+        "lanes": lanes.stats(),
+    })
+
+@app.get("/admission")
+def admission():
+    return {"ok": True, "lanes": lanes.stats(), "skill_budgets_s": SKILL_BUDGETS}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# ---- Profiler (Admin; mit FOX_ADMIN_TOKEN → Header X-Fox-Admin-Token) ----
+@app.get("/admin/profile")
+def profile_status(top: int = Query(20, ge=1, le=200), x_fox_admin_token: Optional[str] = Header(default=None)):
+    check_admin(x_fox_admin_token)
+    return {"ok": True, **profiler.stats(), "hot": profiler.hot_functions(top)}
+
+@app.post("/admin/profile")
+def profile_configure(req: ProfileReq, x_fox_admin_token: Optional[str] = Header(default=None)):
+    check_admin(x_fox_admin_token)
+    if not 0.0 <= req.rate <= 1.0:
+        raise HTTPException(status_code=400, detail="rate muss zwischen 0 und 1 liegen")
+    profiler.configure(rate=req.rate, interval=req.interval_ms / 1000.0 if req.interval_ms else None)
+    return {"ok": True, **profiler.stats()}
+
+@app.post("/admin/profile/dump")
+def profile_dump(reset: bool = False, x_fox_admin_token: Optional[str] = Header(default=None)):
+    check_admin(x_fox_admin_token)
+    files = profiler.dump(reset=reset)
+    if not files:
+        raise HTTPException(status_code=404, detail="noch keine Samples")
+    return {"ok": True, "files": files}
+
+# ---- Auto-Lernen (Admin) ----
+@app.get("/admin/autolearn")
+def autolearn_status(limit: int = Query(20, ge=0, le=500), x_fox_admin_token: Optional[str] = Header(default=None)):
+    """Zähler, letztes Review und die häufigsten Einträge der Warteschlange."""
+    check_admin(x_fox_admin_token)
+    return FastJSONResponse({"ok": True, **fox.autolearn.stats(), "queue": fox.autolearn.queue(limit)})
+
+@app.post("/admin/autolearn/review")
+async def autolearn_review(dry_run: bool = False, x_fox_admin_token: Optional[str] = Header(default=None)):
+    """Review sofort ausführen: Veraltetes verwerfen, Vorschläge (pairs) zeigen; dry_run ändert nichts."""
+    check_admin(x_fox_admin_token)
+    res = await lanes.learn.run(fox.autolearn.review, dry_run)
+    return FastJSONResponse({"ok": True, **res, "samples": len(fox.train_texts)})
+
+@app.post("/admin/autolearn/accept")
+async def autolearn_accept(req: AutoLearnAcceptReq, x_fox_admin_token: Optional[str] = Header(default=None)):
+    """Bestätigte Paare in EINEM Nachtraining lernen und aus der Warteschlange nehmen."""
+    check_admin(x_fox_admin_token)
+    try:
+        n = await lanes.learn.run(fox.autolearn.accept, [(p.question, p.label) for p in req.pairs])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return FastJSONResponse({"ok": True, "learned": n, "samples": len(fox.train_texts)})
+
+@app.get("/cache")
+def cache():
+    return {"ok": True, **fox.cache_stats()}
 
 @app.post("/handle")
-def handle(req: HandleReq):
+async def handle(req: HandleReq, x_fox_session: Optional[str] = Header(default=None)):
     text = (req.text or "").strip()
     if not text:
         raise HTTPException(status_code=400, detail="text darf nicht leer sein")
-    reply = fox.handle(text)
-    return {"ok": True, "reply": reply}
+    reply = await answer(text, get_session(req.session or x_fox_session))
+    return FastJSONResponse({"ok": True, "reply": reply})
+
+@app.post("/handle/batch")
+async def handle_batch(req: HandleBatchReq, x_fox_session: Optional[str] = Header(default=None)):
+    if not req.texts:
+        raise HTTPException(status_code=400, detail="texts darf nicht leer sein")
+    if len(req.texts) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"maximal {MAX_BATCH} Texte pro Batch")
+    sess = get_session(req.session or x_fox_session)
+    # wie /handle: langsame I/O-Skills (Wetter) nicht in der cpu-Spur, sondern je Eintrag
+    # in der io-Spur mit Budget – ein Batch belegt höchstens die Hälfte ihrer Worker
+    replies, turns = await lanes.cpu.run(
+        lambda: fox.prepare_many(req.texts, remember=req.remember, session=sess, defer=IO_LABELS))
+    if turns:
+        gate = anyio.Semaphore(max(1, lanes.io.workers // 2))
+
+        async def one(i: int, turn) -> None:
+            async with gate:
+                replies[i] = await _finish(turn, "POST /handle/batch")
+
+        async with anyio.create_task_group() as tg:
+            for i, turn in turns.items():
+                tg.start_soon(one, i, turn)
+    return FastJSONResponse({"ok": True, "count": len(replies), "replies": replies})
+
+# ---- Streaming-Chat (WebSocket) ----
+# Eine Verbindung = eine Session (Query ?session=…, sonst neue ID). Protokoll (JSON):
+#   Client → {"id": 1, "text": "wetter in bern"}   (id frei wählbar; auch reiner Text erlaubt)
+#            {"type": "ping"}
+#   Server → {"type": "hello", "session", "version"}
+#            {"type": "partial", "id", "label", "conf", "text"}   (vor dem Skill, z. B. Wetter-API)
+#            {"type": "reply", "id", "reply", "ms"}
+#            {"type": "error", "id", "error"} | {"type": "ping"|"pong", "t"}
+# Nachrichten dürfen gepipelinet werden (ohne auf die Antwort zu warten); sie werden pro
+# Verbindung der Reihe nach abgearbeitet, damit das Gedächtnis der Session stimmt.
+def _ws_parse(raw: str) -> Dict[str, Any]:
+    try:
+        msg = json.loads(raw)
+    except ValueError:
+        return {"text": raw}
+    return msg if isinstance(msg, dict) else {"text": str(msg)}
+
+@app.websocket("/ws")
+async def ws_chat(ws: WebSocket, session: Optional[str] = None):
+    sid = session or uuid4().hex
+    try:
+        sess = fox.session(sid)
+    except ValueError:
+        await ws.close(code=1008)
+        return
+    await ws.accept()
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue(maxsize=WS_MAX_PIPELINE)
+    outbox: asyncio.Queue = asyncio.Queue()
+    outbox.put_nowait({"type": "hello", "session": sid, "version": fox.model_version})
+
+    async def sender():
+        while True:
+            frame = None
+            with anyio.move_on_after(WS_PING_INTERVAL):
+                frame = await outbox.get()
+            if frame is None:
+                frame = {"type": "ping", "t": time.time()}  # Keepalive (Proxies, NAT, Browser)
+            await ws.send_text(dumps(frame).decode("utf-8"))  # Text-Frames (Browser erwarten str)
+
+    async def worker():
+        while True:
+            msg = await inbox.get()
+            mid, text = msg.get("id"), str(msg.get("text") or "").strip()
+            if not text:
+                outbox.put_nowait({"type": "error", "id": mid, "error": "text darf nicht leer sein"})
+                continue
+            if fox.pending_version() is not None:
+                await run_in_threadpool(fox.sync_model)
+
+            def on_partial(part: Dict[str, Any], mid=mid) -> None:
+                # läuft im Threadpool; call_soon_threadsafe hält die Reihenfolge vor der Antwort
+                loop.call_soon_threadsafe(outbox.put_nowait, {"type": "partial", "id": mid, **part})
+
+            t0 = time.perf_counter()
+            try:
+                reply = await answer(text, sess, on_partial, name="WS /ws")
+            except Overloaded as e:
+                metrics.observe_request("WS", "/ws", 503, time.perf_counter() - t0)
+                outbox.put_nowait({"type": "error", "id": mid, "error": str(e), "retry_after": e.retry_after})
+                continue
+            except Exception as e:
+                metrics.observe_request("WS", "/ws", 500, time.perf_counter() - t0)
+                outbox.put_nowait({"type": "error", "id": mid, "error": str(e)})
+                continue
+            dt = time.perf_counter() - t0
+            metrics.observe_request("WS", "/ws", 200, dt)
+            outbox.put_nowait({"type": "reply", "id": mid, "reply": reply, "ms": round(dt * 1000.0, 2)})
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(sender)
+        tg.start_soon(worker)
+        try:
+            while True:
+                msg = _ws_parse(await ws.receive_text())
+                if msg.get("type") == "ping":
+                    outbox.put_nowait({"type": "pong", "t": msg.get("t")})
+                elif msg.get("type") == "pong":
+                    continue
+                else:
+                    await inbox.put(msg)  # volle Pipeline → Gegendruck auf den Client
+        except WebSocketDisconnect:
+            pass
+        tg.cancel_scope.cancel()
+
+def _learn(question: str, label: str) -> None:
+    with profiler.request("POST /learn"):
+        fox.learn_pair(question, label)   # speichert + snapshot("learn")
 
 @app.post("/learn")
-def learn(req: LearnReq):
+async def learn(req: LearnReq):
     try:
-        fox.learn_pair(req.question, req.label)   # speichert + snapshot("learn")
+        await lanes.learn.run(_learn, req.question, req.label)
         return ok(f"gelernt: '{req.question}' => {req.label}", samples=len(fox.train_texts))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -98,12 +390,85 @@ def knowledge_get(key: str):
     val = get_fact(key)
     if val is None:
         raise HTTPException(status_code=404, detail="key nicht gefunden")
-    return {"ok": True, "key": key, "value": val}
+    return FastJSONResponse({"ok": True, "key": key, "value": val})
 
 @app.get("/knowledge/search")
-def knowledge_search(q: str):
-    rows = search_facts(q)
-    return {"ok": True, "hits": [{"key": k, "value": v} for (k, v) in rows]}
+def knowledge_search(q: str, limit: Optional[int] = Query(None, ge=1), after: Optional[str] = None,
+                     scope: str = Query("facts", pattern="^(facts|notes)$"),
+                     format: Optional[str] = None, accept: Optional[str] = Header(default=None)):
+    """
+    Volltextsuche (FTS5, BM25, Präfix-Treffer) über Facts oder Notizen (scope=notes).
+    JSON: Seiten zu `limit` (Standard 20, max. SEARCH_PAGE_MAX); `next` als `after` der
+    nächsten Seite übergeben. NDJSON (format=ndjson / Accept): ohne limit alle Treffer ab `after`.
+    """
+    ks = knowledge_store()
+    try:
+        if wants_ndjson(format, accept) and limit is None and scope == "facts":
+            rows = ks.iter_search_facts(q, after)
+            hits = ({"key": k, "value": v, "score": s} for k, v, s in rows)
+            return NDJSONResponse(hits)
+        limit = min(limit or 20, SEARCH_PAGE_MAX)
+        if scope == "notes":
+            hits, nxt = ks.search_notes_page(q, limit, after)
+        else:
+            rows, nxt = ks.search_facts_page(q, limit, after)
+            hits = [{"key": k, "value": v, "score": s} for k, v, s in rows]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ungültiger Cursor (after)")
+    if wants_ndjson(format, accept):
+        return NDJSONResponse(hits, headers={"X-Fox-Next": nxt or ""})
+    return FastJSONResponse({"ok": True, "limit": limit, "next": nxt, "hits": hits})
+
+@app.get("/knowledge/similar")
+def knowledge_similar(q: str, k: int = Query(5, ge=1, le=50)):
+    """Ähnlichste Fakten zu einer freien Frage (TF-IDF-Kosinus, wie do_wissen)."""
+    idx = knowledge_store().fact_index()
+    if idx is None:
+        raise HTTPException(status_code=503, detail="Fakten-Index wird noch aufgebaut")
+    hits = [{"key": key, "score": round(score, 4)} for key, score in idx.search(q, k)]
+    return FastJSONResponse({"ok": True, "hits": hits, "index": idx.stats()})
+
+# ---- Bulk-Import/-Export (Admin) ----
+async def _next_chunk(body) -> Optional[bytes]:
+    try:
+        return await body.__anext__()
+    except StopAsyncIteration:
+        return None
+
+def _import(body, table: str, fmt: str, batch: int) -> Dict[str, Any]:
+    # läuft im learn-Thread; der Body wird blockweise aus der Event-Loop nachgeholt,
+    # es liegt also nie der ganze Upload im Speicher
+    fh = knowledge_io.text_stream(lambda: anyio.from_thread.run(_next_chunk, body))
+    with profiler.request("POST /knowledge/import"):
+        return knowledge_io.import_stream(fh, table, fmt, batch)
+
+@app.post("/knowledge/import")
+async def knowledge_import(request: Request, table: str = Query("facts", pattern="^(facts|training)$"),
+                           format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+                           batch: int = Query(knowledge_io.IMPORT_BATCH, ge=100, le=100_000),
+                           x_fox_admin_token: Optional[str] = Header(default=None)):
+    """
+    Body als NDJSON oder CSV (format, sonst aus dem Content-Type) – Upsert in Blöcken von
+    `batch` Zeilen je Transaktion. Antwort: Zeilen, übersprungene Zeilen, Dauer, Zeilen/s.
+    """
+    check_admin(x_fox_admin_token)
+    fmt = format or knowledge_io.guess_format(request.headers.get("content-type"))
+    try:
+        res = await lanes.learn.run(_import, request.stream(), table, fmt, batch)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Body ist kein UTF-8: {e}")
+    return FastJSONResponse({"ok": True, **res})
+
+@app.get("/knowledge/export")
+def knowledge_export(table: str = Query("facts", pattern="^(facts|training)$"),
+                     format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+                     x_fox_admin_token: Optional[str] = Header(default=None)):
+    """Ganze Tabelle als Stream (seitenweise gelesen); X-Fox-Total = Zeilen beim Start."""
+    check_admin(x_fox_admin_token)
+    media = NDJSON_MEDIA_TYPE if format == "ndjson" else "text/csv; charset=utf-8"
+    headers = {"X-Fox-Total": str(knowledge_store().count(table)),
+               "Content-Disposition": f'attachment; filename="{table}.{format}"'}
+    return StreamingResponse(knowledge_io.export_chunks(table, format), media_type=media, headers=headers)
 
 @app.post("/termin")
 def termin(req: TerminReq):
@@ -111,19 +476,37 @@ def termin(req: TerminReq):
     return {"ok": True, "reply": reply}
 
 @app.get("/memory")
-def memory():
-    return {"ok": True, "memory": list(fox.memory)}
+def memory(session: Optional[str] = None, offset: int = Query(0, ge=0),
+           limit: Optional[int] = Query(None, ge=1), format: Optional[str] = None,
+           accept: Optional[str] = Header(default=None)):
+    """
+    Gedächtnis einer Session, chronologisch und seitenweise (ohne session → Default-Session).
+    JSON: höchstens MEMORY_PAGE_MAX Einträge pro Seite (Standard 50).
+    NDJSON (format=ndjson / Accept): ein Eintrag pro Zeile, ohne limit alles ab offset.
+    """
+    sess = fox.sessions.peek(session) if session else fox.default_session
+    if sess is None:
+        raise HTTPException(status_code=404, detail="Session unbekannt oder abgelaufen")
+    if wants_ndjson(format, accept):
+        items, total = sess.page(offset, limit or len(sess))
+        return NDJSONResponse(items, headers={"X-Fox-Session": sess.id, "X-Fox-Total": str(total)})
+    limit = min(limit or 50, MEMORY_PAGE_MAX)
+    items, total = sess.page(offset, limit)
+    nxt = offset + len(items)
+    return FastJSONResponse({"ok": True, "session": sess.id, "total": total, "offset": offset, "limit": limit,
+                             "next_offset": nxt if nxt < total else None, "memory": items})
 
 @app.post("/save")
 def save():
     fox.save_all()
-    fox.snapshot(tag="save")  # manueller Snapshot
+    knowledge_store().checkpoint()  # WAL in die .db, damit der Snapshot den letzten Stand hat
+    make_snapshot([MODEL_PATH, knowledge_store().path], tag="save")  # manueller Snapshot
     return ok(f"modell + trainingsdaten gespeichert → {MODEL_PATH}")
 
 @app.post("/reload")
-def reload_model():
-    fox.model = IntentModel.load(MODEL_PATH)
-    return ok("modell neu geladen")
+async def reload_model():
+    await lanes.learn.run(fox.reload_model)
+    return ok("modell neu geladen", version=fox.model.meta.get("version"))
 
 # Optional: Audio ein/aus schalten (Platzhalter)
 @app.post("/audio/{mode}")
@@ -165,7 +548,7 @@ def chat_page():
       <input id="inp" placeholder="Schreib deine Nachricht…" autofocus />
       <button id="send" type="submit">Senden</button>
     </form>
-    <div class="meta" id="meta">Verbunden mit /handle</div>
+    <div class="meta" id="meta">Verbinde …</div>
   </div>
 <script>
 const chat = document.getElementById('chat');
@@ -181,19 +564,56 @@ function addMsg(role, text){
   row.appendChild(bubble);
   chat.appendChild(row);
   chat.scrollTop = chat.scrollHeight;
+  return row;
+}
+// Eine WebSocket-Verbindung für alle Nachrichten (Session bleibt über Reloads erhalten);
+// Fallback auf POST /handle, solange keine Verbindung steht.
+const SID_KEY = 'fox-session';
+let sid = localStorage.getItem(SID_KEY) || '';
+let ws = null, nextId = 1, retry = 500;
+const pending = new Map();  // id → {resolve, reject, bubble}
+function connect(){
+  const proto = location.protocol === 'https:' ? 'wss://' : 'ws://';
+  ws = new WebSocket(proto + location.host + '/ws' + (sid ? '?session=' + encodeURIComponent(sid) : ''));
+  ws.onopen = ()=>{ retry = 500; };
+  ws.onmessage = (ev)=>{
+    const m = JSON.parse(ev.data);
+    if(m.type === 'hello'){ sid = m.session; localStorage.setItem(SID_KEY, sid); meta.textContent = 'Verbunden (WebSocket, Modell ' + m.version + ')'; return; }
+    if(m.type === 'ping'){ ws.send(JSON.stringify({type:'pong', t:m.t})); return; }
+    const p = pending.get(m.id);
+    if(!p) return;
+    if(m.type === 'partial'){ if(m.text){ p.bubble = addMsg('bot', m.text); } return; }
+    pending.delete(m.id);
+    if(m.type === 'reply'){ p.resolve({reply: m.reply, bubble: p.bubble}); }
+    else { p.reject(new Error(m.error || 'Fehler')); }
+  };
+  ws.onclose = ()=>{
+    meta.textContent = 'Getrennt – verbinde neu …';
+    for(const p of pending.values()){ p.reject(new Error('Verbindung getrennt')); }
+    pending.clear();
+    setTimeout(connect, retry); retry = Math.min(retry * 2, 10000);
+  };
 }
-async function askFox(text){
+async function askHttp(text){
   const res = await fetch('/handle', {
     method:'POST',
     headers:{'Content-Type':'application/json'},
-    body: JSON.stringify({text})
+    body: JSON.stringify({text, session: sid || null})
   });
   if(!res.ok){
     const t = await res.text();
     throw new Error('HTTP '+res.status+': '+t);
   }
   const data = await res.json();
-  return data.reply || '';
+  return {reply: data.reply || '', bubble: null};
+}
+function askFox(text){
+  if(!ws || ws.readyState !== WebSocket.OPEN) return askHttp(text);
+  const id = nextId++;
+  return new Promise((resolve, reject)=>{
+    pending.set(id, {resolve, reject, bubble: null});
+    ws.send(JSON.stringify({id, text}));
+  });
 }
 form.addEventListener('submit', async (e)=>{
   e.preventDefault();
@@ -201,16 +621,14 @@ form.addEventListener('submit', async (e)=>{
   if(!text) return;
   addMsg('user', text);
   inp.value = ''; inp.focus();
-  form.querySelector('button').disabled = true;
   try{
-    const reply = await askFox(text);
-    addMsg('bot', reply);
+    const {reply, bubble} = await askFox(text);
+    if(bubble){ bubble.firstChild.textContent = reply; } else { addMsg('bot', reply); }
   }catch(err){
     addMsg('bot', 'Fehler: '+err.message);
-  }finally{
-    form.querySelector('button').disabled = false;
   }
 });
+connect();
 addMsg('bot','Hallo! Ich bin lokal bereit. Frag mich etwas – z. B. „wie spät ist es?“');
 </script>
 </body>